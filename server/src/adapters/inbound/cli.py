@@ -0,0 +1,108 @@
+"""Command line entry point.
+
+`sync` runs a single sync without the web stack and prints a JSON summary
+to stdout. Logs go to stderr, so the output can be piped into other tools.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from datetime import date
+from typing import List, Optional
+
+from server.src.core.domain import DEFAULT_TENANT_ID
+
+
+def _iso_date(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m server.src")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("serve", help="run the web API (default)")
+
+    sync = commands.add_parser("sync", help="run one sync and print a JSON summary")
+    sync.add_argument(
+        "--tenant", default=DEFAULT_TENANT_ID, help="tenant ID (default: default)"
+    )
+    sync.add_argument("--account", help="GoCardless account ID (default: all)")
+    sync.add_argument("--since", type=_iso_date, help="first booking date to sync")
+    sync.add_argument("--until", type=_iso_date, help="last booking date to sync")
+    sync.add_argument(
+        "--replay",
+        action="store_true",
+        help="read GoCardless data from the raw-response archive",
+    )
+    return parser
+
+
+async def run_sync(args: argparse.Namespace) -> int:
+    # Only the sync wiring is imported; FastAPI and the scheduler stay unloaded
+    from .web.dependencies import (
+        close_adapters,
+        configure_tracing,
+        get_replay_sync_service,
+        get_sync_service,
+    )
+
+    configure_tracing()
+    try:
+        provider = get_replay_sync_service if args.replay else get_sync_service
+        sync_service = provider(args.tenant)
+        statuses = await sync_service.sync_transactions(
+            args.account, args.since, args.until
+        )
+    except Exception as e:
+        print(json.dumps({"ok": False, "error": str(e), "accounts": []}))
+        return 1
+    finally:
+        await close_adapters()
+
+    accounts = [
+        {
+            "gocardlessId": account_id,
+            "status": status.last_sync_status,
+            "transactions": status.last_sync_transactions,
+        }
+        for account_id, status in statuses.items()
+    ]
+    ok = bool(accounts) and all(a["status"] == "success" for a in accounts)
+    summary = {"ok": ok, "accounts": accounts}
+    if not accounts:
+        summary["error"] = "No linked accounts to sync"
+    print(json.dumps(summary))
+    return 0 if ok else 1
+
+
+def serve() -> None:
+    import uvicorn
+
+    from .web.app import app
+
+    port = int(os.getenv("VITE_BACKEND_PORT", 4000))
+    uvicorn.run(app, host="0.0.0.0", port=port)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "sync":
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        logging.basicConfig(
+            level=os.getenv("BACKEND_LOG_LEVEL") or "WARNING",
+            stream=sys.stderr,
+            format="%(asctime)s - %(module)s - %(funcName)s - %(lineno)d - %(levelname)s - %(message)s",
+        )
+        return asyncio.run(run_sync(args))
+
+    serve()
+    return 0
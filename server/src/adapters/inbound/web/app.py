@@ -1,13 +1,36 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
-from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes import lunchmoney_api, sync_api, institutions_api, requisitions_api
-from .dependencies import get_sync_service
+from .routes import (
+    balances_api,
+    dashboard_api,
+    debug_api,
+    health_api,
+    lunchmoney_api,
+    sync_api,
+    institutions_api,
+    transactions_api,
+    requisitions_api,
+)
+from .dependencies import (
+    UnknownTenantError,
+    close_adapters,
+    configure_tracing,
+    get_loop_monitor,
+    get_profiler,
+    get_request_coalescer,
+    get_sync_service,
+    get_tenant_repository,
+)
+from .coalescing import CoalescingMiddleware
+from .responses import MsgspecJSONResponse
+from .scheduling import create_scheduler, ensure_sync_job
+from .warmup import WarmupState, warm_up
 
 # Load environment variables
 load_dotenv()
@@ -17,22 +40,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 logging.getLogger("apscheduler").setLevel(logging.DEBUG)
+configure_tracing()
 
 
-async def schedule_sync():
-    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+async def run_scheduled_sync():
+    # Resolve the services when the job fires so that startup stays cheap.
+    # Each tick only syncs the accounts whose planned interval has passed.
+    # Tenants run side by side; the shared fair limiter interleaves their
+    # accounts so that a large tenant cannot starve the others.
+    tenants = get_tenant_repository().load_tenants()
+    results = await asyncio.gather(
+        *[get_sync_service(tenant.id).sync_due_transactions() for tenant in tenants],
+        return_exceptions=True,
+    )
+    for tenant, result in zip(tenants, results):
+        if isinstance(result, Exception):
+            logger.error(f"Scheduled sync for tenant {tenant.id} failed: {result}")
 
+
+async def schedule_sync():
     logger.info("Starting sync scheduler...")
-    sync_service = get_sync_service()
 
-    scheduler = AsyncIOScheduler()
+    scheduler = create_scheduler()
     scheduler.start()
-    scheduler.add_job(
-        sync_service.sync_transactions,
-        id="startup_sync_job",
-        trigger=CronTrigger(hour="*/5", jitter=120),
-        replace_existing=True,
-    )
+    # The tick and its next run time are persisted, so a restart neither
+    # resets the interval nor triggers an extra run. Each tick also resumes
+    # the uploads a crash left behind.
+    ensure_sync_job(scheduler, run_scheduled_sync)
     return scheduler
 
 
@@ -40,12 +74,38 @@ async def schedule_sync():
 async def lifespan(app: FastAPI):
     # noinspection PyUnresolvedReferences
     app.state.scheduler = await schedule_sync()
+
+    if os.getenv("LOOP_MONITOR", "true").lower() in ("1", "true", "yes"):
+        get_loop_monitor().start()
+
+    # Warm up in the background so the first request is served immediately
+    # and /readyz flips once tokens, pools and caches are primed.
+    app.state.warmup = WarmupState()
+    warmup_task = None
+    if os.getenv("BACKEND_WARMUP", "true").lower() in ("1", "true", "yes"):
+        warmup_task = asyncio.create_task(warm_up(app.state.warmup))
+    else:
+        app.state.warmup.status = "disabled"
+
     yield
+
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
     # noinspection PyUnresolvedReferences
     app.state.scheduler.shutdown()
+    await get_loop_monitor().stop()
+    await close_adapters()
 
 
-app = FastAPI(title="GoCardless Dashboard API", lifespan=lifespan)
+app = FastAPI(
+    title="GoCardless Dashboard API",
+    lifespan=lifespan,
+    default_response_class=MsgspecJSONResponse,
+)
+
+# Identical concurrent reads share one computation. Added first so that it
+# runs inside CORS, which sets the headers for each caller's own origin.
+app.add_middleware(CoalescingMiddleware, coalescer=get_request_coalescer())
 
 # Configure CORS
 app.add_middleware(
@@ -56,12 +116,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    # Only requests armed through /api/debug/profiles/requests are profiled
+    profiler = get_profiler()
+    if profiler.should_profile(request.method, request.url.path):
+        return await profiler.profile_request(call_next(request))
+    return await call_next(request)
+
+
+@app.exception_handler(UnknownTenantError)
+async def unknown_tenant_handler(request: Request, exc: UnknownTenantError):
+    return MsgspecJSONResponse(
+        status_code=404, content={"detail": f"Unknown tenant: {exc.args[0]}"}
+    )
+
+
 # Include routers
-app.include_router(lunchmoney_api.router, prefix="/api/lunchmoney", tags=["lunchmoney"])
-app.include_router(sync_api.router, prefix="/api/sync", tags=["sync"])
-app.include_router(
-    institutions_api.router, prefix="/api/institutions", tags=["institutions"]
-)
-app.include_router(
-    requisitions_api.router, prefix="/api/requisitions", tags=["requisitions"]
-)
+app.include_router(health_api.router, tags=["health"])
+app.include_router(debug_api.router, prefix="/api/debug", tags=["debug"])
+
+# Each API is served for the default tenant under /api and for any
+# configured tenant under /api/tenants/{tenant_id}.
+for api_prefix in ("/api", "/api/tenants/{tenant_id}"):
+    app.include_router(
+        lunchmoney_api.router, prefix=f"{api_prefix}/lunchmoney", tags=["lunchmoney"]
+    )
+    app.include_router(sync_api.router, prefix=f"{api_prefix}/sync", tags=["sync"])
+    app.include_router(
+        dashboard_api.router, prefix=f"{api_prefix}/dashboard", tags=["dashboard"]
+    )
+    app.include_router(
+        balances_api.router, prefix=f"{api_prefix}/balances", tags=["balances"]
+    )
+    app.include_router(
+        transactions_api.router,
+        prefix=f"{api_prefix}/transactions",
+        tags=["transactions"],
+    )
+    app.include_router(
+        institutions_api.router,
+        prefix=f"{api_prefix}/institutions",
+        tags=["institutions"],
+    )
+    app.include_router(
+        requisitions_api.router,
+        prefix=f"{api_prefix}/requisitions",
+        tags=["requisitions"],
+    )
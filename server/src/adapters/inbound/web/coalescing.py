@@ -0,0 +1,139 @@
+"""Single-flight coalescing of identical concurrent GET requests."""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+
+Message = Dict[str, Any]
+Key = Tuple[str, bytes, bytes, str, bytes]
+
+# Read-only routes that fan out to GoCardless or Lunch Money
+COALESCED_PATHS = re.compile(
+    r"^/api(/tenants/[^/]+)?/"
+    r"(sync/status|lunchmoney/assets|requisitions/?|institutions/?|dashboard)$"
+)
+
+
+class RequestCoalescer:
+    """Shares one in-flight response among identical concurrent requests.
+
+    Requests are identical when scheme, Host, path, query string and
+    Authorization header match; responses may hold absolute URLs built from
+    the first two. The first one runs the route in a task of its own, so that its
+    client going away does not fail the others, and every caller replays
+    the recorded response. With a `ttl`, successful responses are also
+    served to identical requests for that many seconds after they finish.
+    """
+
+    def __init__(self, paths: Pattern[str] = COALESCED_PATHS, ttl: float = 0.0):
+        self.paths = paths
+        self.ttl = ttl
+        self.stats = {"computed": 0, "coalesced": 0, "cached": 0}
+        self._in_flight: Dict[Key, asyncio.Future] = {}
+        self._recent: Dict[Key, Tuple[float, List[Message]]] = {}
+        # The loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def matches(self, scope: dict) -> bool:
+        return (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and self.paths.match(scope["path"]) is not None
+        )
+
+    async def respond(self, app, scope: dict, send) -> None:
+        key = self._key(scope)
+        now = time.monotonic()
+
+        recent = self._recent.get(key)
+        if recent and recent[0] > now:
+            self.stats["cached"] += 1
+            await self._replay(recent[1], send)
+            return
+
+        future = self._in_flight.get(key)
+        if future is None:
+            self.stats["computed"] += 1
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            task = asyncio.create_task(self._compute(app, scope, key, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shielded, so a caller that goes away doesn't cancel the shared result
+        messages = await asyncio.shield(future)
+        await self._replay(messages, send)
+
+    async def _compute(self, app, scope: dict, key: Key, future) -> None:
+        messages: List[Message] = []
+        finished = asyncio.Event()
+        request_sent = False
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            messages.append(message)
+
+        try:
+            await app(dict(scope), receive, send)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(messages)
+            status = messages[0].get("status") if messages else None
+            if self.ttl > 0 and status == 200:
+                self._recent[key] = (time.monotonic() + self.ttl, messages)
+                self._evict()
+        finally:
+            finished.set()
+            del self._in_flight[key]
+            if not future.done():
+                future.cancel()
+            # Nobody may be waiting anymore; don't warn about an unread error
+            elif not future.cancelled():
+                future.exception()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [
+            key for key, (expires, _) in self._recent.items() if expires <= now
+        ]:
+            del self._recent[key]
+
+    @staticmethod
+    def _key(scope: dict) -> Key:
+        headers = dict(scope["headers"])
+        return (
+            scope.get("scheme", "http"),
+            # Without a Host header, URLs are built from the server address
+            headers.get(b"host") or str(scope.get("server")).encode(),
+            headers.get(b"authorization", b""),
+            scope["path"],
+            scope.get("query_string", b""),
+        )
+
+    @staticmethod
+    async def _replay(messages: List[Message], send) -> None:
+        for message in messages:
+            await send(message)
+
+
+class CoalescingMiddleware:
+    def __init__(self, app, coalescer: Optional[RequestCoalescer] = None):
+        self.app = app
+        self.coalescer = coalescer or RequestCoalescer()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.coalescer.matches(scope):
+            await self.coalescer.respond(self.app, scope, send)
+        else:
+            await self.app(scope, receive, send)
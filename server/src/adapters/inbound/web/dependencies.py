@@ -1,72 +1,408 @@
 """FastAPI dependency injection configuration."""
 
 import os
-from functools import lru_cache
+import threading
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Callable, Dict, Optional, TypeVar
 
 from ....core.services.sync_service import SyncService
+from ....core.services.fairness import FairLimiter
+from ....core.services.sync_planner import SyncPlanner
+from server.src.core.domain import DEFAULT_TENANT_ID, Tenant
 from server.src.core.ports.repositories import (
+    AccountActivityRepository,
     AccountLinkRepository,
+    BalanceRepository,
+    NormalizationRuleRepository,
+    SpendingRollupRepository,
+    SyncRunRepository,
     SyncStatusRepository,
+    TenantRepository,
+    TransactionArchive,
+    TransactionStore,
+    UploadJournal,
 )
+from server.src.core import tracing
+from server.src.core.resilience import CircuitBreaker
 from server.src.core.ports.services import (
     GoCardlessService,
     InstitutionService,
+    LogoCache,
     LunchMoneyService,
     RequisitionService,
+    SpanExporter,
     TokenService,
 )
-from ...outbound.file_storage import FileAccountLinkRepository, FileSyncStatusRepository
+from ...outbound.archive import (
+    ArchivedGoCardlessAdapter,
+    FileTransactionArchive,
+    OfflineTokenService,
+    ReplaySyncStatusRepository,
+)
+from ...outbound.file_storage import (
+    FileAccountActivityRepository,
+    FileNormalizationRuleRepository,
+    FileSyncRunRepository,
+    FileSyncStatusRepository,
+    FileTenantRepository,
+    IndexedAccountLinkRepository,
+    tenant_data_dir,
+)
+from ...outbound.balances import FileBalanceRepository
+from ...outbound.journal import FileUploadJournal
 from server.src.adapters.outbound.gocardless import (
     GoCardlessApiAdapter,
     GoCardlessInstitutionAdapter,
     GoCardlessRequisitionAdapter,
     GoCardlessTokenAdapter,
 )
+from ...outbound.logos import FileLogoCache
 from ...outbound.lunchmoney import LunchMoneyApiAdapter
+from ...outbound.resilience import (
+    ResilientGoCardlessService,
+    ResilientInstitutionService,
+    ResilientLunchMoneyService,
+    ResilientRequisitionService,
+    ResilientTokenService,
+)
+from ...outbound.tracing import JsonlSpanExporter, OtlpHttpSpanExporter
+from ...outbound.transaction_store import (
+    SqliteSpendingRollupRepository,
+    SqliteTransactionStore,
+)
+from .coalescing import RequestCoalescer
+from .loop_monitor import LoopMonitor
+from .profiling import PROFILE_DIR, Profiler
 
+T = TypeVar("T")
 
-@lru_cache
-def get_token_service() -> TokenService:
-    return GoCardlessTokenAdapter()
+# Reentrant because providers resolve the providers they depend on
+_providers_lock = threading.RLock()
 
 
-@lru_cache
-def get_gocardless_service() -> GoCardlessService:
-    return GoCardlessApiAdapter()
+class UnknownTenantError(KeyError):
+    """Raised when a request names a tenant that is not configured."""
 
 
 @lru_cache
-def get_institution_service() -> InstitutionService:
-    return GoCardlessInstitutionAdapter()
+def get_tenant_repository() -> TenantRepository:
+    return FileTenantRepository()
+
+
+def get_tenant(tenant_id: str = DEFAULT_TENANT_ID) -> Tenant:
+    tenant = get_tenant_repository().get_tenant(tenant_id)
+    if tenant is None:
+        raise UnknownTenantError(tenant_id)
+    return tenant
 
 
 @lru_cache
-def get_requisition_service() -> RequisitionService:
-    return GoCardlessRequisitionAdapter()
+def get_logo_cache() -> LogoCache:
+    """Logos are public, so one cache serves all tenants."""
+    return FileLogoCache()
 
 
 @lru_cache
-def get_lunchmoney_service() -> LunchMoneyService:
-    return LunchMoneyApiAdapter()
+def get_profiler() -> Profiler:
+    return Profiler(
+        Path(os.getenv("PROFILE_DIR") or PROFILE_DIR),
+        keep=int(os.getenv("PROFILE_KEEP", "20")),
+    )
 
 
 @lru_cache
-def get_account_link_repository() -> AccountLinkRepository:
-    return FileAccountLinkRepository()
+def get_loop_monitor() -> LoopMonitor:
+    return LoopMonitor(
+        interval=float(os.getenv("LOOP_LAG_INTERVAL_MS", "100")) / 1000,
+        threshold=float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250")) / 1000,
+    )
 
 
 @lru_cache
-def get_sync_status_repository() -> SyncStatusRepository:
-    return FileSyncStatusRepository()
+def get_request_coalescer() -> RequestCoalescer:
+    return RequestCoalescer(ttl=float(os.getenv("COALESCE_TTL_MS", "0")) / 1000)
 
 
 @lru_cache
-def get_sync_service() -> SyncService:
+def get_fair_limiter() -> FairLimiter:
+    """Sync slots shared by all tenants."""
+    return FairLimiter(int(os.getenv("SYNC_GLOBAL_CONCURRENCY", "8")))
+
+
+def _per_tenant(provider: Callable[[str], T]) -> Callable[..., T]:
+    """Cache a provider per tenant, so every tenant gets its own token cache
+    and connection pools.
+
+    Unlike `lru_cache`, positional, keyword and default calls for a tenant
+    share one entry. FastAPI fills `tenant_id` from the path of the
+    tenant-scoped routes; the unscoped routes serve the default tenant.
+    """
+    instances: Dict[str, T] = {}
+
+    @wraps(provider)
+    def cached(tenant_id: str = DEFAULT_TENANT_ID) -> T:
+        with _providers_lock:
+            if tenant_id not in instances:
+                instances[tenant_id] = provider(tenant_id)
+            return instances[tenant_id]
+
+    cached.instances = instances
+    return cached
+
+
+@_per_tenant
+def get_circuit_breakers(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> dict[str, CircuitBreaker]:
+    """One breaker per upstream, and per endpoint family for GoCardless.
+
+    Both upstreams throttle per token, so each tenant has its own breakers;
+    one tenant being throttled must not cut the others off.
+    """
+    get_tenant(tenant_id)
+    return {
+        name: CircuitBreaker(
+            name,
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+        )
+        for name in (
+            "gocardless.token",
+            "gocardless.accounts",
+            "gocardless.institutions",
+            "gocardless.requisitions",
+            "lunchmoney",
+        )
+    }
+
+
+@_per_tenant
+def get_token_service(tenant_id: str = DEFAULT_TENANT_ID) -> TokenService:
+    tenant = get_tenant(tenant_id)
+    return ResilientTokenService(
+        GoCardlessTokenAdapter(
+            secret_id=tenant.gocardless_secret_id,
+            secret_key=tenant.gocardless_secret_key,
+            env_fallback=tenant.id == DEFAULT_TENANT_ID,
+        ),
+        get_circuit_breakers(tenant_id),
+    )
+
+
+@_per_tenant
+def get_gocardless_service(tenant_id: str = DEFAULT_TENANT_ID) -> GoCardlessService:
+    archive_enabled = os.getenv("ARCHIVE_RAW_RESPONSES", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    balances_enabled = os.getenv("BALANCE_SNAPSHOTS", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    return ResilientGoCardlessService(
+        GoCardlessApiAdapter(
+            archive=get_transaction_archive(tenant_id) if archive_enabled else None,
+            balances=get_balance_repository(tenant_id) if balances_enabled else None,
+        ),
+        get_circuit_breakers(tenant_id),
+    )
+
+
+@_per_tenant
+def get_institution_service(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> InstitutionService:
+    return ResilientInstitutionService(
+        GoCardlessInstitutionAdapter(token_service=get_token_service(tenant_id)),
+        get_circuit_breakers(tenant_id),
+    )
+
+
+@_per_tenant
+def get_requisition_service(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> RequisitionService:
+    return ResilientRequisitionService(
+        GoCardlessRequisitionAdapter(token_service=get_token_service(tenant_id)),
+        get_circuit_breakers(tenant_id),
+    )
+
+
+@_per_tenant
+def get_lunchmoney_service(tenant_id: str = DEFAULT_TENANT_ID) -> LunchMoneyService:
+    tenant = get_tenant(tenant_id)
+    return ResilientLunchMoneyService(
+        LunchMoneyApiAdapter(
+            access_token=tenant.lunchmoney_access_token,
+            env_fallback=tenant.id == DEFAULT_TENANT_ID,
+        ),
+        get_circuit_breakers(tenant_id),
+    )
+
+
+@_per_tenant
+def get_account_link_repository(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> AccountLinkRepository:
+    data_dir = tenant_data_dir(get_tenant(tenant_id).id)
+    return IndexedAccountLinkRepository(data_dir / "account-links.json")
+
+
+@_per_tenant
+def get_sync_status_repository(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> SyncStatusRepository:
+    data_dir = tenant_data_dir(get_tenant(tenant_id).id)
+    return FileSyncStatusRepository(data_dir / "sync-status.json")
+
+
+@_per_tenant
+def get_account_activity_repository(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> AccountActivityRepository:
+    data_dir = tenant_data_dir(get_tenant(tenant_id).id)
+    return FileAccountActivityRepository(data_dir / "account-activity.json")
+
+
+@_per_tenant
+def get_sync_run_repository(tenant_id: str = DEFAULT_TENANT_ID) -> SyncRunRepository:
+    data_dir = tenant_data_dir(get_tenant(tenant_id).id)
+    return FileSyncRunRepository(
+        data_dir / "sync-runs.jsonl", data_dir / "sync-rollups.json"
+    )
+
+
+@_per_tenant
+def get_upload_journal(tenant_id: str = DEFAULT_TENANT_ID) -> UploadJournal:
+    return FileUploadJournal(
+        tenant_data_dir(get_tenant(tenant_id).id) / "upload-journal.jsonl",
+        retention_days=int(os.getenv("UPLOAD_JOURNAL_RETENTION_DAYS", "7")),
+        max_attempts=int(os.getenv("UPLOAD_MAX_ATTEMPTS", "5")),
+    )
+
+
+@_per_tenant
+def get_normalization_rule_repository(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> NormalizationRuleRepository:
+    return FileNormalizationRuleRepository(
+        tenant_data_dir(get_tenant(tenant_id).id) / "rules"
+    )
+
+
+@_per_tenant
+def get_balance_repository(tenant_id: str = DEFAULT_TENANT_ID) -> BalanceRepository:
+    return FileBalanceRepository(tenant_data_dir(get_tenant(tenant_id).id) / "balances")
+
+
+@_per_tenant
+def get_transaction_archive(tenant_id: str = DEFAULT_TENANT_ID) -> TransactionArchive:
+    return FileTransactionArchive(tenant_data_dir(get_tenant(tenant_id).id) / "archive")
+
+
+@_per_tenant
+def get_transaction_store(tenant_id: str = DEFAULT_TENANT_ID) -> TransactionStore:
+    return SqliteTransactionStore(
+        tenant_data_dir(get_tenant(tenant_id).id) / "transactions.sqlite3"
+    )
+
+
+@_per_tenant
+def get_spending_rollup_repository(
+    tenant_id: str = DEFAULT_TENANT_ID,
+) -> SpendingRollupRepository:
+    # Rollups are written with the rows, so they share the store's connection
+    return SqliteSpendingRollupRepository(get_transaction_store(tenant_id))
+
+
+@_per_tenant
+def get_sync_service(tenant_id: str = DEFAULT_TENANT_ID) -> SyncService:
+    return _build_sync_service(
+        tenant_id,
+        get_token_service(tenant_id),
+        get_gocardless_service(tenant_id),
+        get_sync_status_repository(tenant_id),
+        get_account_activity_repository(tenant_id),
+    )
+
+
+@_per_tenant
+def get_replay_sync_service(tenant_id: str = DEFAULT_TENANT_ID) -> SyncService:
+    """Sync service that reads GoCardless data from the raw-response archive.
+
+    Its statuses are thrown away and it learns no activity, so a replay of
+    old data leaves the schedule of the live syncs alone.
+    """
+    return _build_sync_service(
+        tenant_id,
+        OfflineTokenService(),
+        ArchivedGoCardlessAdapter(get_transaction_archive(tenant_id)),
+        ReplaySyncStatusRepository(),
+        None,
+    )
+
+
+def _build_sync_service(
+    tenant_id: str,
+    token_service: TokenService,
+    gocardless_service: GoCardlessService,
+    sync_status_repository: SyncStatusRepository,
+    activity_repository: Optional[AccountActivityRepository],
+) -> SyncService:
     return SyncService(
-        token_service=get_token_service(),
-        gocardless_service=get_gocardless_service(),
-        lunchmoney_service=get_lunchmoney_service(),
-        account_link_repository=get_account_link_repository(),
-        sync_status_repository=get_sync_status_repository(),
+        token_service=token_service,
+        gocardless_service=gocardless_service,
+        lunchmoney_service=get_lunchmoney_service(tenant_id),
+        account_link_repository=get_account_link_repository(tenant_id),
+        sync_status_repository=sync_status_repository,
         days_to_sync=int(os.getenv("DAYS_TO_SYNC", "30")),
+        normalization_rule_repository=get_normalization_rule_repository(tenant_id),
+        account_sync_timeout=float(os.getenv("ACCOUNT_SYNC_TIMEOUT", "300")),
+        max_concurrent_accounts=int(os.getenv("SYNC_CONCURRENCY", "4")),
+        tenant_id=tenant_id,
+        limiter=get_fair_limiter(),
+        activity_repository=activity_repository,
+        planner=SyncPlanner(
+            budget_per_account=float(os.getenv("SYNC_DAILY_BUDGET_PER_ACCOUNT", "3")),
+            min_per_day=float(os.getenv("SYNC_MIN_PER_DAY", "1")),
+            max_per_day=float(os.getenv("SYNC_MAX_PER_DAY", "4")),
+        ),
+        run_history_repository=get_sync_run_repository(tenant_id),
+        history_retention_days=int(os.getenv("SYNC_HISTORY_RETENTION_DAYS", "30")),
+        upload_journal=get_upload_journal(tenant_id),
+        upload_batch_size=int(os.getenv("UPLOAD_BATCH_SIZE", "500")),
+        transaction_store=get_transaction_store(tenant_id),
     )
+
+
+@lru_cache
+def get_span_exporters() -> list[SpanExporter]:
+    exporters: list[SpanExporter] = []
+    if traces_file := os.getenv("TRACES_FILE"):
+        exporters.append(JsonlSpanExporter(Path(traces_file)))
+    if otlp_endpoint := os.getenv("OTLP_TRACES_ENDPOINT"):
+        exporters.append(OtlpHttpSpanExporter(otlp_endpoint))
+    return exporters
+
+
+def configure_tracing() -> None:
+    tracing.set_exporters(get_span_exporters())
+
+
+async def close_adapters() -> None:
+    """Close the connection pools of all adapters that opened one."""
+    for provider in (
+        get_gocardless_service,
+        get_institution_service,
+        get_requisition_service,
+        get_lunchmoney_service,
+    ):
+        for service in list(provider.instances.values()):
+            await service.http.aclose()
+    for store in list(get_transaction_store.instances.values()):
+        store.close()
+    if get_logo_cache.cache_info().currsize:
+        await get_logo_cache().http.aclose()
@@ -0,0 +1,127 @@
+"""Streaming serialization of stored transactions for export."""
+
+import csv
+import io
+import re
+from typing import AsyncIterator, List
+
+import msgspec
+
+from server.src.core.domain import StoredTransaction, Transaction
+
+# The columns of the synced `Transaction`, as produced by the sync's
+# transform, in its field order; stored rows add the GoCardless account
+EXPORT_FIELDS = ("account_id",) + tuple(
+    field.name
+    for field in msgspec.structs.fields(Transaction)
+    if field.name in StoredTransaction.__struct_fields__
+)
+
+# Spreadsheets run text cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_NUMBER = re.compile(r"[+-]?\d+(\.\d+)?")
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _csv_cell(value):
+    """`value`, quoted with a leading `'` if a spreadsheet would evaluate it.
+
+    Amounts like -12.50 start with a sign but are left alone; they are
+    numbers to a spreadsheet, not formulas.
+    """
+    if (
+        isinstance(value, str)
+        and value.startswith(_FORMULA_PREFIXES)
+        and not _NUMBER.fullmatch(value)
+    ):
+        return "'" + value
+    return value
+
+
+async def csv_chunks(
+    batches: AsyncIterator[List[StoredTransaction]],
+) -> AsyncIterator[bytes]:
+    """A header, then one chunk of CSV rows per batch.
+
+    Text that would start a formula is prefixed with `'`, so opening the
+    export in a spreadsheet can't run payee or notes text as a formula.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [_csv_cell(getattr(tx, name)) for name in EXPORT_FIELDS] for tx in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only file that hands out what was written since the last call."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+async def parquet_chunks(
+    batches: AsyncIterator[List[StoredTransaction]],
+) -> AsyncIterator[bytes]:
+    """One Parquet row group per batch; the footer follows the last one."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            (name, pa.int64() if name == "asset_id" else pa.string())
+            for name in EXPORT_FIELDS
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for batch in batches:
+            writer.write_table(
+                pa.Table.from_pydict(
+                    {
+                        name: [getattr(tx, name) for tx in batch]
+                        for name in EXPORT_FIELDS
+                    },
+                    schema=schema,
+                )
+            )
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
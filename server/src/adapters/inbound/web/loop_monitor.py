@@ -0,0 +1,193 @@
+"""Event-loop lag monitoring and blocking-call detection."""
+
+import asyncio
+import contextlib
+import logging
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+# Frames in this tree say more about an offender than the library frames below
+project_dir = str(Path(__file__).parents[4])
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Offender:
+    location: str
+    stack: List[str]
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "location": self.location,
+            "stack": self.stack,
+            "count": self.count,
+            "totalMs": round(self.total_ms, 1),
+            "maxMs": round(self.max_ms, 1),
+            "lastSeen": self.last_seen,
+        }
+
+
+@dataclass
+class _Stats:
+    beats: int = 0
+    blocked: int = 0
+    max_lag_ms: float = 0.0
+    recent_lags_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+
+class LoopMonitor:
+    """Heartbeat on the event loop, plus a watchdog thread that samples it.
+
+    The heartbeat sleeps for `interval` seconds and records how late it
+    wakes up. When the loop has not beaten for longer than `threshold`
+    seconds, the watchdog captures the stack of the loop thread, which is
+    the code that blocks it. Blocks shorter than the watchdog period can be
+    missed by the sampler; they are still counted, with an unknown location.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.25,
+        max_offenders: int = 50,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.stats = _Stats()
+        self.offenders: Dict[str, Offender] = {}
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._captured: Optional[List[traceback.FrameSummary]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running loop."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lags = list(self.stats.recent_lags_ms)
+            offenders = sorted(
+                self.offenders.values(), key=lambda o: o.total_ms, reverse=True
+            )
+            return {
+                "running": self.running,
+                "intervalMs": self.interval * 1000,
+                "thresholdMs": self.threshold * 1000,
+                "beats": self.stats.beats,
+                "blocked": self.stats.blocked,
+                "lagMs": {
+                    "mean": round(statistics.fmean(lags), 2) if lags else 0.0,
+                    "p99": round(_percentile(lags, 0.99), 2),
+                    "max": round(self.stats.max_lag_ms, 2),
+                },
+                "offenders": [offender.to_dict() for offender in offenders],
+            }
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._record(max(now - expected, 0.0))
+            self._last_beat = now
+
+    def _record(self, lag: float) -> None:
+        lag_ms = lag * 1000
+        with self._lock:
+            self.stats.beats += 1
+            self.stats.recent_lags_ms.append(lag_ms)
+            self.stats.max_lag_ms = max(self.stats.max_lag_ms, lag_ms)
+            captured, self._captured = self._captured, None
+            if lag < self.threshold:
+                return
+            self.stats.blocked += 1
+            offender = self._offender(captured)
+            offender.count += 1
+            offender.total_ms += lag_ms
+            offender.max_ms = max(offender.max_ms, lag_ms)
+            offender.last_seen = datetime.now().isoformat()
+        logger.warning(f"Event loop blocked for {lag_ms:.0f}ms at {offender.location}")
+
+    def _offender(self, captured: Optional[List[traceback.FrameSummary]]) -> Offender:
+        if not captured:
+            location, stack = "unknown", []
+        else:
+            own = [
+                frame for frame in captured if frame.filename.startswith(project_dir)
+            ]
+            frame = (own or captured)[-1]
+            location = f"{frame.filename}:{frame.lineno} in {frame.name}"
+            stack = [
+                f"{frame.filename}:{frame.lineno} in {frame.name}"
+                for frame in captured[-20:]
+            ]
+        if location not in self.offenders:
+            if len(self.offenders) >= self.max_offenders:
+                # Make room by forgetting the offender seen least recently
+                oldest = min(self.offenders.values(), key=lambda o: o.last_seen or "")
+                del self.offenders[oldest.location]
+            self.offenders[location] = Offender(location=location, stack=stack)
+        return self.offenders[location]
+
+    def _watch(self) -> None:
+        period = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(period):
+            if time.monotonic() - self._last_beat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self._lock:
+                # The first sample of a block is kept; it is where it started
+                if self._captured is None:
+                    self._captured = stack
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
@@ -0,0 +1,261 @@
+"""On-demand profiling of sync runs and requests."""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+import msgspec
+
+T = TypeVar("T")
+
+project_dir = Path(__file__).parents[4]
+PROFILE_DIR = Path(project_dir / "data" / "profiles")
+
+logger = logging.getLogger(__name__)
+
+
+Func = Tuple[str, int, str]
+
+# Deeper or shorter paths add nothing a flame graph can show
+_MAX_STACK_DEPTH = 64
+_MIN_STACK_MICROSECONDS = 10
+
+
+def _frame(func: Func) -> str:
+    file_name, line, name = func
+    if file_name == "~":
+        return name.replace(";", ",")
+    return f"{name} ({Path(file_name).name}:{line})".replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> str:
+    """The profile as collapsed stacks, one `a;b;c <microseconds>` per line.
+
+    cProfile only records caller and callee pairs, not whole stacks, so the
+    time of a function is split over its callers in proportion to the time
+    each of them spent in it. Flame graph tools, such as speedscope or
+    flamegraph.pl, read the result.
+    """
+    entries: Dict[Func, tuple] = stats.stats
+    callees: Dict[Func, List[Func]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    totals: Dict[str, float] = {}
+
+    def walk(func: Func, stack: List[Func], share: float) -> None:
+        _, _, own_time, cumulative_time, _ = entries[func]
+        path = ";".join(_frame(f) for f in stack)
+        totals[path] = totals.get(path, 0.0) + own_time * share
+        if len(stack) >= _MAX_STACK_DEPTH:
+            return
+        for callee in callees.get(func, []):
+            if callee in stack:  # recursion is folded into the outer call
+                continue
+            callee_cumulative = entries[callee][3]
+            edge_time = entries[callee][4][func][3] * share
+            if edge_time * 1e6 < _MIN_STACK_MICROSECONDS or not callee_cumulative:
+                continue
+            walk(callee, stack + [callee], edge_time / callee_cumulative)
+
+    # Calls made before the profiler was enabled have no recorded caller
+    for func, (_, _, _, cumulative_time, callers) in entries.items():
+        unattributed = cumulative_time - sum(edge[3] for edge in callers.values())
+        if not callers:
+            walk(func, [func], 1.0)
+        elif cumulative_time and unattributed * 1e6 >= _MIN_STACK_MICROSECONDS:
+            walk(func, [func], unattributed / cumulative_time)
+
+    return "".join(
+        f"{path} {round(seconds * 1e6)}\n"
+        for path, seconds in totals.items()
+        if round(seconds * 1e6) > 0
+    )
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is capturing."""
+
+
+class ProfileInfo(msgspec.Struct, rename="camel"):
+    id: str
+    kind: str  # sync, requests
+    target: str
+    created_at: str
+    status: str = "running"  # running, done, error
+    requests: int = 0
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+
+class _RequestCapture:
+    def __init__(self, info: ProfileInfo, method: str, path: str, count: int):
+        self.info = info
+        self.method = method
+        self.path = path
+        self.remaining = count
+        self.profile = cProfile.Profile()
+        # Requests are profiled one at a time, as a profiler is per thread
+        # and would otherwise mix in the concurrent requests
+        self.lock = asyncio.Lock()
+
+
+class Profiler:
+    """Deterministic (cProfile) profiles stored as pstats files, each with a
+    collapsed-stack export for flame graphs.
+
+    Only one profile captures at a time. cProfile sees every coroutine that
+    runs on the event loop while it is enabled, so a profile of a sync run
+    also contains the requests served meanwhile.
+    """
+
+    def __init__(self, profile_dir: Path = PROFILE_DIR, keep: int = 20):
+        self.profile_dir = profile_dir
+        self.keep = keep
+        self._active: Optional[ProfileInfo] = None
+        self._capture: Optional[_RequestCapture] = None
+
+    @property
+    def active(self) -> Optional[ProfileInfo]:
+        return self._active
+
+    def start(self, kind: str, target: str) -> ProfileInfo:
+        if self._active is not None:
+            raise ProfilerBusyError(f"Profile {self._active.id} is still capturing")
+        self._active = ProfileInfo(
+            id=f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}",
+            kind=kind,
+            target=target,
+            created_at=datetime.now().isoformat(),
+        )
+        self._save_info(self._active)
+        return self._active
+
+    async def profile(self, info: ProfileInfo, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable` with the profiler enabled, for a started profile."""
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return await awaitable
+        except Exception as e:
+            info.error = str(e)
+            raise
+        finally:
+            profile.disable()
+            info.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._finish(info, profile)
+
+    def capture_requests(self, method: str, path: str, count: int) -> ProfileInfo:
+        """Profile the next `count` requests to `path` into one profile."""
+        info = self.start("requests", f"{method} {path}")
+        self._capture = _RequestCapture(info, method, path, count)
+        return info
+
+    def should_profile(self, method: str, path: str) -> bool:
+        capture = self._capture
+        return (
+            capture is not None
+            and capture.remaining > 0
+            and capture.method == method
+            and capture.path == path.rstrip("/")
+        )
+
+    async def profile_request(self, handler: Awaitable[T]) -> T:
+        capture = self._capture
+        async with capture.lock:
+            if capture.remaining <= 0 or self._capture is not capture:
+                # The capture filled up while this request was waiting
+                return await handler
+            capture.remaining -= 1
+            start = time.perf_counter()
+            capture.profile.enable()
+            try:
+                return await handler
+            finally:
+                capture.profile.disable()
+                capture.info.requests += 1
+                capture.info.duration_ms += round(
+                    (time.perf_counter() - start) * 1000, 1
+                )
+                if capture.remaining == 0:
+                    self._capture = None
+                    self._finish(capture.info, capture.profile)
+
+    def list_profiles(self) -> List[ProfileInfo]:
+        if not self.profile_dir.exists():
+            return []
+        infos = []
+        for path in sorted(self.profile_dir.glob("*.json"), reverse=True):
+            try:
+                infos.append(msgspec.json.decode(path.read_bytes(), type=ProfileInfo))
+            except (OSError, msgspec.DecodeError):
+                continue
+        return infos
+
+    def get_profile(self, profile_id: str) -> Optional[ProfileInfo]:
+        return next(
+            (info for info in self.list_profiles() if info.id == profile_id), None
+        )
+
+    def stats_path(self, profile_id: str) -> Path:
+        return self.profile_dir / f"{profile_id}.pstats"
+
+    def collapsed_path(self, profile_id: str) -> Path:
+        return self.profile_dir / f"{profile_id}.collapsed"
+
+    def render_text(self, profile_id: str, sort: str = "cumulative", limit=50) -> str:
+        """The top functions of a profile, as printed by `pstats`."""
+        out = io.StringIO()
+        stats = pstats.Stats(str(self.stats_path(profile_id)), stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def delete_profile(self, profile_id: str) -> bool:
+        if self._active is not None and self._active.id == profile_id:
+            return False
+        found = False
+        for path in (
+            self.stats_path(profile_id),
+            self.collapsed_path(profile_id),
+            self._info_path(profile_id),
+        ):
+            if path.exists():
+                path.unlink()
+                found = True
+        return found
+
+    def _finish(self, info: ProfileInfo, profile: cProfile.Profile) -> None:
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(self.stats_path(info.id)))
+            self.collapsed_path(info.id).write_text(
+                collapsed_stacks(pstats.Stats(profile))
+            )
+            info.status = "error" if info.error else "done"
+        except Exception as e:
+            logger.error(f"Error saving profile {info.id}: {str(e)}")
+            info.status = "error"
+            info.error = info.error or str(e)
+        self._save_info(info)
+        self._active = None
+        self._prune()
+
+    def _save_info(self, info: ProfileInfo) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self._info_path(info.id).write_bytes(msgspec.json.encode(info))
+
+    def _info_path(self, profile_id: str) -> Path:
+        return self.profile_dir / f"{profile_id}.json"
+
+    def _prune(self) -> None:
+        for info in self.list_profiles()[self.keep :]:
+            self.delete_profile(info.id)
@@ -0,0 +1,19 @@
+"""Response classes for the web API."""
+
+from typing import Any
+
+import msgspec
+from fastapi.responses import JSONResponse
+
+_encoder = msgspec.json.Encoder()
+
+
+class MsgspecJSONResponse(JSONResponse):
+    """JSON response rendered by msgspec.
+
+    Routes return this directly for domain structs and hot paths, which also
+    skips FastAPI's generic `jsonable_encoder` pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
@@ -0,0 +1,58 @@
+"""Balance history routes."""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from server.src.core.ports.repositories import BalanceRepository
+from server.src.core.services.balances import RESOLUTIONS, downsample
+from server.src.adapters.inbound.web.dependencies import get_balance_repository
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
+
+router = APIRouter()
+
+
+def _timestamp(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid date: {value}")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+@router.get("/{account_id}/history")
+async def get_balance_history(
+    account_id: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    resolution: str = Query(default="day", pattern=f"^({'|'.join(RESOLUTIONS)})$"),
+    balance_repository: BalanceRepository = Depends(get_balance_repository),
+):
+    """Balances snapshotted during syncs, one point per `resolution` bucket.
+
+    `since` and `until` are ISO dates or datetimes, in UTC unless given an
+    offset; `until` is exclusive.
+    """
+    try:
+        series = await balance_repository.load_series(
+            account_id, _timestamp(since), _timestamp(until)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if series is None:
+        raise HTTPException(status_code=404, detail="No balances for this account")
+
+    return MsgspecJSONResponse(
+        {
+            "accountId": account_id,
+            "currency": series.currency,
+            "balanceType": series.balance_type,
+            "resolution": resolution,
+            "points": downsample(series, resolution),
+        }
+    )
@@ -0,0 +1,123 @@
+"""Aggregated dashboard API route."""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import msgspec
+from fastapi import APIRouter, Depends, Request
+
+from server.src.core.ports.services import (
+    GoCardlessService,
+    LunchMoneyService,
+    RequisitionService,
+    TokenService,
+)
+from server.src.core.resilience import track_stale
+from server.src.core.services.sync_service import SyncService
+from server.src.adapters.inbound.web.dependencies import (
+    get_gocardless_service,
+    get_lunchmoney_service,
+    get_requisition_service,
+    get_sync_service,
+    get_token_service,
+)
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
+from .lunchmoney_api import assets_with_links
+from .sync_api import account_status_entry, sync_schedule
+
+router = APIRouter()
+
+
+async def _get_token(token_service: TokenService) -> Optional[str]:
+    try:
+        # Minting a token blocks, so keep it off the event loop
+        return await asyncio.to_thread(token_service.get_token)
+    except Exception:
+        # Account details can still be served from last known-good data
+        return None
+
+
+@router.get("")
+async def get_dashboard(
+    request: Request,
+    sync_service: SyncService = Depends(get_sync_service),
+    token_service: TokenService = Depends(get_token_service),
+    gocardless_service: GoCardlessService = Depends(get_gocardless_service),
+    lunchmoney_service: LunchMoneyService = Depends(get_lunchmoney_service),
+    requisition_service: RequisitionService = Depends(get_requisition_service),
+):
+    """Everything the dashboard and settings pages show, in one response.
+
+    Independent resources are fetched concurrently, and account details are
+    fetched once per account even when both a link and a requisition refer
+    to it.
+    """
+    stale_tracker = track_stale()
+    await sync_service.sync_status_repository.reset_sync_status()
+
+    links, assets, requisitions, access_token = await asyncio.gather(
+        sync_service.account_link_repository.load_links(),
+        lunchmoney_service.get_assets(),
+        requisition_service.get_requisitions(),
+        _get_token(token_service),
+    )
+
+    account_ids = list(
+        dict.fromkeys(
+            [link.gocardless_id for link in links]
+            + [account_id for req in requisitions for account_id in req.accounts]
+        )
+    )
+    now = datetime.now()
+    details, statuses, schedule, abandoned_uploads = await asyncio.gather(
+        asyncio.gather(
+            *[
+                gocardless_service.get_account_details(account_id, access_token)
+                for account_id in account_ids
+            ]
+        ),
+        asyncio.gather(
+            *[
+                sync_service.sync_status_repository.get_status(link.gocardless_id)
+                for link in links
+            ]
+        ),
+        sync_schedule(request, sync_service, links, now),
+        sync_service.abandoned_uploads(),
+    )
+    details_by_account: Dict[str, Dict[str, Any]] = {
+        account_id: account_details
+        for account_id, (account_details, _) in zip(account_ids, details)
+    }
+
+    lunchmoney_names = {asset["id"]: asset["name"] for asset in assets}
+    accounts = [
+        account_status_entry(
+            link,
+            details_by_account[link.gocardless_id],
+            status,
+            lunchmoney_names,
+            schedule[link.gocardless_id],
+            now,
+            abandoned_uploads.get(link.gocardless_id, 0),
+        )
+        for link, status in zip(links, statuses)
+    ]
+    requisition_details = {
+        req.id: {
+            **msgspec.to_builtins(req),
+            "accounts": [details_by_account[account_id] for account_id in req.accounts],
+        }
+        for req in requisitions
+    }
+
+    return MsgspecJSONResponse(
+        {
+            "accounts": accounts,
+            "assets": assets_with_links(assets, links),
+            "requisitions": requisitions,
+            "requisitionDetails": requisition_details,
+            "stale": stale_tracker.stale,
+        }
+    )
@@ -0,0 +1,175 @@
+"""Admin-only debugging routes."""
+
+import os
+import re
+import secrets
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+)
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+from server.src.core.services.sync_service import SyncService
+from server.src.adapters.inbound.web.coalescing import RequestCoalescer
+from server.src.adapters.inbound.web.dependencies import (
+    get_loop_monitor,
+    get_lunchmoney_service,
+    get_profiler,
+    get_request_coalescer,
+    get_tenant_repository,
+    get_sync_service,
+)
+from server.src.adapters.inbound.web.loop_monitor import LoopMonitor
+from server.src.adapters.inbound.web.profiling import (
+    Profiler,
+    ProfileInfo,
+    ProfilerBusyError,
+)
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
+
+PROFILE_ID_PATTERN = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+
+def require_admin(authorization: Optional[str] = Header(default=None)) -> None:
+    """Guard the debug routes with DEBUG_ADMIN_TOKEN; they don't exist without it."""
+    admin_token = os.getenv("DEBUG_ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, admin_token):
+        raise HTTPException(status_code=401, detail="Admin token required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+class SyncProfileRequest(BaseModel):
+    accountId: Optional[str] = None
+
+
+class RequestsProfileRequest(BaseModel):
+    path: str
+    method: str = "GET"
+    count: int = Field(default=1, ge=1, le=100)
+
+
+def _get_info(profiler: Profiler, profile_id: str) -> ProfileInfo:
+    info = (
+        profiler.get_profile(profile_id)
+        if PROFILE_ID_PATTERN.match(profile_id)
+        else None
+    )
+    if info is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return info
+
+
+@router.get("/profiles")
+async def list_profiles(profiler: Profiler = Depends(get_profiler)):
+    return MsgspecJSONResponse(
+        {"active": profiler.active, "profiles": profiler.list_profiles()}
+    )
+
+
+@router.post("/profiles/sync", status_code=202)
+async def profile_sync(
+    request: SyncProfileRequest,
+    background_tasks: BackgroundTasks,
+    profiler: Profiler = Depends(get_profiler),
+    sync_service: SyncService = Depends(get_sync_service),
+):
+    """Run a sync, like POST /sync, under the profiler."""
+    try:
+        info = profiler.start("sync", request.accountId or "all")
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    async def run() -> None:
+        await profiler.profile(info, sync_service.sync_transactions(request.accountId))
+
+    background_tasks.add_task(run)
+    return MsgspecJSONResponse(info, status_code=202)
+
+
+@router.post("/profiles/requests", status_code=202)
+async def profile_requests(
+    request: RequestsProfileRequest,
+    profiler: Profiler = Depends(get_profiler),
+):
+    """Profile the next `count` requests to `path`, such as /api/sync/status."""
+    try:
+        info = profiler.capture_requests(
+            request.method.upper(), request.path.rstrip("/"), request.count
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return MsgspecJSONResponse(info, status_code=202)
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query(default="pstats", pattern="^(pstats|text|collapsed)$"),
+    sort: str = Query(default="cumulative", pattern="^(cumulative|tottime|calls)$"),
+    profiler: Profiler = Depends(get_profiler),
+):
+    """The profile as a pstats file, for snakeviz or `python -m pstats`, as
+    collapsed stacks for speedscope or flamegraph.pl, or as a text summary
+    of the top functions."""
+    info = _get_info(profiler, profile_id)
+    if info.status != "done" and not profiler.stats_path(info.id).exists():
+        raise HTTPException(status_code=409, detail=f"Profile is {info.status}")
+    if format == "text":
+        return PlainTextResponse(profiler.render_text(info.id, sort))
+    if format == "collapsed":
+        return FileResponse(
+            profiler.collapsed_path(info.id),
+            media_type="text/plain",
+            filename=f"{info.id}.collapsed.txt",
+        )
+    return FileResponse(
+        profiler.stats_path(info.id),
+        media_type="application/octet-stream",
+        filename=f"{info.id}.pstats",
+    )
+
+
+@router.delete("/profiles/{profile_id}")
+async def delete_profile(profile_id: str, profiler: Profiler = Depends(get_profiler)):
+    info = _get_info(profiler, profile_id)
+    if not profiler.delete_profile(info.id):
+        raise HTTPException(status_code=409, detail="Profile is still capturing")
+    return {"status": "success"}
+
+
+@router.get("/loop")
+async def loop_report(monitor: LoopMonitor = Depends(get_loop_monitor)):
+    """Event-loop lag and the code paths that blocked the loop the longest."""
+    return MsgspecJSONResponse(monitor.snapshot())
+
+
+@router.get("/coalescing")
+async def coalescing_report(
+    coalescer: RequestCoalescer = Depends(get_request_coalescer),
+):
+    """How many requests were computed, joined an identical one in flight or
+    were served from the micro-TTL."""
+    return MsgspecJSONResponse({"ttlMs": coalescer.ttl * 1000, **coalescer.stats})
+
+
+@router.get("/lunchmoney")
+async def lunchmoney_limits():
+    """The adaptive Lunch Money concurrency limit of each tenant."""
+    return MsgspecJSONResponse(
+        {
+            tenant.id: get_lunchmoney_service(tenant.id).limiter.to_dict()
+            for tenant in get_tenant_repository().load_tenants()
+        }
+    )
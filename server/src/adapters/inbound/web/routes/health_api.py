@@ -0,0 +1,37 @@
+"""Liveness and readiness probes."""
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+
+from server.src.adapters.inbound.web.dependencies import (
+    get_circuit_breakers,
+    get_tenant_repository,
+)
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """Report that the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(request: Request, tenants=Depends(get_tenant_repository)):
+    """Report whether the startup warm-up has finished, and each tenant's
+    upstream circuits."""
+    state = request.app.state.warmup
+    return JSONResponse(
+        status_code=200 if state.is_ready else 503,
+        content={
+            **state.to_dict(),
+            "circuits": {
+                tenant.id: {
+                    name: breaker.to_dict()
+                    for name, breaker in get_circuit_breakers(tenant.id).items()
+                }
+                for tenant in tenants.load_tenants()
+            },
+        },
+    )
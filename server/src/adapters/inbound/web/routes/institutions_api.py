@@ -1,18 +1,78 @@
 """Institution API routes."""
 
-from fastapi import APIRouter, Depends, Query
+import msgspec
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse, Response
 
-from server.src.core.ports.services import InstitutionService
-from server.src.adapters.inbound.web.dependencies import get_institution_service
+from server.src.core.ports.services import InstitutionService, LogoCache
+from server.src.core.resilience import track_stale
+from server.src.adapters.inbound.web.dependencies import (
+    get_institution_service,
+    get_logo_cache,
+)
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
 
 router = APIRouter()
 
+# Logo names are content hashes, so a stored logo never changes
+IMMUTABLE_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "X-Content-Type-Options": "nosniff",
+    # Logos may be SVG; keep them from running scripts when opened directly
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'",
+}
+
 
 @router.get("/")
 async def list_institutions(
+    request: Request,
     country: str = Query(..., description="Country code"),
     institution_service: InstitutionService = Depends(get_institution_service),
+    logo_cache: LogoCache = Depends(get_logo_cache),
 ):
-    """Get list of institutions for a country."""
+    """Get list of institutions for a country, with logos served locally."""
+    stale_tracker = track_stale()
     institutions = await institution_service.get_institutions(country)
-    return institutions
+
+    def local_logo(url: str) -> str:
+        if not url:
+            return url
+        if name := logo_cache.cached(url):
+            return str(request.url_for("get_logo", name=name))
+        return str(request.url_for("fetch_logo", key=logo_cache.register(url)))
+
+    institutions = [
+        msgspec.structs.replace(institution, logo=local_logo(institution.logo))
+        for institution in institutions
+    ]
+    return MsgspecJSONResponse(
+        institutions, headers={"X-Stale": "true"} if stale_tracker.stale else None
+    )
+
+
+@router.get("/logos/sources/{key}")
+async def fetch_logo(
+    key: str, request: Request, logo_cache: LogoCache = Depends(get_logo_cache)
+):
+    """Download a logo on first use and redirect to its content-hash URL."""
+    try:
+        name = await logo_cache.fetch(key)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error fetching logo: {str(e)}")
+    if name is None:
+        raise HTTPException(status_code=404, detail="Unknown logo")
+    return RedirectResponse(str(request.url_for("get_logo", name=name)))
+
+
+@router.get("/logos/{name}")
+async def get_logo(name: str, logo_cache: LogoCache = Depends(get_logo_cache)):
+    """Serve a stored logo by its content hash."""
+    logo = logo_cache.load(name)
+    if logo is None:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    content, content_type = logo
+    return Response(
+        content,
+        media_type=content_type,
+        headers={**IMMUTABLE_HEADERS, "ETag": f'"{name.split(".")[0]}"'},
+    )
@@ -1,17 +1,20 @@
 """Lunch Money API routes."""
 
 from datetime import datetime
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from server.src.core.domain.models import AccountLink
+from server.src.core.resilience import track_stale
 from server.src.core.ports.repositories import AccountLinkRepository
 from server.src.core.ports.services import LunchMoneyService
 from server.src.adapters.inbound.web.dependencies import (
     get_account_link_repository,
     get_lunchmoney_service,
 )
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
 
 router = APIRouter()
 
@@ -26,6 +29,19 @@ class UnlinkAccountsRequest(BaseModel):
     gocardlessId: str
 
 
+class BulkLinkRequest(BaseModel):
+    link: List[LinkAccountsRequest] = Field(default_factory=list)
+    unlink: List[UnlinkAccountsRequest] = Field(default_factory=list)
+
+
+def assets_with_links(
+    assets: List[Dict[str, Any]], links: List[AccountLink]
+) -> List[Dict[str, Any]]:
+    """Add the linked GoCardless account, if any, to each asset."""
+    linked = {link.lunchmoney_id: link.gocardless_id for link in links}
+    return [{**asset, "linked_account": linked.get(asset["id"])} for asset in assets]
+
+
 @router.get("/assets")
 async def list_assets(
     lunchmoney_service: LunchMoneyService = Depends(get_lunchmoney_service),
@@ -33,26 +49,13 @@ async def list_assets(
         get_account_link_repository
     ),
 ):
+    stale_tracker = track_stale()
     assets = await lunchmoney_service.get_assets()
     links = await account_link_repository.load_links()
 
-    # Add linked status to each asset
-    assets_with_links = [
-        {
-            **asset,
-            "linked_account": next(
-                (
-                    link.gocardless_id
-                    for link in links
-                    if link.lunchmoney_id == asset["id"]
-                ),
-                None,
-            ),
-        }
-        for asset in assets
-    ]
-
-    return {"assets": assets_with_links}
+    return MsgspecJSONResponse(
+        {"assets": assets_with_links(assets, links), "stale": stale_tracker.stale}
+    )
 
 
 @router.post("/link")
@@ -80,3 +83,30 @@ async def unlink(
 ):
     account_link_repository.remove_link(request.lunchmoneyId, request.gocardlessId)
     return {"message": "Account unlinked successfully"}
+
+
+@router.post("/links")
+async def bulk_link(
+    request: BulkLinkRequest,
+    account_link_repository: AccountLinkRepository = Depends(
+        get_account_link_repository
+    ),
+):
+    """Apply many links and unlinks at once; unlinks go first."""
+    now = datetime.now().isoformat()
+    account_link_repository.apply_changes(
+        [
+            AccountLink(
+                lunchmoney_id=item.lunchmoneyId,
+                gocardless_id=item.gocardlessId,
+                created_at=now,
+            )
+            for item in request.link
+        ],
+        [(item.lunchmoneyId, item.gocardlessId) for item in request.unlink],
+    )
+    return {
+        "message": "Account links updated successfully",
+        "linked": len(request.link),
+        "unlinked": len(request.unlink),
+    }
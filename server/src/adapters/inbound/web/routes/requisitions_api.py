@@ -4,7 +4,9 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 from server.src.core.ports.services import RequisitionService
+from server.src.core.resilience import track_stale
 from server.src.adapters.inbound.web.dependencies import get_requisition_service
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
 
 router = APIRouter()
 
@@ -21,8 +23,9 @@ async def list_requisitions(
     requisition_service: RequisitionService = Depends(get_requisition_service),
 ):
     """Get all requisitions."""
+    stale_tracker = track_stale()
     requisitions = await requisition_service.get_requisitions()
-    return {"results": requisitions}
+    return MsgspecJSONResponse({"results": requisitions, "stale": stale_tracker.stale})
 
 
 @router.get("/{id}")
@@ -32,7 +35,7 @@ async def get_details(
 ):
     """Get details for a specific requisition."""
     details = await requisition_service.get_requisition_details(id)
-    return details
+    return MsgspecJSONResponse(details)
 
 
 @router.post("/")
@@ -42,7 +45,7 @@ async def create(
 ):
     """Create a new requisition."""
     requisition = await requisition_service.create_requisition(request.model_dump())
-    return requisition
+    return MsgspecJSONResponse(requisition)
 
 
 @router.delete("/{id}")
@@ -1,12 +1,15 @@
 """Sync API routes."""
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request
+from pydantic import BaseModel, Field
 
+from server.src.core.domain import AccountLink, AccountStatus, RateLimit
+from server.src.core.resilience import track_stale
 from server.src.core.services.sync_service import SyncService
+from server.src.core.ports.repositories import SyncRunRepository
 from server.src.core.ports.services import (
     GoCardlessService,
     LunchMoneyService,
@@ -15,9 +18,13 @@ from server.src.core.ports.services import (
 from server.src.adapters.inbound.web.dependencies import (
     get_gocardless_service,
     get_lunchmoney_service,
+    get_replay_sync_service,
+    get_sync_run_repository,
     get_sync_service,
     get_token_service,
 )
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
+from server.src.adapters.inbound.web.scheduling import sync_tick
 
 router = APIRouter()
 
@@ -26,31 +33,98 @@ class SyncRequest(BaseModel):
     accountId: Optional[str] = None
 
 
-async def get_next_sync_time() -> str:
-    now = datetime.now()
-    next_sync = now.replace(
-        hour=((now.hour // 3) * 3 + 3) % 24, minute=0, second=0, microsecond=0
-    )
-    if next_sync <= now:
-        next_sync += timedelta(hours=3)
-    return next_sync.isoformat()
+class ReplayRequest(BaseModel):
+    accountId: Optional[str] = None
+    since: Optional[str] = None
+    until: Optional[str] = None
+
+
+class IntervalRequest(BaseModel):
+    # None hands the account back to the activity-based planner
+    hours: Optional[float] = Field(default=None, gt=0)
+
+
+async def sync_schedule(
+    request: Request,
+    sync_service: SyncService,
+    account_links: List[AccountLink],
+    now: datetime,
+) -> Dict[str, Tuple[float, datetime]]:
+    """Planned interval and next sync per account, as the scheduler runs them.
+
+    Due accounts are synced by the next scheduler tick, not the moment they
+    fall due.
+    """
+    schedule = await sync_service.get_sync_schedule(account_links, now)
+    tick = sync_tick(getattr(request.app.state, "scheduler", None))
+    if not tick:
+        return schedule
+    return {
+        account_id: (interval, tick.first_at_or_after(due))
+        for account_id, (interval, due) in schedule.items()
+    }
+
+
+def account_status_entry(
+    link: AccountLink,
+    account_details: Dict[str, Any],
+    status: AccountStatus,
+    lunchmoney_names: Dict[int, str],
+    schedule: Tuple[float, datetime],
+    now: datetime,
+    abandoned_uploads: int = 0,
+) -> Dict[str, Any]:
+    """Status of a linked account as shown on the dashboard."""
+    interval_hours, next_sync = schedule
+    rate_limit = status.rate_limit or RateLimit(limit=None, remaining=None, reset=None)
+    return {
+        "gocardlessId": link.gocardless_id,
+        "gocardlessName": account_details.get("iban", "Unknown Account"),
+        "lunchmoneyName": lunchmoney_names.get(link.lunchmoney_id, "Unknown Account"),
+        "lastSync": status.last_sync,
+        "lastSyncStatus": status.last_sync_status,
+        "lastSyncTransactions": status.last_sync_transactions,
+        "isSyncing": status.is_syncing,
+        # -1 for counts that are not known
+        "rateLimit": {
+            "limit": rate_limit.limit if rate_limit.limit is not None else -1,
+            "remaining": (
+                rate_limit.remaining if rate_limit.remaining is not None else -1
+            ),
+            "reset": rate_limit.reset,
+        },
+        "syncIntervalHours": interval_hours,
+        "nextSync": max(next_sync, now).isoformat(),
+        # Transactions Lunch Money kept rejecting, which are no longer retried
+        "abandonedUploads": abandoned_uploads,
+    }
 
 
 @router.get("/status")
 async def get_sync_status(
+    request: Request,
     sync_service: SyncService = Depends(get_sync_service),
     token_service: TokenService = Depends(get_token_service),
     gocardless_service: GoCardlessService = Depends(get_gocardless_service),
     lunchmoney_service: LunchMoneyService = Depends(get_lunchmoney_service),
 ):
+    stale_tracker = track_stale()
+
     # Reset any stale sync statuses
     await sync_service.sync_status_repository.reset_sync_status()
 
     # Get necessary data
     account_links = await sync_service.account_link_repository.load_links()
-    access_token = token_service.get_token()
+    try:
+        access_token = token_service.get_token()
+    except Exception:
+        # Account details can still be served from last known-good data
+        access_token = None
     lunchmoney_accounts = await lunchmoney_service.get_assets()
     lunchmoney_accounts_dict = {acc["id"]: acc["name"] for acc in lunchmoney_accounts}
+    now = datetime.now()
+    schedule = await sync_schedule(request, sync_service, account_links, now)
+    abandoned_uploads = await sync_service.abandoned_uploads()
 
     # Build status response
     status_list = []
@@ -63,28 +137,34 @@ async def get_sync_status(
         )
 
         status_list.append(
-            {
-                "gocardlessId": link.gocardless_id,
-                "gocardlessName": account_details.get("iban", "Unknown Account"),
-                "lunchmoneyName": lunchmoney_accounts_dict.get(
-                    link.lunchmoney_id, "Unknown Account"
-                ),
-                "lastSync": status.last_sync,
-                "lastSyncStatus": status.last_sync_status,
-                "lastSyncTransactions": status.last_sync_transactions,
-                "isSyncing": status.is_syncing,
-                "rateLimit": {
-                    "limit": status.rate_limit.limit if status.rate_limit else -1,
-                    "remaining": status.rate_limit.remaining
-                    if status.rate_limit
-                    else -1,
-                    "reset": status.rate_limit.reset if status.rate_limit else None,
-                },
-                "nextSync": await get_next_sync_time(),
-            }
+            account_status_entry(
+                link,
+                account_details,
+                status,
+                lunchmoney_accounts_dict,
+                schedule[link.gocardless_id],
+                now,
+                abandoned_uploads.get(link.gocardless_id, 0),
+            )
         )
 
-    return {"accounts": status_list}
+    return MsgspecJSONResponse({"accounts": status_list, "stale": stale_tracker.stale})
+
+
+@router.get("/history")
+async def get_sync_history(
+    account_id: Optional[str] = Query(default=None, alias="accountId"),
+    days: int = Query(default=7, ge=1),
+    run_repository: SyncRunRepository = Depends(get_sync_run_repository),
+):
+    """Per-account run records, and daily rollups of runs already compacted."""
+    since = (datetime.now() - timedelta(days=days)).date().isoformat()
+    return MsgspecJSONResponse(
+        {
+            "runs": await run_repository.load_runs(account_id, since),
+            "rollups": await run_repository.load_rollups(account_id, since),
+        }
+    )
 
 
 @router.post("")
@@ -95,3 +175,33 @@ async def trigger_sync(
 ):
     background_tasks.add_task(sync_service.sync_transactions, request.accountId)
     return {"status": "success"}
+
+
+@router.put("/accounts/{account_id}/interval")
+async def set_sync_interval(
+    account_id: str,
+    request: IntervalRequest,
+    sync_service: SyncService = Depends(get_sync_service),
+):
+    activity = await sync_service.set_interval_override(account_id, request.hours)
+    return {
+        "gocardlessId": account_id,
+        "transactionsPerDay": activity.transactions_per_day,
+        "intervalOverrideHours": activity.interval_override_hours,
+    }
+
+
+@router.post("/replay")
+async def replay_sync(
+    request: ReplayRequest,
+    background_tasks: BackgroundTasks,
+    sync_service: SyncService = Depends(get_replay_sync_service),
+):
+    """Re-run transform, dedup and upload from archived GoCardless responses."""
+    background_tasks.add_task(
+        sync_service.sync_transactions,
+        request.accountId,
+        request.since,
+        request.until,
+    )
+    return {"status": "success"}
@@ -0,0 +1,140 @@
+"""Routes over the local store of synced transactions."""
+
+import time
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from server.src.core.domain import TransactionQuery
+from server.src.core.ports.repositories import (
+    SpendingRollupRepository,
+    TransactionStore,
+)
+from server.src.adapters.inbound.web.dependencies import (
+    get_spending_rollup_repository,
+    get_transaction_store,
+)
+from server.src.adapters.inbound.web.export import (
+    CONTENT_TYPES,
+    csv_chunks,
+    parquet_available,
+    parquet_chunks,
+)
+from server.src.adapters.inbound.web.responses import MsgspecJSONResponse
+
+router = APIRouter()
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+MONTH_PATTERN = r"^\d{4}-\d{2}$"
+
+
+def _amount(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        finite = Decimal(value).is_finite()
+    except InvalidOperation:
+        finite = False
+    # NaN and Infinity parse, but can't be compared with stored amounts
+    if not finite:
+        raise HTTPException(status_code=422, detail=f"Invalid amount: {value}")
+    return value
+
+
+@router.get("/search")
+async def search_transactions(
+    q: Optional[str] = None,
+    account_ids: Optional[List[str]] = Query(default=None, alias="accountId"),
+    date_from: Optional[str] = Query(default=None, alias="from", pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(default=None, alias="to", pattern=DATE_PATTERN),
+    min_amount: Optional[str] = Query(default=None, alias="minAmount"),
+    max_amount: Optional[str] = Query(default=None, alias="maxAmount"),
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    transaction_store: TransactionStore = Depends(get_transaction_store),
+):
+    """Search synced transactions by payee and notes, date and amount.
+
+    Served from the local store only; neither upstream API is called.
+    """
+    start = time.perf_counter()
+    result = await transaction_store.search(
+        TransactionQuery(
+            text=q,
+            account_ids=account_ids,
+            date_from=date_from,
+            date_to=date_to,
+            min_amount=_amount(min_amount),
+            max_amount=_amount(max_amount),
+            limit=limit,
+            offset=offset,
+        )
+    )
+    return MsgspecJSONResponse(
+        {
+            "total": result.total,
+            "transactions": result.transactions,
+            "tookMs": round((time.perf_counter() - start) * 1000, 2),
+        }
+    )
+
+
+@router.get("/rollups")
+async def get_spending_rollups(
+    account_ids: Optional[List[str]] = Query(default=None, alias="accountId"),
+    month_from: Optional[str] = Query(
+        default=None, alias="from", pattern=MONTH_PATTERN
+    ),
+    month_to: Optional[str] = Query(default=None, alias="to", pattern=MONTH_PATTERN),
+    payees: int = Query(default=20, ge=0, le=500),
+    rollup_repository: SpendingRollupRepository = Depends(
+        get_spending_rollup_repository
+    ),
+):
+    """Totals per account and month, and the top payees by amount spent.
+
+    Read from rollups kept up to date during syncs; payee totals cover all
+    synced history.
+    """
+    months = await rollup_repository.load_rollups(
+        "month", account_ids, month_from, month_to
+    )
+    top_payees = (
+        await rollup_repository.load_rollups("payee", account_ids, limit=payees)
+        if payees
+        else []
+    )
+    return MsgspecJSONResponse({"months": months, "payees": top_payees})
+
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query(default="csv", pattern="^(csv|parquet)$"),
+    account_ids: Optional[List[str]] = Query(default=None, alias="accountId"),
+    date_from: Optional[str] = Query(default=None, alias="from", pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(default=None, alias="to", pattern=DATE_PATTERN),
+    transaction_store: TransactionStore = Depends(get_transaction_store),
+):
+    """Stream synced transactions, oldest first, as CSV or Parquet.
+
+    Rows are read from the local store in batches and sent as they are
+    serialized, so memory use does not grow with the size of the export.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=501, detail="Parquet export requires pyarrow to be installed"
+        )
+
+    batches = transaction_store.iter_transactions(
+        TransactionQuery(account_ids=account_ids, date_from=date_from, date_to=date_to)
+    )
+    chunks = csv_chunks(batches) if format == "csv" else parquet_chunks(batches)
+    return StreamingResponse(
+        chunks,
+        media_type=CONTENT_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format}"'
+        },
+    )
@@ -0,0 +1,79 @@
+"""The persistent sync scheduler and the run times it plans."""
+
+import math
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from ...outbound.job_store import SCHEDULER_DB, SqliteJobStore
+
+SYNC_JOB_ID = "startup_sync_job"
+
+
+class SyncTick(NamedTuple):
+    next_run: datetime
+    interval: timedelta
+
+    def first_at_or_after(self, due: datetime) -> datetime:
+        """The tick that picks up an account due at `due`."""
+        if due <= self.next_run:
+            return self.next_run
+        return self.next_run + math.ceil((due - self.next_run) / self.interval) * (
+            self.interval
+        )
+
+
+def create_scheduler(db_path: Optional[Path] = None) -> AsyncIOScheduler:
+    """A scheduler that keeps its jobs in SQLite.
+
+    Missed runs are coalesced into one, which still runs when it is at most
+    `SYNC_MISFIRE_GRACE_SECONDS` late; by default one tick, so a restart
+    after an outage catches up exactly once.
+    """
+    tick_seconds = int(os.getenv("SYNC_TICK_MINUTES", "15")) * 60
+    return AsyncIOScheduler(
+        jobstores={
+            "default": SqliteJobStore(
+                db_path or Path(os.getenv("SCHEDULER_DB") or SCHEDULER_DB)
+            )
+        },
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": int(
+                os.getenv("SYNC_MISFIRE_GRACE_SECONDS") or tick_seconds
+            ),
+        },
+    )
+
+
+def ensure_sync_job(scheduler: BaseScheduler, func: Callable) -> None:
+    """Add the sync tick, or keep the persisted one and its next run time.
+
+    Replacing the job on every boot would restart its interval; it is only
+    rescheduled when SYNC_TICK_MINUTES changed.
+    """
+    trigger = IntervalTrigger(
+        minutes=int(os.getenv("SYNC_TICK_MINUTES", "15")), jitter=60
+    )
+    job = scheduler.get_job(SYNC_JOB_ID)
+    if job is None:
+        scheduler.add_job(func, id=SYNC_JOB_ID, trigger=trigger)
+    elif job.trigger.interval != trigger.interval:
+        job.reschedule(trigger)
+
+
+def sync_tick(scheduler: Optional[BaseScheduler]) -> Optional[SyncTick]:
+    """The next run of the sync tick, in naive local time like the planner."""
+    job = scheduler.get_job(SYNC_JOB_ID) if scheduler and scheduler.running else None
+    if job is None or job.next_run_time is None:
+        return None
+    return SyncTick(
+        next_run=job.next_run_time.astimezone().replace(tzinfo=None),
+        interval=job.trigger.interval,
+    )
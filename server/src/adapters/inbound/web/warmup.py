@@ -0,0 +1,117 @@
+"""Startup warm-up of tokens, connection pools and caches."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from .dependencies import (
+    get_account_link_repository,
+    get_gocardless_service,
+    get_institution_service,
+    get_lunchmoney_service,
+    get_requisition_service,
+    get_tenant_repository,
+    get_token_service,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupState:
+    status: str = "pending"  # pending, running, ready, disabled
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    tasks: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "tasks": self.tasks,
+        }
+
+
+def _tenant_ids() -> list[str]:
+    return [tenant.id for tenant in get_tenant_repository().load_tenants()]
+
+
+async def _warm_gocardless() -> None:
+    """Mint access tokens and prefill account details for linked accounts."""
+
+    async def warm(tenant_id: str) -> None:
+        access_token = await asyncio.to_thread(get_token_service(tenant_id).get_token)
+        links = await get_account_link_repository(tenant_id).load_links()
+        gocardless_service = get_gocardless_service(tenant_id)
+        await asyncio.gather(
+            *[
+                gocardless_service.get_account_details(link.gocardless_id, access_token)
+                for link in links
+            ]
+        )
+
+    await asyncio.gather(*[warm(tenant_id) for tenant_id in _tenant_ids()])
+
+
+async def _warm_lunchmoney() -> None:
+    """Prefill the asset caches."""
+    await asyncio.gather(
+        *[get_lunchmoney_service(tenant_id).get_assets() for tenant_id in _tenant_ids()]
+    )
+
+
+async def _open_pools() -> None:
+    for tenant_id in _tenant_ids():
+        for service in (
+            get_gocardless_service(tenant_id),
+            get_institution_service(tenant_id),
+            get_requisition_service(tenant_id),
+            get_lunchmoney_service(tenant_id),
+        ):
+            _ = service.http.client
+
+
+WARMUP_TASKS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "pools": _open_pools,
+    "gocardless": _warm_gocardless,
+    "lunchmoney": _warm_lunchmoney,
+}
+
+
+async def warm_up(
+    state: WarmupState,
+    tasks: Optional[Dict[str, Callable[[], Awaitable[None]]]] = None,
+) -> WarmupState:
+    """Run all warm-up tasks concurrently and record their outcome in `state`.
+
+    A failing task does not block readiness: the affected adapter simply
+    falls back to doing the work on the first real request.
+    """
+    tasks = tasks if tasks is not None else WARMUP_TASKS
+    state.status = "running"
+    state.started_at = datetime.now().isoformat()
+
+    async def run(name: str, task: Callable[[], Awaitable[None]]) -> None:
+        start = time.perf_counter()
+        try:
+            await task()
+            state.tasks[name] = {"status": "ok"}
+        except Exception as e:
+            logger.warning(f"Warm-up task {name} failed: {str(e)}")
+            state.tasks[name] = {"status": "error", "error": str(e)}
+        state.tasks[name]["durationMs"] = round((time.perf_counter() - start) * 1000, 1)
+
+    await asyncio.gather(*[run(name, task) for name, task in tasks.items()])
+
+    state.status = "ready"
+    state.finished_at = datetime.now().isoformat()
+    logger.info(f"Warm-up finished: {state.tasks}")
+    return state
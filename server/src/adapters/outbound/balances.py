@@ -0,0 +1,141 @@
+"""Columnar balance snapshot storage."""
+
+import asyncio
+import re
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Optional
+
+import msgspec
+
+from server.src.core.domain import BalanceSeries, BalanceSnapshot
+from server.src.core.ports import BalanceRepository
+
+project_dir = Path(__file__).parents[3]
+BALANCES_DIR = Path(project_dir / "data" / "balances")
+
+ACCOUNT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class _Meta(msgspec.Struct, rename="camel"):
+    currency: str
+    balance_type: str
+
+
+class _Columns:
+    def __init__(self, meta: _Meta, timestamps: array, amounts: array):
+        self.meta = meta
+        self.timestamps = timestamps
+        self.amounts = amounts
+
+
+class FileBalanceRepository(BalanceRepository):
+    """Per account, one file of int64 timestamps and one of int64 amounts.
+
+    Appends add 8 bytes to each file, and reads slice the in-memory arrays
+    with a binary search on the timestamps. The currency and balance type of
+    the series are kept in a small JSON file next to the columns; snapshots
+    of another balance type are rejected, since their amounts are not
+    comparable with the stored ones.
+    """
+
+    def __init__(self, balance_dir: Path = BALANCES_DIR):
+        self.balance_dir = balance_dir
+        self._columns: Dict[str, _Columns] = {}
+        self._lock = asyncio.Lock()
+
+    async def append_snapshot(self, account_id: str, snapshot: BalanceSnapshot) -> None:
+        async with self._lock:
+            columns = self._load(account_id)
+            if (
+                columns
+                and columns.timestamps
+                and (snapshot.timestamp < columns.timestamps[-1])
+            ):
+                raise ValueError(
+                    f"Balance snapshot for {account_id} is older than the last one"
+                )
+            if (
+                columns
+                and columns.timestamps
+                and snapshot.balance_type != columns.meta.balance_type
+            ):
+                raise ValueError(
+                    f"Balance snapshot for {account_id} is {snapshot.balance_type}, "
+                    f"but the series is {columns.meta.balance_type}"
+                )
+
+            self.balance_dir.mkdir(parents=True, exist_ok=True)
+            meta = _Meta(currency=snapshot.currency, balance_type=snapshot.balance_type)
+            if columns is None or columns.meta != meta:
+                self._path(account_id, "json").write_bytes(msgspec.json.encode(meta))
+            with open(self._path(account_id, "ts"), "ab") as f:
+                array("q", [snapshot.timestamp]).tofile(f)
+            with open(self._path(account_id, "amt"), "ab") as f:
+                array("q", [snapshot.amount]).tofile(f)
+
+            if columns is None:
+                columns = self._columns[account_id] = _Columns(
+                    meta, array("q"), array("q")
+                )
+            columns.meta = meta
+            columns.timestamps.append(snapshot.timestamp)
+            columns.amounts.append(snapshot.amount)
+
+    async def load_series(
+        self,
+        account_id: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> Optional[BalanceSeries]:
+        async with self._lock:
+            columns = self._load(account_id)
+        if columns is None:
+            return None
+
+        start = bisect_left(columns.timestamps, since) if since is not None else 0
+        end = (
+            bisect_left(columns.timestamps, until)
+            if until is not None
+            else len(columns.timestamps)
+        )
+        return BalanceSeries(
+            currency=columns.meta.currency,
+            balance_type=columns.meta.balance_type,
+            timestamps=columns.timestamps[start:end].tolist(),
+            amounts=columns.amounts[start:end].tolist(),
+        )
+
+    def _load(self, account_id: str) -> Optional[_Columns]:
+        if not ACCOUNT_ID_PATTERN.match(account_id):
+            raise ValueError(f"Invalid account ID: {account_id!r}")
+        if account_id in self._columns:
+            return self._columns[account_id]
+
+        meta_path = self._path(account_id, "json")
+        if not meta_path.exists():
+            return None
+        meta = msgspec.json.decode(meta_path.read_bytes(), type=_Meta)
+        timestamps, amounts = array("q"), array("q")
+        for column, suffix in ((timestamps, "ts"), (amounts, "amt")):
+            path = self._path(account_id, suffix)
+            if path.exists():
+                data = path.read_bytes()
+                column.frombytes(data[: len(data) - len(data) % column.itemsize])
+
+        # A crash mid-append can leave one column longer than the other, or a
+        # torn value; cut both back so that later appends stay aligned
+        size = min(len(timestamps), len(amounts))
+        del timestamps[size:], amounts[size:]
+        for column, suffix in ((timestamps, "ts"), (amounts, "amt")):
+            path = self._path(account_id, suffix)
+            if path.exists() and path.stat().st_size != size * column.itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(size * column.itemsize)
+
+        columns = self._columns[account_id] = _Columns(meta, timestamps, amounts)
+        return columns
+
+    def _path(self, account_id: str, suffix: str) -> Path:
+        return self.balance_dir / f"{account_id}.{suffix}"
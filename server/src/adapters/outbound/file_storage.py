@@ -1,18 +1,43 @@
 """File-based storage adapter implementations."""
 
 import json
+import re
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from server.src.core.domain import AccountLink, AccountStatus, RateLimit
+import msgspec
+
+from server.src.core.domain import (
+    DEFAULT_TENANT_ID,
+    AccountActivity,
+    AccountLink,
+    AccountStatus,
+    NormalizationRule,
+    RateLimit,
+    SyncRun,
+    SyncRunRollup,
+    Tenant,
+)
 from server.src.core.ports.repositories import (
+    AccountActivityRepository,
     AccountLinkRepository,
+    NormalizationRuleRepository,
+    SyncRunRepository,
     SyncStatusRepository,
+    TenantRepository,
 )
+from server.src.core.services.run_history import roll_up
 
 project_dir = Path(__file__).parents[3]
+DATA_DIR = Path(project_dir / "data")
+TENANTS_FILE = Path(DATA_DIR / "tenants.json")
 LINKS_FILE = Path(project_dir / "data" / "account-links.json")
 SYNC_STATUS_FILE = Path(project_dir / "data" / "sync-status.json")
+RULES_DIR = Path(project_dir / "data" / "rules")
+ACTIVITY_FILE = Path(project_dir / "data" / "account-activity.json")
+SYNC_RUNS_FILE = Path(project_dir / "data" / "sync-runs.jsonl")
+SYNC_ROLLUPS_FILE = Path(project_dir / "data" / "sync-rollups.json")
 
 
 class FileAccountLinkRepository(AccountLinkRepository):
@@ -98,6 +123,112 @@ class FileAccountLinkRepository(AccountLinkRepository):
             json.dump(data, f, indent=2)
 
 
+class IndexedAccountLinkRepository(FileAccountLinkRepository):
+    """Account links held in memory, indexed by both account IDs.
+
+    Reads are served from the indexes, which are reloaded only when the file
+    changes on disk. Every change, or batch of changes, is one atomic write.
+    """
+
+    def __init__(self, file_path: Path = LINKS_FILE):
+        super().__init__(file_path)
+        self._lock = threading.Lock()
+        self._by_gocardless: Dict[str, AccountLink] = {}
+        self._by_lunchmoney: Dict[int, AccountLink] = {}
+        self._loaded_mtime: Optional[int] = None
+
+    async def load_links(self, account_id: Optional[str] = None) -> List[AccountLink]:
+        try:
+            with self._lock:
+                self._refresh()
+                if account_id:
+                    link = self._by_gocardless.get(account_id)
+                    return [link] if link else []
+                return list(self._by_gocardless.values())
+        except Exception as e:
+            raise Exception(f"Error reading links: {str(e)}")
+
+    def save_link(self, link: AccountLink) -> None:
+        try:
+            self.apply_changes([link], [])
+        except Exception as e:
+            raise Exception(f"Error saving link: {str(e)}")
+
+    def remove_link(self, lunchmoney_id: int, gocardless_id: str) -> None:
+        try:
+            self.apply_changes([], [(lunchmoney_id, gocardless_id)])
+        except Exception as e:
+            raise Exception(f"Error removing link: {str(e)}")
+
+    def apply_changes(
+        self, links: List[AccountLink], unlinks: List[Tuple[int, str]]
+    ) -> None:
+        with self._lock:
+            self._refresh()
+            # Changes go to copies, so a failed write leaves the indexes as is
+            by_gocardless = dict(self._by_gocardless)
+            by_lunchmoney = dict(self._by_lunchmoney)
+
+            for lunchmoney_id, gocardless_id in unlinks:
+                link = by_gocardless.get(gocardless_id)
+                if link and link.lunchmoney_id == lunchmoney_id:
+                    del by_gocardless[gocardless_id]
+                    del by_lunchmoney[lunchmoney_id]
+
+            for link in links:
+                # An account is linked at most once on either side
+                for old in (
+                    by_gocardless.pop(link.gocardless_id, None),
+                    by_lunchmoney.pop(link.lunchmoney_id, None),
+                ):
+                    if old:
+                        by_gocardless.pop(old.gocardless_id, None)
+                        by_lunchmoney.pop(old.lunchmoney_id, None)
+                by_gocardless[link.gocardless_id] = link
+                by_lunchmoney[link.lunchmoney_id] = link
+
+            self._write_atomic(list(by_gocardless.values()))
+            self._by_gocardless = by_gocardless
+            self._by_lunchmoney = by_lunchmoney
+
+    def _refresh(self) -> None:
+        mtime = self.file_path.stat().st_mtime_ns if self.file_path.exists() else None
+        if self._loaded_mtime is not None and mtime == self._loaded_mtime:
+            return
+        links = [
+            AccountLink(
+                lunchmoney_id=link["lunchmoneyId"],
+                gocardless_id=link["gocardlessId"],
+                created_at=link["createdAt"],
+            )
+            for link in self._read_links()["links"]
+        ]
+        self._by_gocardless = {link.gocardless_id: link for link in links}
+        self._by_lunchmoney = {link.lunchmoney_id: link for link in links}
+        self._loaded_mtime = mtime
+
+    def _write_atomic(self, links: List[AccountLink]) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_path.with_suffix(self.file_path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "links": [
+                        {
+                            "lunchmoneyId": link.lunchmoney_id,
+                            "gocardlessId": link.gocardless_id,
+                            "createdAt": link.created_at,
+                        }
+                        for link in links
+                    ]
+                },
+                f,
+                indent=2,
+            )
+        tmp_path.replace(self.file_path)
+        self._loaded_mtime = self.file_path.stat().st_mtime_ns
+
+
 class FileSyncStatusRepository(SyncStatusRepository):
     def __init__(self, file_path: Path = SYNC_STATUS_FILE):
         self.file_path = file_path
@@ -169,3 +300,227 @@ class FileSyncStatusRepository(SyncStatusRepository):
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(self.file_path, "w") as f:
             json.dump(status, f, indent=2)
+
+
+class FileAccountActivityRepository(AccountActivityRepository):
+    def __init__(self, file_path: Path = ACTIVITY_FILE):
+        self.file_path = file_path
+
+    async def load_activity(self) -> Dict[str, AccountActivity]:
+        return {
+            account_id: AccountActivity(
+                transactions_per_day=activity.get("transactionsPerDay", 0.0),
+                updated_at=activity.get("updatedAt"),
+                interval_override_hours=activity.get("intervalOverrideHours"),
+            )
+            for account_id, activity in self._read().items()
+        }
+
+    async def save_activity(self, account_id: str, activity: AccountActivity) -> None:
+        data = self._read()
+        data[account_id] = {
+            "transactionsPerDay": activity.transactions_per_day,
+            "updatedAt": activity.updated_at,
+            "intervalOverrideHours": activity.interval_override_hours,
+        }
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def _read(self) -> dict:
+        if not self.file_path.exists():
+            return {}
+        with open(self.file_path) as f:
+            return json.load(f)
+
+
+class FileSyncRunRepository(SyncRunRepository):
+    """Appends runs to a JSONL file; compaction moves them into daily rollups."""
+
+    _run_decoder = msgspec.json.Decoder(SyncRun)
+    _rollups_decoder = msgspec.json.Decoder(list[SyncRunRollup])
+    _encoder = msgspec.json.Encoder()
+
+    def __init__(
+        self, runs_file: Path = SYNC_RUNS_FILE, rollups_file: Path = SYNC_ROLLUPS_FILE
+    ):
+        self.runs_file = runs_file
+        self.rollups_file = rollups_file
+
+    async def append_runs(self, runs: List[SyncRun]) -> None:
+        if not runs:
+            return
+        self.runs_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.runs_file, "ab") as f:
+            f.write(b"".join(self._encoder.encode(run) + b"\n" for run in runs))
+
+    async def load_runs(
+        self, account_id: Optional[str] = None, since: Optional[str] = None
+    ) -> List[SyncRun]:
+        return [
+            run
+            for run in self._read_runs()
+            if (account_id is None or run.account_id == account_id)
+            and (since is None or run.started_at >= since)
+        ]
+
+    async def load_rollups(
+        self, account_id: Optional[str] = None, since: Optional[str] = None
+    ) -> List[SyncRunRollup]:
+        return [
+            rollup
+            for rollup in self._read_rollups()
+            if (account_id is None or rollup.account_id == account_id)
+            and (since is None or rollup.day >= since[:10])
+        ]
+
+    async def compact(self, before: str) -> None:
+        runs = self._read_runs()
+        old = [run for run in runs if run.started_at < before]
+        if not old:
+            return
+
+        rollups = roll_up(old, self._read_rollups())
+        self._write_atomic(self.rollups_file, self._encoder.encode(rollups))
+        kept = [run for run in runs if run.started_at >= before]
+        self._write_atomic(
+            self.runs_file,
+            b"".join(self._encoder.encode(run) + b"\n" for run in kept),
+        )
+
+    def _read_runs(self) -> List[SyncRun]:
+        if not self.runs_file.exists():
+            return []
+        with open(self.runs_file, "rb") as f:
+            return [self._run_decoder.decode(line) for line in f if line.strip()]
+
+    def _read_rollups(self) -> List[SyncRunRollup]:
+        if not self.rollups_file.exists():
+            return []
+        with open(self.rollups_file, "rb") as f:
+            return self._rollups_decoder.decode(f.read())
+
+    @staticmethod
+    def _write_atomic(file_path: Path, data: bytes) -> None:
+        # Each file is replaced whole and rollups are written before runs are
+        # dropped, so a crash in between can double count runs but not lose them
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        tmp_path.replace(file_path)
+
+
+class FileNormalizationRuleRepository(NormalizationRuleRepository):
+    """Reads rules from `default.json` and `<institution_id>.json` in a directory.
+
+    Each file holds `{"rules": [{"field": "payee", "pattern": "...",
+    "replacement": "", "ignoreCase": true}]}`.
+    """
+
+    def __init__(self, rules_dir: Path = RULES_DIR):
+        self.rules_dir = rules_dir
+
+    async def load_rules(
+        self, institution_id: Optional[str] = None
+    ) -> List[NormalizationRule]:
+        names = ["default"] + ([institution_id] if institution_id else [])
+        rules = []
+        for name in names:
+            file_path = self.rules_dir / f"{name}.json"
+            if not file_path.exists():
+                continue
+            try:
+                with open(file_path) as f:
+                    data = json.load(f)
+                rules.extend(
+                    NormalizationRule(
+                        field=rule["field"],
+                        pattern=rule["pattern"],
+                        replacement=rule.get("replacement", ""),
+                        ignore_case=rule.get("ignoreCase", True),
+                    )
+                    for rule in data["rules"]
+                )
+            except Exception as e:
+                raise Exception(f"Error reading rules from {file_path}: {str(e)}")
+        return rules
+
+
+_TENANT_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def tenant_data_dir(tenant_id: str) -> Path:
+    """Directory holding a tenant's links, statuses, rules and archive.
+
+    The default tenant keeps using the top-level data directory, so that a
+    single-tenant deployment needs no migration.
+    """
+    if tenant_id == DEFAULT_TENANT_ID:
+        return DATA_DIR
+    return DATA_DIR / "tenants" / tenant_id
+
+
+class FileTenantRepository(TenantRepository):
+    """Reads tenants from a JSON file.
+
+    The file holds `{"tenants": [{"id": "smith", "name": "...",
+    "gocardlessSecretId": "...", "gocardlessSecretKey": "...",
+    "lunchmoneyAccessToken": "..."}]}`. Without the file there is a single
+    default tenant whose credentials come from the environment. Only the
+    default tenant may leave credentials out; any other tenant would end up
+    on the default household's accounts.
+    """
+
+    def __init__(self, file_path: Path = TENANTS_FILE):
+        self.file_path = file_path
+        self._tenants: Optional[dict[str, Tenant]] = None
+
+    def load_tenants(self) -> List[Tenant]:
+        return list(self._load().values())
+
+    def get_tenant(self, tenant_id: str) -> Optional[Tenant]:
+        return self._load().get(tenant_id)
+
+    def _load(self) -> dict[str, Tenant]:
+        if self._tenants is not None:
+            return self._tenants
+
+        if not self.file_path.exists():
+            self._tenants = {DEFAULT_TENANT_ID: Tenant(id=DEFAULT_TENANT_ID)}
+            return self._tenants
+
+        try:
+            with open(self.file_path) as f:
+                data = json.load(f)
+            tenants = [
+                Tenant(
+                    id=tenant["id"],
+                    name=tenant.get("name"),
+                    gocardless_secret_id=tenant.get("gocardlessSecretId"),
+                    gocardless_secret_key=tenant.get("gocardlessSecretKey"),
+                    lunchmoney_access_token=tenant.get("lunchmoneyAccessToken"),
+                )
+                for tenant in data["tenants"]
+            ]
+        except Exception as e:
+            raise Exception(f"Error reading tenants: {str(e)}")
+
+        for tenant in tenants:
+            # Tenant IDs become directory names
+            if not _TENANT_ID.match(tenant.id):
+                raise ValueError(f"Invalid tenant ID: {tenant.id!r}")
+            missing = [
+                name
+                for name, value in (
+                    ("gocardlessSecretId", tenant.gocardless_secret_id),
+                    ("gocardlessSecretKey", tenant.gocardless_secret_key),
+                    ("lunchmoneyAccessToken", tenant.lunchmoney_access_token),
+                )
+                if not value
+            ]
+            if missing and tenant.id != DEFAULT_TENANT_ID:
+                raise ValueError(
+                    f"Tenant {tenant.id!r} is missing {', '.join(missing)}"
+                )
+        self._tenants = {tenant.id: tenant for tenant in tenants}
+        return self._tenants
@@ -3,18 +3,30 @@
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 import httpx
+import msgspec
 
-from server.src.core.domain import TokenInfo, Institution, Requisition
+from server.src.core.domain import (
+    BankTransactions,
+    TokenInfo,
+    Institution,
+    Requisition,
+)
 from server.src.core.ports import (
+    BalanceRepository,
     GoCardlessService,
+    TransactionArchive,
     TokenService,
     InstitutionService,
     RequisitionService,
 )
+from server.src.core.services.balances import snapshot_from_balances
+from server.src.core.tracing import set_attributes, span
+from .http import PooledHttpClient
 
 API_CONFIG = {
     "base_url": "https://bankaccountdata.gocardless.com/api/v2",
@@ -24,8 +36,44 @@ API_CONFIG = {
 logger = logging.getLogger(__name__)
 
 
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.getenv("GOCARDLESS_TIMEOUT", "30")),
+        connect=float(os.getenv("GOCARDLESS_CONNECT_TIMEOUT", "10")),
+    )
+
+
+class _TransactionsResponse(msgspec.Struct):
+    transactions: BankTransactions
+
+
+class _RequisitionsResponse(msgspec.Struct):
+    results: list[Requisition]
+
+
+# GoCardless serializes some numbers as strings, hence the lax decoding
+_transactions_decoder = msgspec.json.Decoder(_TransactionsResponse, strict=False)
+_institutions_decoder = msgspec.json.Decoder(list[Institution], strict=False)
+_requisitions_decoder = msgspec.json.Decoder(_RequisitionsResponse, strict=False)
+_requisition_decoder = msgspec.json.Decoder(Requisition, strict=False)
+
+
+def decode_transactions(raw: bytes) -> BankTransactions:
+    """Decode a raw transactions response body."""
+    return _transactions_decoder.decode(raw).transactions
+
+
 class GoCardlessTokenAdapter(TokenService):
-    def __init__(self):
+    def __init__(
+        self,
+        secret_id: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        env_fallback: bool = True,
+    ):
+        self.secret_id = secret_id
+        self.secret_key = secret_key
+        # Only the default tenant may use the credentials of the environment
+        self.env_fallback = env_fallback
         self.access_token = None
         self.refresh_token = None
         self.access_expires = None
@@ -55,7 +103,7 @@ class GoCardlessTokenAdapter(TokenService):
             return token_info.access_token
 
         try:
-            with httpx.Client() as client:
+            with httpx.Client(timeout=_timeout()) as client:
                 response = client.post(
                     f"{API_CONFIG['base_url']}/token/refresh/",
                     headers=API_CONFIG["headers"],
@@ -75,15 +123,19 @@ class GoCardlessTokenAdapter(TokenService):
             return token_info.access_token
 
     def create_token(self) -> TokenInfo:
+        secret_id, secret_key = self.secret_id, self.secret_key
+        if self.env_fallback:
+            secret_id = secret_id or os.getenv("GOCARDLESS_SECRET_ID")
+            secret_key = secret_key or os.getenv("GOCARDLESS_SECRET_KEY")
+        if not secret_id or not secret_key:
+            raise ValueError("GoCardless secrets are not set")
+
         try:
-            with httpx.Client() as client:
+            with httpx.Client(timeout=_timeout()) as client:
                 response = client.post(
                     f"{API_CONFIG['base_url']}/token/new/",
                     headers=API_CONFIG["headers"],
-                    json={
-                        "secret_id": os.getenv("GOCARDLESS_SECRET_ID"),
-                        "secret_key": os.getenv("GOCARDLESS_SECRET_KEY"),
-                    },
+                    json={"secret_id": secret_id, "secret_key": secret_key},
                 )
                 response.raise_for_status()
                 data = response.json()
@@ -109,21 +161,50 @@ class GoCardlessTokenAdapter(TokenService):
 
 
 class GoCardlessApiAdapter(GoCardlessService):
+    def __init__(
+        self,
+        http: Optional[PooledHttpClient] = None,
+        archive: Optional[TransactionArchive] = None,
+        balances: Optional[BalanceRepository] = None,
+    ):
+        self.http = http or PooledHttpClient(timeout=_timeout())
+        self.archive = archive
+        self.balances = balances
+        self.account_details_ttl = int(
+            os.getenv("GOCARDLESS_ACCOUNT_DETAILS_TTL", "86400")
+        )
+        self._account_details_cache: Dict[
+            str, tuple[float, tuple[Dict[str, Any], Dict[str, Any]]]
+        ] = {}
+
     async def get_account_details(
         self, account_id: str, access_token: str
     ) -> tuple[Dict[str, Any], Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_CONFIG['base_url']}/accounts/{account_id}/",
-                headers={
-                    **API_CONFIG["headers"],
-                    "Authorization": f"Bearer {access_token}",
-                },
-            )
-            rate_limits = await self._extract_rate_limits(response.headers)
-            response.raise_for_status()
-            account_details = response.json()
-            return account_details, rate_limits
+        cached = self._account_details_cache.get(account_id)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+
+        response = await self.http.client.get(
+            f"{API_CONFIG['base_url']}/accounts/{account_id}/",
+            headers={
+                **API_CONFIG["headers"],
+                "Authorization": f"Bearer {access_token}",
+            },
+        )
+        rate_limits = await self._extract_rate_limits(response.headers)
+        response.raise_for_status()
+        account_details = response.json()
+        if self.archive:
+            try:
+                await self.archive.save_account_details(account_id, response.content)
+            except Exception as e:
+                logger.warning(f"Error archiving details for {account_id}: {str(e)}")
+
+        self._account_details_cache[account_id] = (
+            time.monotonic() + self.account_details_ttl,
+            (account_details, rate_limits),
+        )
+        return account_details, rate_limits
 
     async def get_transactions(
         self,
@@ -131,25 +212,82 @@ class GoCardlessApiAdapter(GoCardlessService):
         access_token: str,
         from_date: str,
         to_date: Optional[str] = None,
-    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    ) -> tuple[BankTransactions, Dict[str, Any]]:
+        if self.balances and to_date is None:
+            # Regular syncs snapshot the balance too, so charts never hit
+            # GoCardless; it has its own rate limit, separate from transactions
+            result, _ = await asyncio.gather(
+                self._get_transactions(account_id, access_token, from_date, to_date),
+                self._snapshot_balance(account_id, access_token),
+            )
+            return result
+        return await self._get_transactions(
+            account_id, access_token, from_date, to_date
+        )
+
+    async def _get_transactions(
+        self,
+        account_id: str,
+        access_token: str,
+        from_date: str,
+        to_date: Optional[str],
+    ) -> tuple[BankTransactions, Dict[str, Any]]:
         url = f"{API_CONFIG['base_url']}/accounts/{account_id}/transactions/"
         headers = {"Authorization": f"Bearer {access_token}"}
         params = {"date_from": from_date} | ({"date_to": to_date} if to_date else {})
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url, headers=headers, params=params, follow_redirects=True
-            )
-            rate_limits = await self._extract_rate_limits(response.headers)
+        response = await self.http.client.get(
+            url, headers=headers, params=params, follow_redirects=True
+        )
+        rate_limits = await self._extract_rate_limits(response.headers)
+        set_attributes(http_status=response.status_code)
 
-            if response.status_code == 429:  # Too Many Requests
-                return {}, rate_limits
+        if response.status_code == 429:  # Too Many Requests
+            if rate_limits["remaining"] is None:
+                rate_limits["remaining"] = 0
+            return BankTransactions(), rate_limits
 
-            response.raise_for_status()
-            return response.json()["transactions"], rate_limits
+        response.raise_for_status()
+        await self._archive_transactions(
+            account_id, from_date, to_date, response.content
+        )
+        return decode_transactions(response.content), rate_limits
+
+    async def _snapshot_balance(self, account_id: str, access_token: str) -> None:
+        with span("gocardless.get_balances", gocardless_id=account_id):
+            try:
+                response = await self.http.client.get(
+                    f"{API_CONFIG['base_url']}/accounts/{account_id}/balances/",
+                    headers={
+                        **API_CONFIG["headers"],
+                        "Authorization": f"Bearer {access_token}",
+                    },
+                )
+                set_attributes(http_status=response.status_code)
+                if response.status_code == 429:
+                    return
+                response.raise_for_status()
+                snapshot = snapshot_from_balances(
+                    response.json().get("balances", []), datetime.now()
+                )
+                if snapshot:
+                    await self.balances.append_snapshot(account_id, snapshot)
+            except Exception as e:
+                logger.warning(f"Error fetching balances for {account_id}: {str(e)}")
+
+    async def _archive_transactions(
+        self, account_id: str, from_date: str, to_date: Optional[str], raw: bytes
+    ) -> None:
+        if not self.archive:
+            return
+        try:
+            await self.archive.append_transactions(account_id, from_date, to_date, raw)
+        except Exception as e:
+            logger.warning(f"Error archiving transactions for {account_id}: {str(e)}")
 
     # noinspection PyMethodMayBeStatic
     async def _extract_rate_limits(self, headers: httpx.Headers) -> Dict[str, Any]:
+        """The account's rate limit; counts a bank leaves out are None, unknown."""
         seconds_until_reset = int(
             headers.get("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_RESET", 0)
         )
@@ -160,113 +298,108 @@ class GoCardlessApiAdapter(GoCardlessService):
         )
         reset_timestamp = (datetime.now() + delta).isoformat()
 
+        limit = headers.get("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_LIMIT")
+        remaining = headers.get("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_REMAINING")
         return {
-            "limit": int(headers.get("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_LIMIT", 0)),
-            "remaining": int(
-                headers.get("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_REMAINING", 0)
-            ),
+            "limit": int(limit) if limit is not None else None,
+            "remaining": int(remaining) if remaining is not None else None,
             "reset": reset_timestamp,
         }
 
 
 class GoCardlessInstitutionAdapter(InstitutionService):
+    def __init__(
+        self,
+        token_service: Optional[TokenService] = None,
+        http: Optional[PooledHttpClient] = None,
+    ):
+        self.token_adapter = token_service or GoCardlessTokenAdapter()
+        self.http = http or PooledHttpClient(timeout=_timeout())
+
     async def get_institutions(self, country: str) -> list[Institution]:
-        token_adapter = GoCardlessTokenAdapter()
-        token = token_adapter.get_token()
+        token = self.token_adapter.get_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_CONFIG['base_url']}/institutions/?country={country}",
-                headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return [
-                Institution(
-                    id=inst["id"],
-                    name=inst["name"],
-                    bic=inst["bic"],
-                    transaction_total_days=inst["transaction_total_days"],
-                    countries=inst["countries"],
-                    logo=inst["logo"],
-                )
-                for inst in data
-            ]
+        response = await self.http.client.get(
+            f"{API_CONFIG['base_url']}/institutions/?country={country}",
+            headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        return _institutions_decoder.decode(response.content)
 
 
 class GoCardlessRequisitionAdapter(RequisitionService):
-    def __init__(self):
-        self.token_adapter = GoCardlessTokenAdapter()
+    def __init__(
+        self,
+        token_service: Optional[TokenService] = None,
+        http: Optional[PooledHttpClient] = None,
+    ):
+        self.token_adapter = token_service or GoCardlessTokenAdapter()
+        self.http = http or PooledHttpClient(timeout=_timeout())
+        self.gocardless_api = GoCardlessApiAdapter(http=self.http)
 
     async def get_requisitions(self) -> list[Requisition]:
         token = self.token_adapter.get_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_CONFIG['base_url']}/requisitions/",
-                headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await self.http.client.get(
+            f"{API_CONFIG['base_url']}/requisitions/",
+            headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        data = _requisitions_decoder.decode(response.content)
 
-            # Filter and sort requisitions
-            requisitions = [
-                Requisition(**req) for req in data["results"] if req["status"] == "LN"
-            ]
-            requisitions.sort(key=lambda x: datetime.fromisoformat(x.created))
-            return requisitions
+        # Filter and sort requisitions
+        requisitions = [req for req in data.results if req.status == "LN"]
+        requisitions.sort(key=lambda x: datetime.fromisoformat(x.created))
+        return requisitions
 
     async def get_requisition_details(self, requisition_id: str) -> Dict[str, Any]:
         async def extract_account_details(account_id, token):
-            details, _ = await gocardless_api.get_account_details(account_id, token)
+            details, _ = await self.gocardless_api.get_account_details(
+                account_id, token
+            )
             return details
 
         token = self.token_adapter.get_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_CONFIG['base_url']}/requisitions/{requisition_id}/",
-                headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            requisition = response.json()
-
-            # Get details for each account
-            gocardless_api = GoCardlessApiAdapter()
-            account_details = await asyncio.gather(
-                *[
-                    extract_account_details(account_id, token)
-                    for account_id in requisition["accounts"]
-                ]
-            )
+        response = await self.http.client.get(
+            f"{API_CONFIG['base_url']}/requisitions/{requisition_id}/",
+            headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        requisition = response.json()
+
+        # Get details for each account
+        account_details = await asyncio.gather(
+            *[
+                extract_account_details(account_id, token)
+                for account_id in requisition["accounts"]
+            ]
+        )
 
-            requisition["accounts"] = account_details
-            return requisition
+        requisition["accounts"] = account_details
+        return requisition
 
     async def create_requisition(self, params: Dict[str, Any]) -> Requisition:
         token = self.token_adapter.get_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_CONFIG['base_url']}/requisitions/",
-                headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
-                json={
-                    "institution_id": params["institution_id"],
-                    "redirect": params["redirect"],
-                    "reference": params["reference"],
-                    "user_language": params["user_language"],
-                },
-            )
-            response.raise_for_status()
-            return Requisition(**response.json())
+        response = await self.http.client.post(
+            f"{API_CONFIG['base_url']}/requisitions/",
+            headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
+            json={
+                "institution_id": params["institution_id"],
+                "redirect": params["redirect"],
+                "reference": params["reference"],
+                "user_language": params["user_language"],
+            },
+        )
+        response.raise_for_status()
+        return _requisition_decoder.decode(response.content)
 
     async def delete_requisition(self, requisition_id: str) -> None:
         token = self.token_adapter.get_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{API_CONFIG['base_url']}/requisitions/{requisition_id}/",
-                headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
+        response = await self.http.client.delete(
+            f"{API_CONFIG['base_url']}/requisitions/{requisition_id}/",
+            headers={**API_CONFIG["headers"], "Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
@@ -0,0 +1,42 @@
+"""Shared HTTP client handling for outbound adapters."""
+
+from typing import Any
+
+import httpx
+
+from server.src.core.tracing import increment_attribute
+
+
+async def _count_request(request: httpx.Request) -> None:
+    increment_attribute("http_calls")
+
+
+class PooledHttpClient:
+    """Lazily opened ``httpx.AsyncClient`` reused across an adapter's calls.
+
+    Every request is counted on the current span as ``http_calls``.
+    """
+
+    def __init__(self, **client_kwargs: Any):
+        event_hooks = client_kwargs.pop("event_hooks", {})
+        client_kwargs["event_hooks"] = {
+            **event_hooks,
+            "request": [*event_hooks.get("request", []), _count_request],
+        }
+        self._client_kwargs = client_kwargs
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+        return self._client
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
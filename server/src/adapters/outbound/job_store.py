@@ -0,0 +1,158 @@
+"""SQLite-backed APScheduler job store, so schedules survive restarts."""
+
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+project_dir = Path(__file__).parents[3]
+SCHEDULER_DB = Path(project_dir / "data" / "scheduler.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS apscheduler_jobs (
+    id TEXT PRIMARY KEY,
+    next_run_time REAL,
+    job_state BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS apscheduler_jobs_next_run_time
+    ON apscheduler_jobs (next_run_time);
+"""
+
+
+class SqliteJobStore(BaseJobStore):
+    """The table layout of APScheduler's SQLAlchemyJobStore, on stdlib sqlite3.
+
+    Job state is pickled, so jobs must refer to module-level functions.
+    The scheduler calls the store from its own thread as well as the event
+    loop; the calls are short, so one connection under a lock is enough.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = SCHEDULER_DB,
+        pickle_protocol: int = pickle.HIGHEST_PROTOCOL,
+    ):
+        super().__init__()
+        self.db_path = db_path
+        self.pickle_protocol = pickle_protocol
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def start(self, scheduler, alias) -> None:
+        super().start(scheduler, alias)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._connection = sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None
+            )
+            self._connection.executescript(_SCHEMA)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def lookup_job(self, job_id: str) -> Optional[Job]:
+        rows = self._fetch(
+            "SELECT job_state FROM apscheduler_jobs WHERE id = ?", (job_id,)
+        )
+        return self._reconstitute_job(rows[0][0]) if rows else None
+
+    def get_due_jobs(self, now) -> List[Job]:
+        return self._get_jobs(
+            "WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),)
+        )
+
+    def get_next_run_time(self):
+        rows = self._fetch(
+            "SELECT next_run_time FROM apscheduler_jobs"
+            " WHERE next_run_time IS NOT NULL ORDER BY next_run_time LIMIT 1"
+        )
+        return utc_timestamp_to_datetime(rows[0][0]) if rows else None
+
+    def get_all_jobs(self) -> List[Job]:
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job: Job) -> None:
+        try:
+            self._execute(
+                "INSERT INTO apscheduler_jobs (id, next_run_time, job_state)"
+                " VALUES (?, ?, ?)",
+                (
+                    job.id,
+                    datetime_to_utc_timestamp(job.next_run_time),
+                    self._state(job),
+                ),
+            )
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job: Job) -> None:
+        updated = self._execute(
+            "UPDATE apscheduler_jobs SET next_run_time = ?, job_state = ? WHERE id = ?",
+            (datetime_to_utc_timestamp(job.next_run_time), self._state(job), job.id),
+        )
+        if updated == 0:
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id: str) -> None:
+        removed = self._execute("DELETE FROM apscheduler_jobs WHERE id = ?", (job_id,))
+        if removed == 0:
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self) -> None:
+        self._execute("DELETE FROM apscheduler_jobs")
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a statement; the number of rows it changed."""
+        with self._lock:
+            return self._connection.execute(sql, params).rowcount
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[tuple]:
+        # Rows are read before the lock is released, not from a shared cursor
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _state(self, job: Job) -> bytes:
+        return pickle.dumps(job.__getstate__(), self.pickle_protocol)
+
+    def _reconstitute_job(self, job_state: bytes) -> Job:
+        state = pickle.loads(job_state)
+        state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, where: str = "", params: tuple = ()) -> List[Job]:
+        rows = self._fetch(
+            f"SELECT id, job_state FROM apscheduler_jobs {where}"
+            " ORDER BY next_run_time",
+            params,
+        )
+        jobs = []
+        failed_job_ids = []
+        for job_id, job_state in rows:
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except BaseException:
+                # The job's function may have been renamed or removed
+                self._logger.exception(
+                    f'Unable to restore job "{job_id}" -- removing it'
+                )
+                failed_job_ids.append(job_id)
+        for job_id in failed_job_ids:
+            self._execute("DELETE FROM apscheduler_jobs WHERE id = ?", (job_id,))
+        return jobs
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} (path={self.db_path})>"
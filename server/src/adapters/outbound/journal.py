@@ -0,0 +1,210 @@
+"""Write-ahead journal of Lunch Money upload batches."""
+
+import asyncio
+import fcntl
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Union
+
+import msgspec
+
+from server.src.core.domain import UploadBatch
+from server.src.core.ports import UploadJournal
+
+project_dir = Path(__file__).parents[3]
+UPLOAD_JOURNAL_FILE = Path(project_dir / "data" / "upload-journal.jsonl")
+
+
+class _Planned(msgspec.Struct, tag="plan"):
+    batch: UploadBatch
+
+
+class _Committed(msgspec.Struct, tag="commit"):
+    id: str
+    committed_at: str
+
+
+class _Failed(msgspec.Struct, tag="fail"):
+    id: str
+    failed_at: str
+    error: str
+
+
+_Record = Union[_Planned, _Committed, _Failed]
+_decoder = msgspec.json.Decoder(_Record)
+_encoder = msgspec.json.Encoder()
+
+
+class FileUploadJournal(UploadJournal):
+    """Append-only JSONL journal of `plan`, `commit` and `fail` records.
+
+    A plan is flushed to disk before its batch is uploaded, so a batch that
+    was interrupted shows up as pending after a crash. Committed batches are
+    kept for `retention_days` to guard against re-posting; the file is
+    rewritten without older ones once it holds `compact_after` records.
+
+    A batch that failed `max_attempts` times, or is still failing after
+    `retention_days`, is abandoned: it is no longer pending, and is listed
+    as abandoned for another `retention_days` before compaction drops it.
+
+    The per-account lock is an asyncio lock for the services of this
+    process and an `flock` on a file next to the journal for the others,
+    such as the CLI.
+    """
+
+    def __init__(
+        self,
+        file_path: Path = UPLOAD_JOURNAL_FILE,
+        retention_days: int = 7,
+        compact_after: int = 1000,
+        max_attempts: int = 5,
+    ):
+        self.file_path = file_path
+        self.retention_days = retention_days
+        self.compact_after = compact_after
+        self.max_attempts = max_attempts
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def plan(self, batch: UploadBatch) -> None:
+        self._append(_Planned(batch=batch))
+
+    async def commit(self, batch_id: str) -> None:
+        self._append(_Committed(id=batch_id, committed_at=datetime.now().isoformat()))
+        self._compact_if_full()
+
+    async def fail(self, batch_id: str, error: str) -> None:
+        self._append(
+            _Failed(id=batch_id, failed_at=datetime.now().isoformat(), error=error)
+        )
+        self._compact_if_full()
+
+    async def pending(self, account_id: Optional[str] = None) -> List[UploadBatch]:
+        return self._uncommitted(account_id, abandoned=False)
+
+    async def abandoned(self, account_id: Optional[str] = None) -> List[UploadBatch]:
+        return self._uncommitted(account_id, abandoned=True)
+
+    async def committed_external_ids(self, account_id: str) -> Set[str]:
+        batches, committed, _ = self._replay(self._read())
+        return {
+            transaction.external_id
+            for batch_id, batch in batches.items()
+            if batch_id in committed and batch.account_id == account_id
+            for transaction in batch.transactions
+        }
+
+    @asynccontextmanager
+    async def lock(self, account_id: str) -> AsyncIterator[None]:
+        async with self._locks.setdefault(account_id, asyncio.Lock()):
+            lock_dir = self.file_path.with_suffix(".locks")
+            lock_dir.mkdir(parents=True, exist_ok=True)
+            with open(lock_dir / f"{Path(account_id).name}.lock", "wb") as f:
+                # Polled, as a blocking flock can't be cancelled
+                while True:
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(0.05)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _uncommitted(
+        self, account_id: Optional[str], abandoned: bool
+    ) -> List[UploadBatch]:
+        batches, committed, failures = self._replay(self._read())
+        cutoff = self._cutoff()
+        return [
+            batch
+            for batch_id, batch in batches.items()
+            if batch_id not in committed
+            and (account_id is None or batch.account_id == account_id)
+            and (self._abandoned_at(batch, failures, cutoff) is not None) == abandoned
+        ]
+
+    def _abandoned_at(
+        self, batch: UploadBatch, failures: Dict[str, List[_Failed]], cutoff: str
+    ) -> Optional[str]:
+        """When an uncommitted batch was given up on, if it was.
+
+        Batches that never failed were interrupted, not rejected, and are
+        always resumed.
+        """
+        failed = failures.get(batch.id)
+        if failed and (len(failed) >= self.max_attempts or batch.created_at < cutoff):
+            return failed[-1].failed_at
+        return None
+
+    def _cutoff(self) -> str:
+        return (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+
+    @staticmethod
+    def _replay(
+        records: List[_Record],
+    ) -> tuple[Dict[str, UploadBatch], Dict[str, str], Dict[str, List[_Failed]]]:
+        batches: Dict[str, UploadBatch] = {}
+        committed: Dict[str, str] = {}
+        failures: Dict[str, List[_Failed]] = {}
+        for record in records:
+            if isinstance(record, _Planned):
+                batches.setdefault(record.batch.id, record.batch)
+            elif isinstance(record, _Committed):
+                committed[record.id] = record.committed_at
+            else:
+                failures.setdefault(record.id, []).append(record)
+        return batches, committed, failures
+
+    def _compact_if_full(self) -> None:
+        records = self._read()
+        if len(records) >= self.compact_after:
+            self._compact(records)
+
+    def _compact(self, records: List[_Record]) -> None:
+        batches, committed, failures = self._replay(records)
+        cutoff = self._cutoff()
+        kept: List[_Record] = []
+        for batch_id, batch in batches.items():
+            committed_at = committed.get(batch_id)
+            if committed_at is not None and committed_at < cutoff:
+                continue
+            if committed_at is None:
+                abandoned_at = self._abandoned_at(batch, failures, cutoff)
+                if abandoned_at is not None and abandoned_at < cutoff:
+                    continue
+            kept.append(_Planned(batch=batch))
+            if committed_at is not None:
+                kept.append(_Committed(id=batch_id, committed_at=committed_at))
+            else:
+                kept.extend(failures.get(batch_id, []))
+
+        tmp_path = self.file_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(_encoder.encode(record) + b"\n" for record in kept))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.file_path)
+
+    def _append(self, record: _Record) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, "ab") as f:
+            f.write(_encoder.encode(record) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self) -> List[_Record]:
+        if not self.file_path.exists():
+            return []
+        records = []
+        with open(self.file_path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(_decoder.decode(line))
+                except msgspec.DecodeError:
+                    # A torn last line from a crash mid-append; its upload
+                    # never started, or it is recovered through dedup
+                    continue
+        return records
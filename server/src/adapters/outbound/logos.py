@@ -0,0 +1,137 @@
+"""Content-addressed on-disk cache of institution logos."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from server.src.core.ports import LogoCache
+from .http import PooledHttpClient
+
+project_dir = Path(__file__).parents[3]
+LOGO_DIR = Path(project_dir / "data" / "logos")
+
+CONTENT_TYPES = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/svg+xml": "svg",
+}
+EXTENSIONS = {
+    extension: content_type for content_type, extension in CONTENT_TYPES.items()
+}
+_NAME = re.compile(r"^[0-9a-f]{64}\.(png|jpg|gif|webp|svg)$")
+
+logger = logging.getLogger(__name__)
+
+
+class FileLogoCache(LogoCache):
+    """Stores each logo once as `<sha256>.<ext>`.
+
+    `index.json` maps source URLs to stored names, so a logo is downloaded
+    only the first time it is requested. Only URLs registered from an
+    institutions listing can be fetched, so the proxy cannot be pointed at
+    arbitrary hosts; registered URLs are appended to `sources.jsonl`, so
+    their keys still resolve after a restart.
+    """
+
+    def __init__(
+        self, logo_dir: Path = LOGO_DIR, http: Optional[PooledHttpClient] = None
+    ):
+        self.logo_dir = logo_dir
+        self.http = http or PooledHttpClient(
+            timeout=httpx.Timeout(10.0), follow_redirects=True
+        )
+        self._index: Optional[Dict[str, str]] = None
+        self._sources: Optional[Dict[str, str]] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def register(self, url: str) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()[:32]
+        sources = self._load_sources()
+        if key not in sources:
+            sources[key] = url
+            self.logo_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.logo_dir / "sources.jsonl", "a") as f:
+                f.write(json.dumps({"key": key, "url": url}) + "\n")
+        return key
+
+    def cached(self, url: str) -> Optional[str]:
+        return self._load_index().get(url)
+
+    async def fetch(self, key: str) -> Optional[str]:
+        url = self._load_sources().get(key)
+        if url is None:
+            return None
+
+        # Concurrent requests for the same logo share one download
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if name := self.cached(url):
+                return name
+
+            response = await self.http.client.get(url)
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").split(";")[0]
+            extension = CONTENT_TYPES.get(content_type.strip().lower())
+            if extension is None:
+                raise ValueError(f"Unsupported logo content type: {content_type!r}")
+
+            content = response.content
+            name = f"{hashlib.sha256(content).hexdigest()}.{extension}"
+            file_path = self.logo_dir / name
+            if not file_path.exists():
+                self._write_atomic(file_path, content)
+
+            index = self._load_index()
+            index[url] = name
+            self._write_atomic(
+                self.logo_dir / "index.json", json.dumps(index, indent=2).encode()
+            )
+            self._locks.pop(key, None)
+            return name
+
+    def load(self, name: str) -> Optional[tuple[bytes, str]]:
+        if not _NAME.match(name):
+            return None
+        file_path = self.logo_dir / name
+        if not file_path.exists():
+            return None
+        return file_path.read_bytes(), EXTENSIONS[name.rsplit(".", 1)[1]]
+
+    def _load_index(self) -> Dict[str, str]:
+        if self._index is None:
+            index_path = self.logo_dir / "index.json"
+            try:
+                self._index = (
+                    json.loads(index_path.read_text()) if index_path.exists() else {}
+                )
+            except Exception as e:
+                logger.warning(f"Error reading logo index, starting empty: {str(e)}")
+                self._index = {}
+        return self._index
+
+    def _load_sources(self) -> Dict[str, str]:
+        if self._sources is None:
+            self._sources = {}
+            sources_path = self.logo_dir / "sources.jsonl"
+            if sources_path.exists():
+                for line in sources_path.read_text().splitlines():
+                    try:
+                        source = json.loads(line)
+                        self._sources[source["key"]] = source["url"]
+                    except (ValueError, KeyError):
+                        # A torn last line from a crash mid-append
+                        continue
+        return self._sources
+
+    def _write_atomic(self, file_path: Path, data: bytes) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(file_path)
@@ -1,21 +1,81 @@
 """Lunch Money API adapter implementation."""
 
+import asyncio
 import os
-from typing import Any, Dict, List
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import httpx
+import msgspec
 
-from server.src.core.domain.models import Transaction
+from server.src.core.domain.models import LunchMoneyTransaction, Transaction
 from server.src.core.ports.services import LunchMoneyService
+from server.src.core.resilience import AdaptiveLimiter
+from server.src.core.tracing import set_attributes, span
+from .http import PooledHttpClient
 
 LUNCHMONEY_API_URL = "https://dev.lunchmoney.app/v1"
 
 
+class _AssetsResponse(msgspec.Struct):
+    # Assets are passed through to the frontend as-is
+    assets: list[dict[str, Any]]
+
+
+class _TransactionsResponse(msgspec.Struct):
+    # Decoding into LunchMoneyTransaction keeps only the fields dedup needs
+    transactions: list[LunchMoneyTransaction] = []
+    has_more: bool = False
+
+
+class _CreateTransactionsRequest(msgspec.Struct):
+    transactions: list[Transaction]
+    check_for_recurring: bool = True
+    debit_as_negative: bool = True
+
+
+_assets_decoder = msgspec.json.Decoder(_AssetsResponse)
+_transactions_decoder = msgspec.json.Decoder(_TransactionsResponse, strict=False)
+_encoder = msgspec.json.Encoder()
+
+
 class LunchMoneyApiAdapter(LunchMoneyService):
-    def __init__(self):
-        self.api_key = os.getenv("LUNCHMONEY_ACCESS_TOKEN")
-        if not self.api_key:
-            raise ValueError("LUNCHMONEY_ACCESS_TOKEN is not set")
+    def __init__(
+        self,
+        http: Optional[PooledHttpClient] = None,
+        access_token: Optional[str] = None,
+        env_fallback: bool = True,
+    ):
+        self.access_token = access_token
+        # Only the default tenant may use the credentials of the environment
+        self.env_fallback = env_fallback
+        self.http = http or PooledHttpClient(
+            timeout=httpx.Timeout(
+                float(os.getenv("LUNCHMONEY_TIMEOUT", "30")),
+                connect=float(os.getenv("LUNCHMONEY_CONNECT_TIMEOUT", "10")),
+            )
+        )
+        self.assets_ttl = int(os.getenv("LUNCHMONEY_ASSETS_TTL", "60"))
+        self.page_size = int(os.getenv("LUNCHMONEY_PAGE_SIZE", "1000"))
+        self.page_concurrency = int(os.getenv("LUNCHMONEY_PAGE_CONCURRENCY", "4"))
+        # Lunch Money throttles per access token, so all calls share one limit
+        self.limiter = AdaptiveLimiter(
+            initial=int(os.getenv("LUNCHMONEY_CONCURRENCY", "4")),
+            max_limit=int(os.getenv("LUNCHMONEY_MAX_CONCURRENCY", "16")),
+            latency_target=float(os.getenv("LUNCHMONEY_LATENCY_TARGET_MS", "5000"))
+            / 1000,
+        )
+        self.throttle_retries = int(os.getenv("LUNCHMONEY_THROTTLE_RETRIES", "3"))
+        self._assets_cache: Optional[tuple[float, List[Dict[str, Any]]]] = None
+
+    @property
+    def api_key(self) -> str:
+        api_key = self.access_token or (
+            os.getenv("LUNCHMONEY_ACCESS_TOKEN") if self.env_fallback else None
+        )
+        if not api_key:
+            raise ValueError("Lunch Money access token is not set")
+        return api_key
 
     def _get_headers(self) -> Dict[str, str]:
         return {
@@ -24,36 +84,79 @@ class LunchMoneyApiAdapter(LunchMoneyService):
         }
 
     async def get_assets(self) -> List[Dict[str, Any]]:
+        if self._assets_cache and time.monotonic() < self._assets_cache[0]:
+            return self._assets_cache[1]
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
+            response = await self._send(
+                lambda: self.http.client.get(
                     f"{LUNCHMONEY_API_URL}/assets/",
                     headers=self._get_headers(),
                 )
-                response.raise_for_status()
-                return response.json()["assets"]
+            )
+            response.raise_for_status()
+            assets = _assets_decoder.decode(response.content).assets
+            self._assets_cache = (time.monotonic() + self.assets_ttl, assets)
+            return assets
         except Exception as e:
             raise Exception(f"Error fetching Lunchmoney assets: {str(e)}")
 
     async def get_transactions(
         self, asset_id: int, start_date: str, end_date: str
-    ) -> List[Dict[str, Any]]:
+    ) -> List[LunchMoneyTransaction]:
+        """Fetch every page of an asset's transactions in the date range.
+
+        The first page tells whether more exist; the rest are then fetched
+        `page_concurrency` pages at a time, fewer while the adaptive limit is
+        lower, until a page comes back short.
+        """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{LUNCHMONEY_API_URL}/transactions",
-                    headers=self._get_headers(),
-                    params={
-                        "asset_id": asset_id,
-                        "start_date": start_date,
-                        "end_date": end_date,
-                    },
+            params = {
+                "asset_id": asset_id,
+                "start_date": start_date,
+                "end_date": end_date,
+            }
+            page = await self._get_transactions_page(params, 0)
+            transactions = list(page.transactions)
+            pages = 1
+
+            offset = self.page_size
+            while self._has_more(page):
+                width = max(1, min(self.page_concurrency, int(self.limiter.limit)))
+                offsets = [offset + i * self.page_size for i in range(width)]
+                batch = await asyncio.gather(
+                    *(self._get_transactions_page(params, o) for o in offsets)
                 )
-                response.raise_for_status()
-                return response.json().get("transactions", [])
+                for page in batch:
+                    transactions.extend(page.transactions)
+                    pages += 1
+                    if not self._has_more(page):
+                        break
+                offset += len(offsets) * self.page_size
+
+            set_attributes(pages=pages)
+            return transactions
         except Exception as e:
             raise Exception(f"Error fetching transactions: {str(e)}")
 
+    async def _get_transactions_page(
+        self, params: Dict[str, Any], offset: int
+    ) -> _TransactionsResponse:
+        response = await self._send(
+            lambda: self.http.client.get(
+                f"{LUNCHMONEY_API_URL}/transactions",
+                headers=self._get_headers(),
+                params={**params, "limit": self.page_size, "offset": offset},
+            )
+        )
+        set_attributes(http_status=response.status_code)
+        response.raise_for_status()
+        return _transactions_decoder.decode(response.content)
+
+    def _has_more(self, page: _TransactionsResponse) -> bool:
+        # Older API responses omit has_more; a full page may be followed by more
+        return page.has_more or len(page.transactions) >= self.page_size
+
     async def create_transactions(
         self, transactions: List[Transaction]
     ) -> List[Dict[str, Any]]:
@@ -61,27 +164,60 @@ class LunchMoneyApiAdapter(LunchMoneyService):
             return []
 
         try:
-            all_responses = []
-            for batch in self._batch_transactions(transactions):
-                data = {
-                    "transactions": [self._transform_transaction(tx) for tx in batch],
-                    "check_for_recurring": True,
-                    "debit_as_negative": True,
-                }
-
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{LUNCHMONEY_API_URL}/transactions/",
-                        headers=self._get_headers(),
-                        json=data,
+            # Batches go out side by side, as far as the adaptive limit allows
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._create_batch(index, batch)
+                        for index, batch in enumerate(
+                            self._batch_transactions(transactions)
+                        )
                     )
-                    response.raise_for_status()
-                    all_responses.append(response.json())
-
-            return all_responses
+                )
+            )
         except Exception as e:
             raise Exception(f"Error creating transactions: {str(e)}")
 
+    async def _create_batch(
+        self, index: int, batch: List[Transaction]
+    ) -> Dict[str, Any]:
+        content = _encoder.encode(_CreateTransactionsRequest(transactions=batch))
+        with span("lunchmoney.create_transactions", batch=index, size=len(batch)):
+            response = await self._send(
+                lambda: self.http.client.post(
+                    f"{LUNCHMONEY_API_URL}/transactions/",
+                    headers=self._get_headers(),
+                    content=content,
+                )
+            )
+            set_attributes(http_status=response.status_code)
+            response.raise_for_status()
+            return response.json()
+
+    async def _send(
+        self, request: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """Send a request within the adaptive limit.
+
+        429s, 5xx responses and transport errors cut the limit. Only a 429 is
+        sent again, after Retry-After and up to `throttle_retries` times, as
+        Lunch Money did not process it; the last response is returned as is.
+        """
+        for attempt in range(self.throttle_retries + 1):
+            async with self.limiter.slot() as sample:
+                try:
+                    response = await request()
+                except httpx.TransportError:
+                    sample.congested = True
+                    raise
+                sample.congested = (
+                    response.status_code == 429 or response.status_code >= 500
+                )
+            set_attributes(concurrency_limit=round(self.limiter.limit, 2))
+            if response.status_code != 429 or attempt == self.throttle_retries:
+                return response
+            await asyncio.sleep(_retry_after(response, attempt))
+
     def _batch_transactions(
         self, transactions: List[Transaction], batch_size: int = 500
     ):
@@ -89,15 +225,9 @@ class LunchMoneyApiAdapter(LunchMoneyService):
         for i in range(0, len(transactions), batch_size):
             yield transactions[i : i + batch_size]
 
-    def _transform_transaction(self, transaction: Transaction) -> Dict[str, Any]:
-        """Transform a Transaction model to Lunch Money API format."""
-        return {
-            "date": transaction.date,
-            "amount": transaction.amount,
-            "currency": transaction.currency,
-            "payee": transaction.payee,
-            "notes": transaction.notes,
-            "asset_id": transaction.asset_id,
-            "external_id": transaction.external_id,
-            "status": transaction.status,
-        }
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    try:
+        return min(float(response.headers["Retry-After"]), 60.0)
+    except (KeyError, ValueError):
+        return min(2.0**attempt, 60.0)
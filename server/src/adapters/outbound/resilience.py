@@ -0,0 +1,219 @@
+"""Circuit-breaking wrappers around the outbound service adapters."""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import httpx
+
+from server.src.core.domain import Institution, Requisition, TokenInfo, Transaction
+from server.src.core.ports import (
+    GoCardlessService,
+    InstitutionService,
+    LunchMoneyService,
+    RequisitionService,
+    TokenService,
+)
+from server.src.core.resilience import CircuitBreaker, CircuitOpenError, mark_stale
+
+logger = logging.getLogger(__name__)
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an error means the upstream is unhealthy, not that we asked wrong.
+
+    Adapters re-raise errors as plain exceptions, so the implicit exception
+    chain is searched for the underlying httpx error.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (CircuitOpenError, TimeoutError)):
+            return True
+        if isinstance(current, httpx.TransportError):
+            return True
+        if isinstance(current, httpx.HTTPStatusError):
+            status_code = current.response.status_code
+            return status_code >= 500 or status_code == 429
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class _Resilient:
+    """Routes calls through a breaker and remembers last known-good results."""
+
+    def __init__(self, inner: Any, breakers: Dict[str, CircuitBreaker]):
+        self.inner = inner
+        self.breakers = breakers
+        self._last_good: Dict[Hashable, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped adapter's attributes, such as its HTTP pool
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def _call(
+        self,
+        family: str,
+        stale_key: Optional[Hashable],
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+    ) -> Any:
+        breaker = self.breakers[family]
+        if not breaker.allow_request():
+            return self._stale_or_raise(
+                stale_key, CircuitOpenError(f"Circuit for {family} is open")
+            )
+
+        try:
+            result = await fn(*args)
+        except Exception as e:
+            if not is_upstream_failure(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            logger.warning(f"{family} call failed ({breaker.state}): {str(e)}")
+            return self._stale_or_raise(stale_key, e)
+        except BaseException:
+            # Cancelled, e.g. by the account deadline; says nothing of upstream
+            breaker.release_probe()
+            raise
+
+        breaker.record_success()
+        if stale_key is not None:
+            self._last_good[stale_key] = result
+        return result
+
+    def _stale_or_raise(self, stale_key: Optional[Hashable], error: Exception) -> Any:
+        if stale_key is not None and stale_key in self._last_good:
+            mark_stale()
+            return self._last_good[stale_key]
+        raise error
+
+
+class ResilientTokenService(_Resilient, TokenService):
+    def _call_sync(self, fn: Callable[[], Any]) -> Any:
+        breaker = self.breakers["gocardless.token"]
+        if not breaker.allow_request():
+            raise CircuitOpenError("Circuit for gocardless.token is open")
+        try:
+            result = fn()
+        except Exception as e:
+            if is_upstream_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        return result
+
+    def get_token(self) -> str:
+        return self._call_sync(self.inner.get_token)
+
+    def refresh_token(self) -> str:
+        return self._call_sync(self.inner.refresh_token)
+
+    def create_token(self) -> TokenInfo:
+        return self._call_sync(self.inner.create_token)
+
+
+class ResilientGoCardlessService(_Resilient, GoCardlessService):
+    async def get_account_details(
+        self, account_id: str, access_token: Optional[str]
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        key = ("account_details", account_id)
+        if access_token is None:
+            # No token could be obtained: only known-good data can be served
+            return self._stale_or_raise(
+                key, CircuitOpenError("No GoCardless token available")
+            )
+        return await self._call(
+            "gocardless.accounts",
+            key,
+            self.inner.get_account_details,
+            account_id,
+            access_token,
+        )
+
+    async def get_transactions(
+        self,
+        account_id: str,
+        access_token: str,
+        from_date: str,
+        to_date: Optional[str] = None,
+    ):
+        # Never served stale: a sync must not act on outdated bank data
+        return await self._call(
+            "gocardless.accounts",
+            None,
+            self.inner.get_transactions,
+            account_id,
+            access_token,
+            from_date,
+            to_date,
+        )
+
+
+class ResilientInstitutionService(_Resilient, InstitutionService):
+    async def get_institutions(self, country: str) -> list[Institution]:
+        return await self._call(
+            "gocardless.institutions",
+            ("institutions", country),
+            self.inner.get_institutions,
+            country,
+        )
+
+
+class ResilientRequisitionService(_Resilient, RequisitionService):
+    async def get_requisitions(self) -> list[Requisition]:
+        return await self._call(
+            "gocardless.requisitions", "requisitions", self.inner.get_requisitions
+        )
+
+    async def get_requisition_details(self, requisition_id: str) -> Dict[str, Any]:
+        return await self._call(
+            "gocardless.requisitions",
+            ("requisition", requisition_id),
+            self.inner.get_requisition_details,
+            requisition_id,
+        )
+
+    async def create_requisition(self, params: Dict[str, Any]) -> Requisition:
+        return await self._call(
+            "gocardless.requisitions", None, self.inner.create_requisition, params
+        )
+
+    async def delete_requisition(self, requisition_id: str) -> None:
+        return await self._call(
+            "gocardless.requisitions",
+            None,
+            self.inner.delete_requisition,
+            requisition_id,
+        )
+
+
+class ResilientLunchMoneyService(_Resilient, LunchMoneyService):
+    async def get_assets(self) -> List[Dict[str, Any]]:
+        return await self._call("lunchmoney", "assets", self.inner.get_assets)
+
+    async def get_transactions(self, asset_id: int, start_date: str, end_date: str):
+        # Dedup reads must be current, so they are never served stale
+        return await self._call(
+            "lunchmoney",
+            None,
+            self.inner.get_transactions,
+            asset_id,
+            start_date,
+            end_date,
+        )
+
+    async def create_transactions(
+        self, transactions: List[Transaction]
+    ) -> List[Dict[str, Any]]:
+        return await self._call(
+            "lunchmoney", None, self.inner.create_transactions, transactions
+        )
@@ -0,0 +1,109 @@
+"""Span exporter implementations."""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+import msgspec
+
+from server.src.core.domain import Span
+from server.src.core.ports import SpanExporter
+
+project_dir = Path(__file__).parents[3]
+TRACES_FILE = Path(project_dir / "data" / "traces.jsonl")
+SERVICE_NAME = "gocardless-sync"
+
+logger = logging.getLogger(__name__)
+
+_encoder = msgspec.json.Encoder()
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends one JSON object per span to a file."""
+
+    def __init__(self, file_path: Path = TRACES_FILE):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        data = b"".join(_encoder.encode(span) + b"\n" for span in spans)
+        with self._lock:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file_path, "ab") as f:
+                f.write(data)
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Posts spans as OTLP/JSON to a collector's `/v1/traces` endpoint.
+
+    The request runs on a background thread so a slow collector never holds
+    up the sync that produced the spans.
+    """
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        payload = _encoder.encode(self._to_otlp(spans))
+        threading.Thread(target=self._post, args=(payload,), daemon=True).start()
+
+    def _post(self, payload: bytes) -> None:
+        try:
+            response = httpx.post(
+                self.endpoint,
+                content=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Error exporting spans to {self.endpoint}: {str(e)}")
+
+    def _to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": self._attributes({"service.name": SERVICE_NAME})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "server.src.core.tracing"},
+                            "spans": [
+                                {
+                                    "traceId": span.trace_id,
+                                    "spanId": span.span_id,
+                                    "parentSpanId": span.parent_span_id or "",
+                                    "name": span.name,
+                                    "kind": 1,  # SPAN_KIND_INTERNAL
+                                    "startTimeUnixNano": str(span.start_time_unix_nano),
+                                    "endTimeUnixNano": str(span.end_time_unix_nano),
+                                    "attributes": self._attributes(span.attributes),
+                                    "status": {
+                                        "code": 2 if span.status == "error" else 1,
+                                        "message": span.status_message or "",
+                                    },
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    # noinspection PyMethodMayBeStatic
+    def _attributes(self, attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        def value(v: Any) -> Dict[str, Any]:
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        return [{"key": k, "value": value(v)} for k, v in attributes.items()]
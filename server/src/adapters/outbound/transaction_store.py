@@ -0,0 +1,439 @@
+"""SQLite-backed local store of synced transactions."""
+
+import asyncio
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from server.src.core.domain import (
+    RollupDelta,
+    SpendingRollup,
+    StoredTransaction,
+    Transaction,
+    TransactionChange,
+    TransactionQuery,
+    TransactionSearchResult,
+)
+from server.src.core.ports import SpendingRollupRepository, TransactionStore
+from server.src.core.services.rollups import rollup_deltas
+
+project_dir = Path(__file__).parents[3]
+TRANSACTIONS_DB = Path(project_dir / "data" / "transactions.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    currency TEXT NOT NULL,
+    payee TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    asset_id INTEGER NOT NULL,
+    UNIQUE (account_id, external_id)
+);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS transactions_account_date
+    ON transactions (account_id, date);
+CREATE INDEX IF NOT EXISTS transactions_amount ON transactions (amount_cents);
+
+-- Inverted index over payee and notes, kept in step by the triggers below
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    payee, notes,
+    content='transactions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS transactions_ai AFTER INSERT ON transactions BEGIN
+    INSERT INTO transactions_fts (rowid, payee, notes)
+    VALUES (new.id, new.payee, new.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_ad AFTER DELETE ON transactions BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, payee, notes)
+    VALUES ('delete', old.id, old.payee, old.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_au AFTER UPDATE ON transactions BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, payee, notes)
+    VALUES ('delete', old.id, old.payee, old.notes);
+    INSERT INTO transactions_fts (rowid, payee, notes)
+    VALUES (new.id, new.payee, new.notes);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO transactions
+    (account_id, external_id, date, amount_cents, currency, payee, notes, asset_id)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (account_id, external_id) DO UPDATE SET
+    date = excluded.date,
+    amount_cents = excluded.amount_cents,
+    currency = excluded.currency,
+    payee = excluded.payee,
+    notes = excluded.notes,
+    asset_id = excluded.asset_id
+"""
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spending_rollups (
+    account_id TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    spent_cents INTEGER NOT NULL,
+    received_cents INTEGER NOT NULL,
+    PRIMARY KEY (dimension, account_id, key, currency)
+);
+CREATE INDEX IF NOT EXISTS spending_rollups_spent
+    ON spending_rollups (dimension, spent_cents);
+"""
+
+_APPLY_DELTA = """
+INSERT INTO spending_rollups
+    (account_id, dimension, key, currency, count, spent_cents, received_cents)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (dimension, account_id, key, currency) DO UPDATE SET
+    count = count + excluded.count,
+    spent_cents = spent_cents + excluded.spent_cents,
+    received_cents = received_cents + excluded.received_cents
+"""
+
+# Builds the rollups from scratch, for stores synced before rollups existed
+_REBUILD_ROLLUPS = """
+INSERT INTO spending_rollups
+SELECT account_id, dimension, key, currency, COUNT(*),
+       SUM(CASE WHEN amount_cents < 0 THEN -amount_cents ELSE 0 END),
+       SUM(CASE WHEN amount_cents >= 0 THEN amount_cents ELSE 0 END)
+FROM (
+    SELECT account_id, 'month' AS dimension, substr(date, 1, 7) AS key,
+           currency, amount_cents FROM transactions
+    UNION ALL
+    SELECT account_id, 'payee', payee, currency, amount_cents FROM transactions
+)
+GROUP BY account_id, dimension, key, currency
+"""
+
+_COLUMNS = (
+    "t.account_id, t.external_id, t.date, t.amount_cents, t.currency, "
+    "t.payee, t.notes, t.asset_id"
+)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def to_cents(amount: str) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def from_cents(cents: int) -> str:
+    return f"{Decimal(cents) / 100:.2f}"
+
+
+def match_expression(text: str) -> Optional[str]:
+    """FTS5 query matching all tokens of `text`, the last one as a prefix."""
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _stored(row: tuple) -> StoredTransaction:
+    return StoredTransaction(
+        account_id=row[0],
+        external_id=row[1],
+        date=row[2],
+        amount=from_cents(row[3]),
+        currency=row[4],
+        payee=row[5],
+        notes=row[6],
+        asset_id=row[7],
+    )
+
+
+class _SqliteDatabase:
+    """One lazily opened connection, shared under a lock.
+
+    SQLite calls block, so callers run them in a worker thread; a single
+    connection is plenty for a single-process app.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(self, db_path: Path = TRANSACTIONS_DB):
+        self.db_path = db_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.schema)
+            self._opened(connection)
+            self._connection = connection
+        return self._connection
+
+    def _opened(self, connection: sqlite3.Connection) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class SqliteTransactionStore(_SqliteDatabase, TransactionStore):
+    """Transactions in SQLite, with an FTS5 index and date/amount indexes.
+
+    Spending rollups live in the same database and move by the deltas of
+    each upsert in the same transaction, so they never miss a stored row.
+    """
+
+    schema = _SCHEMA + _ROLLUP_SCHEMA
+
+    def _opened(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            (rollups,) = connection.execute(
+                "SELECT COUNT(*) FROM spending_rollups"
+            ).fetchone()
+            if not rollups:
+                connection.execute(_REBUILD_ROLLUPS)
+
+    async def upsert_transactions(
+        self, account_id: str, transactions: List[Transaction]
+    ) -> List[TransactionChange]:
+        if not transactions:
+            return []
+        return await asyncio.to_thread(self._upsert, account_id, transactions)
+
+    async def search(self, query: TransactionQuery) -> TransactionSearchResult:
+        return await asyncio.to_thread(self._search, query)
+
+    async def iter_transactions(
+        self, query: TransactionQuery, batch_size: int = 1000
+    ) -> AsyncIterator[List[StoredTransaction]]:
+        # Keyset pagination: each batch is a short query of its own, so an
+        # export neither holds the lock nor keeps a read cursor open
+        after: Optional[tuple] = None
+        while True:
+            rows = await asyncio.to_thread(self._page, query, after, batch_size)
+            if not rows:
+                return
+            yield [_stored(row[1:]) for row in rows]
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][3], rows[-1][0])  # date, id
+
+    def _page(
+        self, query: TransactionQuery, after: Optional[tuple], batch_size: int
+    ) -> List[tuple]:
+        conditions, params = self._conditions(query)
+        if after:
+            conditions.append("(t.date > ? OR (t.date = ? AND t.id > ?))")
+            params.extend([after[0], after[0], after[1]])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            return self.connection.execute(
+                f"SELECT t.id, {_COLUMNS} FROM transactions t {where} "
+                "ORDER BY t.date, t.id LIMIT ?",
+                [*params, batch_size],
+            ).fetchall()
+
+    def _upsert(
+        self, account_id: str, transactions: List[Transaction]
+    ) -> List[TransactionChange]:
+        incoming = {
+            tx.external_id: StoredTransaction(
+                account_id=account_id,
+                external_id=tx.external_id,
+                date=tx.date,
+                amount=from_cents(to_cents(tx.amount)),
+                currency=tx.currency,
+                payee=tx.payee,
+                notes=tx.notes or "",
+                asset_id=tx.asset_id,
+            )
+            for tx in transactions
+        }
+        with self._lock:
+            connection = self.connection
+            with connection:
+                existing = self._load(connection, account_id, list(incoming))
+                # Only new and changed rows are written, which also spares
+                # the FTS index from rewriting unchanged rows
+                changes = [
+                    TransactionChange(old=existing.get(external_id), new=new)
+                    for external_id, new in incoming.items()
+                    if existing.get(external_id) != new
+                ]
+                connection.executemany(
+                    _UPSERT,
+                    [
+                        (
+                            change.new.account_id,
+                            change.new.external_id,
+                            change.new.date,
+                            to_cents(change.new.amount),
+                            change.new.currency,
+                            change.new.payee,
+                            change.new.notes,
+                            change.new.asset_id,
+                        )
+                        for change in changes
+                    ],
+                )
+                self._apply_deltas(connection, rollup_deltas(changes))
+        return changes
+
+    @staticmethod
+    def _apply_deltas(connection: sqlite3.Connection, deltas: List[RollupDelta]):
+        connection.executemany(
+            _APPLY_DELTA,
+            [
+                (
+                    delta.account_id,
+                    delta.dimension,
+                    delta.key,
+                    delta.currency,
+                    delta.count,
+                    delta.spent,
+                    delta.received,
+                )
+                for delta in deltas
+            ],
+        )
+        connection.execute("DELETE FROM spending_rollups WHERE count <= 0")
+
+    @staticmethod
+    def _load(
+        connection: sqlite3.Connection, account_id: str, external_ids: List[str]
+    ) -> Dict[str, StoredTransaction]:
+        existing = {}
+        # Stay below SQLite's limit on the number of bound parameters
+        for start in range(0, len(external_ids), 500):
+            chunk = external_ids[start : start + 500]
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM transactions t WHERE t.account_id = ? "
+                f"AND t.external_id IN ({', '.join('?' for _ in chunk)})",
+                [account_id, *chunk],
+            )
+            existing.update((row[1], _stored(row)) for row in rows)
+        return existing
+
+    @staticmethod
+    def _conditions(query: TransactionQuery) -> tuple[List[str], List]:
+        conditions, params = [], []
+
+        expression = match_expression(query.text) if query.text else None
+        if expression:
+            conditions.append(
+                "t.id IN (SELECT rowid FROM transactions_fts "
+                "WHERE transactions_fts MATCH ?)"
+            )
+            params.append(expression)
+        if query.account_ids:
+            conditions.append(
+                f"t.account_id IN ({', '.join('?' for _ in query.account_ids)})"
+            )
+            params.extend(query.account_ids)
+        if query.date_from:
+            conditions.append("t.date >= ?")
+            params.append(query.date_from)
+        if query.date_to:
+            conditions.append("t.date <= ?")
+            params.append(query.date_to)
+        if query.min_amount is not None:
+            conditions.append("t.amount_cents >= ?")
+            params.append(to_cents(query.min_amount))
+        if query.max_amount is not None:
+            conditions.append("t.amount_cents <= ?")
+            params.append(to_cents(query.max_amount))
+        return conditions, params
+
+    def _search(self, query: TransactionQuery) -> TransactionSearchResult:
+        conditions, params = self._conditions(query)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        source = f"transactions t {where}"
+        with self._lock:
+            connection = self.connection
+            (total,) = connection.execute(
+                f"SELECT COUNT(*) FROM {source}", params
+            ).fetchone()
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM {source} "
+                "ORDER BY t.date DESC, t.id DESC LIMIT ? OFFSET ?",
+                [*params, query.limit, query.offset],
+            ).fetchall()
+
+        return TransactionSearchResult(
+            total=total, transactions=[_stored(row) for row in rows]
+        )
+
+
+class SqliteSpendingRollupRepository(SpendingRollupRepository):
+    """Rollups kept by a `SqliteTransactionStore`, read over its connection."""
+
+    def __init__(self, store: "SqliteTransactionStore"):
+        self.store = store
+
+    async def load_rollups(
+        self,
+        dimension: str,
+        account_ids: Optional[List[str]] = None,
+        key_from: Optional[str] = None,
+        key_to: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SpendingRollup]:
+        return await asyncio.to_thread(
+            self._load_rollups, dimension, account_ids, key_from, key_to, limit
+        )
+
+    def _load_rollups(
+        self,
+        dimension: str,
+        account_ids: Optional[List[str]],
+        key_from: Optional[str],
+        key_to: Optional[str],
+        limit: Optional[int],
+    ) -> List[SpendingRollup]:
+        conditions, params = ["dimension = ?"], [dimension]
+        if account_ids:
+            conditions.append(f"account_id IN ({', '.join('?' for _ in account_ids)})")
+            params.extend(account_ids)
+        if key_from:
+            conditions.append("key >= ?")
+            params.append(key_from)
+        if key_to:
+            conditions.append("key <= ?")
+            params.append(key_to)
+        order = "key, account_id" if dimension == "month" else "spent_cents DESC, key"
+        sql = (
+            "SELECT account_id, key, currency, count, spent_cents, received_cents "
+            f"FROM spending_rollups WHERE {' AND '.join(conditions)} ORDER BY {order}"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self.store._lock:
+            rows = self.store.connection.execute(sql, params).fetchall()
+        return [
+            SpendingRollup(
+                account_id=row[0],
+                key=row[1],
+                currency=row[2],
+                count=row[3],
+                spent=from_cents(row[4]),
+                received=from_cents(row[5]),
+            )
+            for row in rows
+        ]
@@ -1,21 +1,61 @@
 """Domain layer containing core business logic and entities."""
 
 __all__ = [
+    "DEFAULT_TENANT_ID",
+    "AccountActivity",
     "AccountLink",
     "AccountStatus",
+    "BalanceSeries",
+    "BalanceSnapshot",
+    "BankTransaction",
+    "BankTransactions",
+    "LunchMoneyTransaction",
+    "NormalizationRule",
     "RateLimit",
+    "RollupDelta",
     "Transaction",
     "TokenInfo",
     "Institution",
     "Requisition",
+    "Span",
+    "SpendingRollup",
+    "StoredTransaction",
+    "SyncRun",
+    "SyncRunRollup",
+    "Tenant",
+    "TransactionAmount",
+    "TransactionChange",
+    "TransactionQuery",
+    "TransactionSearchResult",
+    "UploadBatch",
 ]
 
 from .models import (
+    DEFAULT_TENANT_ID,
+    AccountActivity,
     AccountLink,
     AccountStatus,
+    BalanceSeries,
+    BalanceSnapshot,
+    BankTransaction,
+    BankTransactions,
+    LunchMoneyTransaction,
+    NormalizationRule,
     RateLimit,
+    RollupDelta,
     Transaction,
     TokenInfo,
     Institution,
     Requisition,
+    Span,
+    SpendingRollup,
+    StoredTransaction,
+    SyncRun,
+    SyncRunRollup,
+    Tenant,
+    TransactionAmount,
+    TransactionChange,
+    TransactionQuery,
+    TransactionSearchResult,
+    UploadBatch,
 )
@@ -1,12 +1,17 @@
-"""Domain models representing core business entities."""
+"""Domain models representing core business entities.
+
+Models are ``msgspec.Struct`` types so that upstream JSON bodies can be
+decoded straight into them and API responses encoded without an
+intermediate dict representation.
+"""
 
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
+
+from msgspec import Struct
 
 
-@dataclass
-class Transaction:
+class Transaction(Struct):
     date: str
     amount: str
     currency: str
@@ -17,15 +22,39 @@ class Transaction:
     status: str = "uncleared"
 
 
-@dataclass
-class RateLimit:
-    limit: int
-    remaining: int
+DEFAULT_TENANT_ID = "default"
+
+
+class Tenant(Struct):
+    """A household with its own credentials and data.
+
+    Only the default tenant may leave credentials unset; they then come from
+    the process environment, which is how a single-tenant deployment is
+    configured.
+    """
+
+    id: str
+    name: Optional[str] = None
+    gocardless_secret_id: Optional[str] = None
+    gocardless_secret_key: Optional[str] = None
+    lunchmoney_access_token: Optional[str] = None
+
+
+class NormalizationRule(Struct):
+    field: str  # payee, notes
+    pattern: str
+    replacement: str = ""
+    ignore_case: bool = True
+
+
+class RateLimit(Struct):
+    # None when the bank did not report it
+    limit: Optional[int]
+    remaining: Optional[int]
     reset: Optional[str]
 
 
-@dataclass
-class AccountStatus:
+class AccountStatus(Struct):
     last_sync: Optional[str] = None
     last_sync_status: Optional[str] = None
     last_sync_transactions: int = 0
@@ -33,23 +62,28 @@ class AccountStatus:
     rate_limit: Optional[RateLimit] = None
 
 
-@dataclass
-class AccountLink:
+class AccountActivity(Struct):
+    """Learned transaction arrival rate of an account, and its sync override."""
+
+    transactions_per_day: float = 0.0
+    updated_at: Optional[str] = None
+    interval_override_hours: Optional[float] = None
+
+
+class AccountLink(Struct):
     lunchmoney_id: int
     gocardless_id: str
     created_at: str
 
 
-@dataclass
-class TokenInfo:
+class TokenInfo(Struct):
     access_token: str
     refresh_token: str
     access_expires: datetime
     refresh_expires: datetime
 
 
-@dataclass
-class Institution:
+class Institution(Struct):
     id: str
     name: str
     bic: str
@@ -58,8 +92,7 @@ class Institution:
     logo: str
 
 
-@dataclass
-class Requisition:
+class Requisition(Struct):
     id: str
     created: str
     status: str  # CR, LN, RJ, ER, EX, GA
@@ -73,3 +106,173 @@ class Requisition:
     account_selection: bool = False
     redirect: Optional[str] = None
     redirect_immediate: bool = False
+
+
+class TransactionAmount(Struct):
+    amount: str
+    currency: str
+
+
+class BankTransaction(Struct, rename="camel"):
+    """A transaction as reported by GoCardless."""
+
+    transaction_amount: TransactionAmount
+    booking_date: Optional[str] = None
+    internal_transaction_id: Optional[str] = None
+    transaction_id: Optional[str] = None
+    merchant_name: Optional[str] = None
+    creditor_name: Optional[str] = None
+    debtor_name: Optional[str] = None
+    remittance_information_unstructured: str = ""
+
+
+class BankTransactions(Struct):
+    booked: list[BankTransaction] = []
+    pending: list[BankTransaction] = []
+
+
+class LunchMoneyTransaction(Struct):
+    """The parts of a Lunch Money transaction needed for deduplication."""
+
+    id: int
+    date: str
+    external_id: Optional[str] = None
+
+
+class Span(Struct, rename="camel"):
+    """A timed unit of work, shaped after the OpenTelemetry span model."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_time_unix_nano: int = 0
+    end_time_unix_nano: int = 0
+    attributes: dict[str, Any] = {}
+    status: str = "ok"  # ok, error
+    status_message: Optional[str] = None
+
+
+class SyncRun(Struct, rename="camel"):
+    """One account's part of a sync run."""
+
+    run_id: str
+    account_id: str
+    started_at: str
+    duration_ms: float
+    status: str
+    error_class: Optional[str] = None
+    # Milliseconds per phase: fetch, transform, dedup, upload
+    phases: dict[str, float] = {}
+    fetched: int = 0
+    deduplicated: int = 0
+    inserted: int = 0
+    http_calls: int = 0
+
+
+class SyncRunRollup(Struct, rename="camel"):
+    """Daily totals of the sync runs of an account."""
+
+    day: str
+    account_id: str
+    runs: int = 0
+    errors: int = 0
+    fetched: int = 0
+    deduplicated: int = 0
+    inserted: int = 0
+    http_calls: int = 0
+    total_duration_ms: float = 0.0
+    max_duration_ms: float = 0.0
+
+
+class UploadBatch(Struct):
+    """A batch of transactions planned for upload to Lunch Money."""
+
+    id: str
+    account_id: str
+    asset_id: int
+    created_at: str
+    transactions: list[Transaction]
+
+
+class BalanceSnapshot(Struct):
+    """An account balance at a point in time, in minor units (cents)."""
+
+    timestamp: int  # seconds since the epoch
+    amount: int
+    currency: str
+    balance_type: str
+
+
+class BalanceSeries(Struct):
+    """Balance snapshots of an account, as columns ordered by time."""
+
+    currency: str
+    balance_type: str
+    timestamps: list[int]
+    amounts: list[int]
+
+
+class StoredTransaction(Struct, rename="camel"):
+    """A synced transaction as kept in the local transaction store."""
+
+    account_id: str
+    external_id: str
+    date: str
+    amount: str
+    currency: str
+    payee: str
+    notes: str
+    asset_id: int
+
+
+class TransactionQuery(Struct):
+    """Filters of a local transaction search; all of them are optional.
+
+    `text` matches payee and notes tokens, the last one as a prefix.
+    Amounts are decimal strings, and ranges include both ends.
+    """
+
+    text: Optional[str] = None
+    account_ids: Optional[list[str]] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    min_amount: Optional[str] = None
+    max_amount: Optional[str] = None
+    limit: int = 50
+    offset: int = 0
+
+
+class TransactionSearchResult(Struct):
+    total: int
+    transactions: list[StoredTransaction]
+
+
+class TransactionChange(Struct):
+    """A stored transaction that was inserted (no `old`) or changed."""
+
+    old: Optional[StoredTransaction]
+    new: StoredTransaction
+
+
+class RollupDelta(Struct):
+    """A change to one spending rollup, in minor units (cents)."""
+
+    account_id: str
+    dimension: str  # month, payee
+    key: str
+    currency: str
+    count: int = 0
+    spent: int = 0
+    received: int = 0
+
+
+class SpendingRollup(Struct, rename="camel"):
+    """Totals of an account per month or per payee."""
+
+    account_id: str
+    key: str
+    currency: str
+    count: int
+    spent: str
+    received: str
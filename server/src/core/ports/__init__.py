@@ -1,18 +1,43 @@
 __all__ = [
+    "AccountActivityRepository",
     "AccountLinkRepository",
+    "BalanceRepository",
+    "NormalizationRuleRepository",
+    "SpendingRollupRepository",
+    "SyncRunRepository",
     "SyncStatusRepository",
+    "TenantRepository",
+    "TransactionArchive",
+    "TransactionStore",
+    "UploadJournal",
     "RequisitionService",
     "GoCardlessService",
     "InstitutionService",
+    "LogoCache",
     "LunchMoneyService",
+    "SpanExporter",
     "TokenService",
 ]
 
-from .repositories import AccountLinkRepository, SyncStatusRepository
+from .repositories import (
+    AccountActivityRepository,
+    AccountLinkRepository,
+    BalanceRepository,
+    NormalizationRuleRepository,
+    SpendingRollupRepository,
+    SyncRunRepository,
+    SyncStatusRepository,
+    TenantRepository,
+    TransactionArchive,
+    TransactionStore,
+    UploadJournal,
+)
 from .services import (
     RequisitionService,
     GoCardlessService,
     InstitutionService,
+    LogoCache,
     LunchMoneyService,
+    SpanExporter,
     TokenService,
 )
@@ -1,9 +1,26 @@
 """Repository interfaces for data persistence."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncContextManager, AsyncIterator, Dict, List, Optional, Set, Tuple
 
-from server.src.core.domain.models import AccountLink, AccountStatus
+from server.src.core.domain.models import (
+    AccountActivity,
+    AccountLink,
+    AccountStatus,
+    BalanceSeries,
+    BalanceSnapshot,
+    NormalizationRule,
+    SpendingRollup,
+    StoredTransaction,
+    SyncRun,
+    SyncRunRollup,
+    Tenant,
+    Transaction,
+    TransactionChange,
+    TransactionQuery,
+    TransactionSearchResult,
+    UploadBatch,
+)
 
 
 class AccountLinkRepository(ABC):
@@ -22,6 +39,16 @@ class AccountLinkRepository(ABC):
         """Remove an account link."""
         pass
 
+    def apply_changes(
+        self, links: List[AccountLink], unlinks: List[Tuple[int, str]]
+    ) -> None:
+        """Remove `unlinks`, given as (lunchmoney_id, gocardless_id), then save
+        `links`. Implementations that can should apply them in one write."""
+        for lunchmoney_id, gocardless_id in unlinks:
+            self.remove_link(lunchmoney_id, gocardless_id)
+        for link in links:
+            self.save_link(link)
+
 
 class SyncStatusRepository(ABC):
     @abstractmethod
@@ -38,3 +65,198 @@ class SyncStatusRepository(ABC):
     async def reset_sync_status(self) -> None:
         """Reset sync status for all accounts."""
         pass
+
+
+class AccountActivityRepository(ABC):
+    @abstractmethod
+    async def load_activity(self) -> Dict[str, AccountActivity]:
+        """Load the activity of all accounts, keyed by GoCardless account ID."""
+        pass
+
+    @abstractmethod
+    async def save_activity(self, account_id: str, activity: AccountActivity) -> None:
+        """Save the activity of an account."""
+        pass
+
+
+class NormalizationRuleRepository(ABC):
+    @abstractmethod
+    async def load_rules(
+        self, institution_id: Optional[str] = None
+    ) -> List[NormalizationRule]:
+        """Load default rules followed by the rules of an institution."""
+        pass
+
+
+class TransactionArchive(ABC):
+    @abstractmethod
+    async def append_transactions(
+        self, account_id: str, date_from: str, date_to: Optional[str], raw: bytes
+    ) -> None:
+        """Archive a raw GoCardless transactions response as received."""
+        pass
+
+    @abstractmethod
+    async def load_transactions(
+        self,
+        account_id: str,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> List[bytes]:
+        """Load archived raw responses overlapping a date range, oldest first."""
+        pass
+
+    @abstractmethod
+    async def save_account_details(self, account_id: str, raw: bytes) -> None:
+        """Archive the latest raw account details response."""
+        pass
+
+    @abstractmethod
+    async def load_account_details(self, account_id: str) -> Optional[bytes]:
+        """Load the latest archived raw account details response."""
+        pass
+
+
+class TenantRepository(ABC):
+    @abstractmethod
+    def load_tenants(self) -> List[Tenant]:
+        """Load all configured tenants."""
+        pass
+
+    @abstractmethod
+    def get_tenant(self, tenant_id: str) -> Optional[Tenant]:
+        """Get a tenant by ID, or None if it is not configured."""
+        pass
+
+
+class SyncRunRepository(ABC):
+    @abstractmethod
+    async def append_runs(self, runs: List[SyncRun]) -> None:
+        """Append run records; existing records are never modified."""
+        pass
+
+    @abstractmethod
+    async def load_runs(
+        self, account_id: Optional[str] = None, since: Optional[str] = None
+    ) -> List[SyncRun]:
+        """Load run records, oldest first, optionally filtered."""
+        pass
+
+    @abstractmethod
+    async def load_rollups(
+        self, account_id: Optional[str] = None, since: Optional[str] = None
+    ) -> List[SyncRunRollup]:
+        """Load daily rollups of compacted runs, oldest first."""
+        pass
+
+    @abstractmethod
+    async def compact(self, before: str) -> None:
+        """Fold runs started before a date into daily rollups."""
+        pass
+
+
+class UploadJournal(ABC):
+    @abstractmethod
+    async def plan(self, batch: UploadBatch) -> None:
+        """Durably record a batch before it is uploaded."""
+        pass
+
+    @abstractmethod
+    async def commit(self, batch_id: str) -> None:
+        """Record that a batch was accepted by Lunch Money."""
+        pass
+
+    @abstractmethod
+    async def fail(self, batch_id: str, error: str) -> None:
+        """Record that Lunch Money rejected a batch, or the upload failed."""
+        pass
+
+    @abstractmethod
+    async def pending(self, account_id: Optional[str] = None) -> List[UploadBatch]:
+        """Batches that were planned but never committed, oldest first.
+
+        Batches that keep failing are eventually abandoned and left out.
+        """
+        pass
+
+    @abstractmethod
+    async def abandoned(self, account_id: Optional[str] = None) -> List[UploadBatch]:
+        """Batches that kept failing and are no longer retried."""
+        pass
+
+    @abstractmethod
+    async def committed_external_ids(self, account_id: str) -> Set[str]:
+        """External IDs of the recently committed batches of an account."""
+        pass
+
+    @abstractmethod
+    def lock(self, account_id: str) -> AsyncContextManager[None]:
+        """Hold off every other dedup and upload of an account's batches.
+
+        A batch being uploaded looks just like one left behind by a crash;
+        everyone sharing the journal, in this process or another, has to
+        take the lock before reading or posting an account's batches.
+        """
+        pass
+
+
+class BalanceRepository(ABC):
+    @abstractmethod
+    async def append_snapshot(self, account_id: str, snapshot: BalanceSnapshot) -> None:
+        """Append a balance snapshot of an account."""
+        pass
+
+    @abstractmethod
+    async def load_series(
+        self,
+        account_id: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> Optional[BalanceSeries]:
+        """Snapshots with `since <= timestamp < until`; None for unknown accounts."""
+        pass
+
+
+class TransactionStore(ABC):
+    @abstractmethod
+    async def upsert_transactions(
+        self, account_id: str, transactions: List[Transaction]
+    ) -> List[TransactionChange]:
+        """Insert or update the synced transactions of an account, and move
+        the spending rollups by the deltas in the same transaction.
+
+        Returns the rows that were inserted or changed, with their old values.
+        """
+        pass
+
+    @abstractmethod
+    async def search(self, query: TransactionQuery) -> TransactionSearchResult:
+        """Matching transactions, newest first."""
+        pass
+
+    @abstractmethod
+    def iter_transactions(
+        self, query: TransactionQuery, batch_size: int = 1000
+    ) -> AsyncIterator[List[StoredTransaction]]:
+        """All matching transactions, oldest first, in batches.
+
+        `limit` and `offset` of the query are ignored.
+        """
+        pass
+
+
+class SpendingRollupRepository(ABC):
+    """Rollups are written by the `TransactionStore`, with the rows they
+    summarize."""
+
+    @abstractmethod
+    async def load_rollups(
+        self,
+        dimension: str,
+        account_ids: Optional[List[str]] = None,
+        key_from: Optional[str] = None,
+        key_to: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SpendingRollup]:
+        """Rollups of a dimension; months in order, payees by amount spent."""
+        pass
@@ -4,10 +4,13 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 
 from server.src.core.domain.models import (
+    BankTransactions,
+    LunchMoneyTransaction,
     TokenInfo,
     Transaction,
     Institution,
     Requisition,
+    Span,
 )
 
 
@@ -43,7 +46,7 @@ class GoCardlessService(ABC):
         access_token: str,
         from_date: str,
         to_date: Optional[str] = None,
-    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    ) -> tuple[BankTransactions, Dict[str, Any]]:
         """Get transactions from GoCardless."""
         pass
 
@@ -57,7 +60,7 @@ class LunchMoneyService(ABC):
     @abstractmethod
     async def get_transactions(
         self, asset_id: int, start_date: str, end_date: str
-    ) -> List[Dict[str, Any]]:
+    ) -> List[LunchMoneyTransaction]:
         """Get transactions from Lunch Money."""
         pass
 
@@ -96,3 +99,32 @@ class RequisitionService(ABC):
     async def delete_requisition(self, requisition_id: str) -> None:
         """Delete a requisition."""
         pass
+
+
+class LogoCache(ABC):
+    @abstractmethod
+    def register(self, url: str) -> str:
+        """Remember a logo URL and return the key to fetch it by."""
+        pass
+
+    @abstractmethod
+    def cached(self, url: str) -> Optional[str]:
+        """Content-addressed name of a logo that is already stored."""
+        pass
+
+    @abstractmethod
+    async def fetch(self, key: str) -> Optional[str]:
+        """Store the logo of a registered key, once, and return its name."""
+        pass
+
+    @abstractmethod
+    def load(self, name: str) -> Optional[tuple[bytes, str]]:
+        """Load a stored logo and its content type by name."""
+        pass
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Export the finished spans of a trace."""
+        pass
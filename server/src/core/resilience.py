@@ -0,0 +1,206 @@
+"""Circuit breaking, adaptive concurrency and stale-data signalling for
+upstream calls."""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Optional
+
+
+class StaleTracker:
+    """Collects whether any call of a request was served from stale data."""
+
+    def __init__(self):
+        self.stale = False
+
+
+_stale_tracker: ContextVar[Optional[StaleTracker]] = ContextVar(
+    "stale_tracker", default=None
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe -> closed.
+
+    While open, calls are rejected until `reset_timeout` has passed. Then a
+    single probe is let through, and its outcome closes or re-opens the
+    circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probe_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Free the probe of a call that ended without an outcome, such as a
+        cancelled one, so that the next call can probe instead."""
+        self._probe_in_flight = False
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+@dataclass
+class LimiterSample:
+    """One call made within an `AdaptiveLimiter` slot."""
+
+    started: float
+    # The upstream pushed back: throttled, failing or unreachable
+    congested: bool = False
+    failed: bool = False
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to the upstream, additive increase /
+    multiplicative decrease (AIMD) as in TCP congestion control.
+
+    Every healthy call raises the limit by 1/limit, so about one per round
+    of `limit` calls. A congested call (throttled, failing or unreachable
+    upstream), or one slower than `latency_target`, multiplies it by
+    `backoff`. Calls that were already
+    in flight when the limit was cut report the same congestion, so they
+    don't cut it again.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_target: float = 5.0,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.clock = clock
+        self.in_flight = 0
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[LimiterSample]:
+        """Hold a slot for one call; flag `congested` on the sample if the
+        upstream pushed back."""
+        await self._acquire()
+        sample = LimiterSample(started=self.clock())
+        try:
+            yield sample
+        except BaseException:
+            sample.failed = True
+            raise
+        finally:
+            self._release(sample)
+
+    def to_dict(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inFlight": self.in_flight,
+            "waiting": len(self._waiters),
+            "decreases": self.decreases,
+        }
+
+    async def _acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self, sample: LimiterSample) -> None:
+        self.in_flight -= 1
+        now = self.clock()
+        if sample.congested or now - sample.started > self.latency_target:
+            if sample.started >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+        elif not sample.failed:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+def track_stale() -> StaleTracker:
+    """Start tracking stale data for the current request.
+
+    The tracker is shared with tasks spawned afterwards, so calls fanned out
+    with `asyncio.gather` still report back to it.
+    """
+    tracker = StaleTracker()
+    _stale_tracker.set(tracker)
+    return tracker
+
+
+def mark_stale() -> None:
+    """Flag that the current request was answered with last known-good data."""
+    tracker = _stale_tracker.get()
+    if tracker is not None:
+        tracker.stale = True
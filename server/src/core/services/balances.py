@@ -0,0 +1,97 @@
+"""Balance snapshots and their downsampling for charts."""
+
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from ..domain import BalanceSeries, BalanceSnapshot
+
+# Balances that best reflect what is on the account right now come first
+BALANCE_TYPE_PREFERENCE = (
+    "interimAvailable",
+    "interimBooked",
+    "expected",
+    "closingBooked",
+    "openingBooked",
+)
+
+RESOLUTIONS = ("raw", "hour", "day", "week", "month")
+
+
+def snapshot_from_balances(
+    balances: List[Dict[str, Any]], now: datetime
+) -> Optional[BalanceSnapshot]:
+    """Pick the preferred balance of a GoCardless `/balances/` response."""
+    by_type = {balance.get("balanceType"): balance for balance in balances}
+    balance = next(
+        (by_type[t] for t in BALANCE_TYPE_PREFERENCE if t in by_type),
+        balances[0] if balances else None,
+    )
+    if balance is None:
+        return None
+    try:
+        amount = Decimal(str(balance["balanceAmount"]["amount"]))
+        currency = balance["balanceAmount"]["currency"]
+    except (KeyError, TypeError, InvalidOperation):
+        return None
+    return BalanceSnapshot(
+        timestamp=int(now.timestamp()),
+        amount=int((amount * 100).to_integral_value()),
+        currency=currency,
+        balance_type=balance.get("balanceType") or "unknown",
+    )
+
+
+def _bucket(timestamp: int, resolution: str) -> int:
+    if resolution == "raw":
+        return timestamp
+    if resolution == "hour":
+        return timestamp - timestamp % 3600
+    if resolution == "day":
+        return timestamp - timestamp % 86400
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    if resolution == "week":
+        day = timestamp - timestamp % 86400
+        return day - moment.weekday() * 86400
+    if resolution == "month":
+        return int(
+            datetime(moment.year, moment.month, 1, tzinfo=timezone.utc).timestamp()
+        )
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def downsample(series: BalanceSeries, resolution: str) -> List[Dict[str, Any]]:
+    """One point per UTC bucket: the last balance in it, with its range.
+
+    Balances are levels rather than flows, so the last value is what the
+    account held at the end of the bucket.
+    """
+    points: List[Dict[str, Any]] = []
+    current = None
+    for timestamp, amount in zip(series.timestamps, series.amounts):
+        bucket = _bucket(timestamp, resolution)
+        if current is None or bucket != current[0]:
+            if current is not None:
+                points.append(_point(*current))
+            current = [bucket, amount, amount, amount, 0]
+        current[1] = amount
+        current[2] = min(current[2], amount)
+        current[3] = max(current[3], amount)
+        current[4] += 1
+    if current is not None:
+        points.append(_point(*current))
+    return points
+
+
+def _point(bucket: int, last: int, low: int, high: int, samples: int) -> Dict:
+    return {
+        "timestamp": datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+        "amount": _format(last),
+        "min": _format(low),
+        "max": _format(high),
+        "samples": samples,
+    }
+
+
+def _format(minor_units: int) -> str:
+    return f"{Decimal(minor_units) / 100:.2f}"
@@ -0,0 +1,67 @@
+"""Fair sharing of sync capacity between tenants."""
+
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque
+
+
+class FairLimiter:
+    """Limits concurrent work while serving waiting tenants round-robin.
+
+    A plain semaphore wakes waiters in arrival order, so a tenant that
+    queues many accounts at once would hold every slot until it is done.
+    Here a freed slot goes to the next tenant in turn that has work waiting.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str) -> AsyncIterator[None]:
+        await self._acquire(tenant_id)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, tenant_id: str) -> None:
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(tenant_id, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self._release()
+            else:
+                self._discard(tenant_id, waiter)
+            raise
+
+    def _release(self) -> None:
+        self.in_use -= 1
+        while self._waiters:
+            # Serve the tenant at the front, then move it to the back
+            tenant_id, queue = next(iter(self._waiters.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(tenant_id)
+            else:
+                del self._waiters[tenant_id]
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(None)
+                return
+
+    def _discard(self, tenant_id: str, waiter: asyncio.Future) -> None:
+        queue = self._waiters.get(tenant_id)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._waiters[tenant_id]
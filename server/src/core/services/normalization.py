@@ -0,0 +1,60 @@
+"""Rule-based cleanup of transaction payees and notes."""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence
+
+from ..domain import NormalizationRule
+
+# Mirrors the behaviour that used to be hard-coded in the transform: keep only
+# the remittance information of SEPA-style "key:value,key:value" notes.
+DEFAULT_RULES = [
+    NormalizationRule(
+        field="notes",
+        pattern=r"^.*?remittanceinformation:",
+        replacement="",
+        ignore_case=False,
+    ),
+]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _compile(rules: Sequence[NormalizationRule]) -> Callable[[str], str]:
+    """Compile rules into a single alternation that is applied in one pass.
+
+    Every rule becomes a named branch of the combined pattern, so numbered
+    backreferences inside rule patterns are not supported.
+    """
+    if not rules:
+        return str.strip
+
+    replacements: Dict[str, str] = {}
+    branches = []
+    for index, rule in enumerate(rules):
+        name = f"r{index}"
+        replacements[name] = rule.replacement
+        flags = "i" if rule.ignore_case else "-i"
+        branches.append(f"(?P<{name}>(?{flags}:{rule.pattern}))")
+    matcher = re.compile("|".join(branches))
+
+    def apply(value: str) -> str:
+        cleaned, count = matcher.subn(lambda m: replacements[m.lastgroup], value)
+        if count:
+            cleaned = _WHITESPACE.sub(" ", cleaned)
+        return cleaned.strip()
+
+    return apply
+
+
+class TransactionNormalizer:
+    """Cleans payee and notes strings with memoized, precompiled rules."""
+
+    def __init__(self, rules: List[NormalizationRule], cache_size: int = 4096):
+        self.rules = rules
+        self.normalize_payee = lru_cache(maxsize=cache_size)(
+            _compile([rule for rule in rules if rule.field == "payee"])
+        )
+        self.normalize_notes = lru_cache(maxsize=cache_size)(
+            _compile([rule for rule in rules if rule.field == "notes"])
+        )
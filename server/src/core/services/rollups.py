@@ -0,0 +1,59 @@
+"""Spending rollups maintained from the changes of the transaction store."""
+
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from ..domain import RollupDelta, StoredTransaction, TransactionChange
+
+DIMENSIONS = ("month", "payee")
+
+
+def _cents(amount: str) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def _keys(tx: StoredTransaction) -> List[Tuple[str, str]]:
+    return [("month", tx.date[:7]), ("payee", tx.payee)]
+
+
+def rollup_deltas(changes: List[TransactionChange]) -> List[RollupDelta]:
+    """Deltas that move the rollups from the old rows to the new ones.
+
+    A changed row is subtracted as it was and added as it is, so moving a
+    transaction to another month or payee shifts it between rollups.
+    Deltas that cancel out are dropped.
+    """
+    totals: Dict[Tuple[str, str, str, str], List[int]] = {}
+
+    def add(tx: StoredTransaction, sign: int) -> None:
+        cents = _cents(tx.amount)
+        for dimension, key in _keys(tx):
+            total = totals.setdefault(
+                (tx.account_id, dimension, key, tx.currency), [0, 0, 0]
+            )
+            total[0] += sign
+            if cents < 0:
+                total[1] += sign * -cents
+            else:
+                total[2] += sign * cents
+
+    for change in changes:
+        if change.old is not None:
+            add(change.old, -1)
+        add(change.new, 1)
+
+    return [
+        RollupDelta(
+            account_id=account_id,
+            dimension=dimension,
+            key=key,
+            currency=currency,
+            count=count,
+            spent=spent,
+            received=received,
+        )
+        for (account_id, dimension, key, currency), (count, spent, received) in (
+            totals.items()
+        )
+        if count or spent or received
+    ]
@@ -0,0 +1,96 @@
+"""Sync run records derived from the spans of a sync trace."""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from ..domain import Span, SyncRun, SyncRunRollup
+
+# Span name -> phase reported in the run history
+PHASES = {
+    "gocardless.get_transactions": "fetch",
+    "sync.transform": "transform",
+    "lunchmoney.get_transactions": "dedup",
+    "lunchmoney.create_transactions": "upload",
+}
+
+
+def _duration_ms(span: Span) -> float:
+    return ((span.end_time_unix_nano or 0) - span.start_time_unix_nano) / 1e6
+
+
+def runs_from_spans(spans: List[Span]) -> List[SyncRun]:
+    """Build one record per `sync.account` span from its subtree."""
+    children: Dict[Optional[str], List[Span]] = defaultdict(list)
+    for span in spans:
+        children[span.parent_span_id].append(span)
+
+    runs = []
+    for account_span in spans:
+        if account_span.name != "sync.account":
+            continue
+
+        subtree = [account_span]
+        for span in subtree:
+            subtree.extend(children[span.span_id])
+
+        phases: Dict[str, float] = defaultdict(float)
+        fetched = transformed = new = inserted = 0
+        for span in subtree:
+            if span.name in PHASES:
+                phases[PHASES[span.name]] += _duration_ms(span)
+            attributes = span.attributes
+            if span.name == "gocardless.get_transactions":
+                fetched += attributes.get("booked", 0)
+            elif span.name == "sync.transform":
+                transformed += attributes.get("transactions", 0)
+            elif span.name == "lunchmoney.get_transactions":
+                new += attributes.get("new", 0)
+            elif span.name == "lunchmoney.create_transactions":
+                if span.status != "error":
+                    inserted += attributes.get("size", 0)
+
+        runs.append(
+            SyncRun(
+                run_id=account_span.trace_id,
+                account_id=account_span.attributes.get("gocardless_id", ""),
+                started_at=datetime.fromtimestamp(
+                    account_span.start_time_unix_nano / 1e9
+                ).isoformat(),
+                duration_ms=round(_duration_ms(account_span), 1),
+                status=account_span.attributes.get("sync_status") or "unknown",
+                error_class=account_span.attributes.get("error_class"),
+                phases={name: round(ms, 1) for name, ms in phases.items()},
+                fetched=fetched,
+                # Rows that needed no upload because Lunch Money had them already
+                deduplicated=max(transformed - new, 0) if transformed else 0,
+                inserted=inserted,
+                http_calls=sum(
+                    span.attributes.get("http_calls", 0) for span in subtree
+                ),
+            )
+        )
+    return runs
+
+
+def roll_up(
+    runs: Iterable[SyncRun], rollups: Iterable[SyncRunRollup] = ()
+) -> List[SyncRunRollup]:
+    """Fold runs into daily per-account rollups, on top of existing ones."""
+    by_key: Dict[tuple[str, str], SyncRunRollup] = {
+        (rollup.day, rollup.account_id): rollup for rollup in rollups
+    }
+    for run in runs:
+        day = run.started_at[:10]
+        rollup = by_key.setdefault(
+            (day, run.account_id), SyncRunRollup(day=day, account_id=run.account_id)
+        )
+        rollup.runs += 1
+        rollup.errors += run.status != "success"
+        rollup.fetched += run.fetched
+        rollup.deduplicated += run.deduplicated
+        rollup.inserted += run.inserted
+        rollup.http_calls += run.http_calls
+        rollup.total_duration_ms = round(rollup.total_duration_ms + run.duration_ms, 1)
+        rollup.max_duration_ms = max(rollup.max_duration_ms, run.duration_ms)
+    return sorted(by_key.values(), key=lambda r: (r.day, r.account_id))
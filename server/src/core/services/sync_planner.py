@@ -0,0 +1,140 @@
+"""Per-account sync intervals derived from how busy each account is."""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from ..domain import AccountActivity, AccountStatus
+
+
+class SyncPlanner:
+    """Spreads a daily sync budget over accounts by transaction arrival rate.
+
+    Every account is synced at least `min_per_day` and at most `max_per_day`
+    times a day. The rest of the budget of `budget_per_account` syncs per
+    linked account goes to the busiest accounts, so new transactions show up
+    sooner where they actually arrive. Accounts with a manual interval
+    override keep it, and their syncs count against the budget first.
+
+    GoCardless allows about 4 transaction calls per account a day; no
+    account is planned more syncs than the limit it last reported, since
+    the excess could only be answered with a 429.
+    """
+
+    def __init__(
+        self,
+        budget_per_account: float = 3.0,
+        min_per_day: float = 1.0,
+        max_per_day: float = 4.0,
+        smoothing: float = 0.3,
+    ):
+        self.budget_per_account = budget_per_account
+        self.min_per_day = min_per_day
+        self.max_per_day = max_per_day
+        self.smoothing = smoothing
+
+    def observe(
+        self,
+        activity: Optional[AccountActivity],
+        booking_dates: Iterable[str],
+        date_from: str,
+        now: datetime,
+    ) -> AccountActivity:
+        """Fold the booked transactions of a sync window into the learned rate."""
+        window_start = datetime.fromisoformat(date_from)
+        window_days = max((now - window_start).total_seconds() / 86400, 1.0)
+        booked = sum(1 for d in booking_dates if d and d >= date_from)
+        observed = booked / window_days
+
+        activity = activity or AccountActivity()
+        if activity.updated_at is None:
+            rate = observed
+        else:
+            rate = (
+                self.smoothing * observed
+                + (1 - self.smoothing) * activity.transactions_per_day
+            )
+        return AccountActivity(
+            transactions_per_day=round(rate, 4),
+            updated_at=now.isoformat(),
+            interval_override_hours=activity.interval_override_hours,
+        )
+
+    def intervals(
+        self,
+        account_ids: List[str],
+        activity: Dict[str, AccountActivity],
+        daily_limits: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, float]:
+        """Sync interval in hours for each account.
+
+        `daily_limits` holds the known GoCardless call limit per account.
+        """
+        daily_limits = daily_limits or {}
+        cap = {
+            account_id: min(
+                self.max_per_day, daily_limits.get(account_id, self.max_per_day)
+            )
+            for account_id in account_ids
+        }
+        syncs_per_day: Dict[str, float] = {}
+        budget = self.budget_per_account * len(account_ids)
+
+        adaptive = []
+        for account_id in account_ids:
+            override = activity.get(account_id, AccountActivity())
+            if override.interval_override_hours:
+                syncs_per_day[account_id] = min(
+                    24 / override.interval_override_hours,
+                    daily_limits.get(account_id, float("inf")),
+                )
+                budget -= syncs_per_day[account_id]
+            else:
+                adaptive.append(account_id)
+
+        for account_id in adaptive:
+            syncs_per_day[account_id] = min(self.min_per_day, cap[account_id])
+            budget -= syncs_per_day[account_id]
+
+        # Water-fill the rest by rate; whatever a capped account cannot take
+        # flows on to the others
+        rates = {
+            account_id: activity.get(account_id, AccountActivity()).transactions_per_day
+            for account_id in adaptive
+        }
+        open_accounts = [a for a in adaptive if rates[a] > 0]
+        while budget > 1e-9 and open_accounts:
+            total_rate = sum(rates[a] for a in open_accounts)
+            spent = 0.0
+            for account_id in list(open_accounts):
+                share = budget * rates[account_id] / total_rate
+                room = cap[account_id] - syncs_per_day[account_id]
+                grant = min(share, room)
+                syncs_per_day[account_id] += grant
+                spent += grant
+                if grant >= room:
+                    open_accounts.remove(account_id)
+            budget -= spent
+            if spent <= 1e-9:
+                break
+
+        return {
+            account_id: round(24 / syncs_per_day[account_id], 2)
+            for account_id in account_ids
+        }
+
+    def next_sync(
+        self, status: AccountStatus, interval_hours: float, now: datetime
+    ) -> datetime:
+        """When an account is next due, respecting an exhausted rate limit."""
+        if not status.last_sync:
+            return now
+        due = datetime.fromisoformat(status.last_sync) + timedelta(hours=interval_hours)
+        rate_limit = status.rate_limit
+        if (
+            rate_limit
+            and (rate_limit.limit or 0) > 0
+            and rate_limit.remaining == 0
+            and rate_limit.reset
+        ):
+            due = max(due, datetime.fromisoformat(rate_limit.reset))
+        return due
@@ -1,15 +1,59 @@
 """Sync service implementation."""
 
+import asyncio
+import contextlib
+import hashlib
 import logging
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
-from ..domain import AccountLink, AccountStatus, RateLimit, Transaction
+from ..domain import (
+    DEFAULT_TENANT_ID,
+    AccountActivity,
+    AccountLink,
+    AccountStatus,
+    BankTransaction,
+    RateLimit,
+    Transaction,
+    UploadBatch,
+)
 from ..ports import AccountLinkRepository, SyncStatusRepository
 from ..ports import GoCardlessService, LunchMoneyService, TokenService
+from ..ports import AccountActivityRepository, NormalizationRuleRepository
+from ..ports import SyncRunRepository, TransactionStore, UploadJournal
+from ..tracing import finished_spans, set_attributes, span
+from .fairness import FairLimiter
+from .normalization import DEFAULT_RULES, TransactionNormalizer
+from .run_history import runs_from_spans
+from .sync_planner import SyncPlanner
 
 logger = logging.getLogger(__name__)
 
 
+def _root_error_class(error: BaseException) -> str:
+    """Class of the error at the bottom of the chain.
+
+    Adapters re-raise upstream errors as plain exceptions, so the underlying
+    error, such as an ``httpx.ConnectTimeout``, says more about the failure.
+    """
+    seen = set()
+    while id(error) not in seen:
+        seen.add(id(error))
+        cause = error.__cause__ or error.__context__
+        if cause is None:
+            break
+        error = cause
+    return type(error).__name__
+
+
+def _batch_id(account_id: str, transactions: List[Transaction]) -> str:
+    """Stable ID of an upload batch, so a re-planned batch maps to the same entry."""
+    digest = hashlib.sha256(account_id.encode())
+    for external_id in sorted(tx.external_id for tx in transactions):
+        digest.update(b"\0" + external_id.encode())
+    return digest.hexdigest()[:32]
+
+
 class SyncService:
     def __init__(
         self,
@@ -19,6 +63,18 @@ class SyncService:
         account_link_repository: AccountLinkRepository,
         sync_status_repository: SyncStatusRepository,
         days_to_sync: int = 30,
+        normalization_rule_repository: Optional[NormalizationRuleRepository] = None,
+        account_sync_timeout: Optional[float] = None,
+        max_concurrent_accounts: int = 4,
+        tenant_id: str = DEFAULT_TENANT_ID,
+        limiter: Optional[FairLimiter] = None,
+        activity_repository: Optional[AccountActivityRepository] = None,
+        planner: Optional[SyncPlanner] = None,
+        run_history_repository: Optional[SyncRunRepository] = None,
+        history_retention_days: int = 30,
+        upload_journal: Optional[UploadJournal] = None,
+        upload_batch_size: int = 500,
+        transaction_store: Optional[TransactionStore] = None,
     ):
         self.token_service = token_service
         self.gocardless_service = gocardless_service
@@ -26,69 +82,412 @@ class SyncService:
         self.account_link_repository = account_link_repository
         self.sync_status_repository = sync_status_repository
         self.days_to_sync = days_to_sync
+        self.normalization_rule_repository = normalization_rule_repository
+        self.account_sync_timeout = account_sync_timeout
+        self.max_concurrent_accounts = max_concurrent_accounts
+        self.tenant_id = tenant_id
+        self.limiter = limiter
+        self.activity_repository = activity_repository
+        self.planner = planner or SyncPlanner()
+        self.run_history_repository = run_history_repository
+        self.history_retention_days = history_retention_days
+        self._compacted_on: Optional[str] = None
+        self.upload_journal = upload_journal
+        self.upload_batch_size = upload_batch_size
+        self.transaction_store = transaction_store
+        self.default_normalizer = TransactionNormalizer(DEFAULT_RULES)
+        self._normalizers: Dict[str, TransactionNormalizer] = {}
 
-    async def sync_transactions(self, account_id: str | None = None) -> None:
-        """Sync transactions for one or all accounts."""
-        account_links = await self.account_link_repository.load_links(account_id)
-        access_token = self.token_service.get_token()
-        now = datetime.now()
+    async def sync_transactions(
+        self,
+        account_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> Dict[str, AccountStatus]:
+        """Sync transactions for one or all accounts.
+
+        `since` and `until` override the default window of `days_to_sync`.
+        Returns the resulting status per GoCardless account ID.
+        """
+        with span(
+            "sync.run", tenant=self.tenant_id, account_filter=account_id or "all"
+        ) as run_span:
+            account_links = await self.account_link_repository.load_links(account_id)
+            run_span.attributes["accounts"] = len(account_links)
+            return await self._sync_links(account_links, since, until)
+
+    async def sync_due_transactions(
+        self, now: Optional[datetime] = None
+    ) -> Dict[str, AccountStatus]:
+        """Sync only the accounts whose planned sync interval has passed."""
+        with span("sync.run", tenant=self.tenant_id, account_filter="due") as run_span:
+            now = now or datetime.now()
+            account_links = await self.account_link_repository.load_links()
+            schedule = await self.get_sync_schedule(account_links, now)
+            due_links = [
+                link for link in account_links if schedule[link.gocardless_id][1] <= now
+            ]
+            run_span.attributes.update(accounts=len(account_links), due=len(due_links))
+            # Finish uploads that a previous run left behind, due or not
+            await self.resume_pending_uploads()
+            return await self._sync_links(due_links)
+
+    async def resume_pending_uploads(self, account_id: Optional[str] = None) -> int:
+        """Upload the journaled batches that were never committed.
+
+        The batches are re-checked against Lunch Money, as the upload may have
+        been accepted before the process died, but GoCardless is not called.
+        Returns the number of transactions created.
+        """
+        if not self.upload_journal:
+            return 0
+
+        pending = await self.upload_journal.pending(account_id)
+        if not pending:
+            return 0
+
+        created = 0
+        with span("sync.resume_uploads", batches=len(pending)) as resume_span:
+            for batch_account_id in dict.fromkeys(b.account_id for b in pending):
+                async with self.upload_journal.lock(batch_account_id):
+                    # Another run may have finished these while we waited
+                    for batch in await self.upload_journal.pending(batch_account_id):
+                        try:
+                            new_transactions = await self._dedup(batch.transactions)
+                            if new_transactions:
+                                created += len(
+                                    await self.lunchmoney_service.create_transactions(
+                                        new_transactions
+                                    )
+                                )
+                            await self.upload_journal.commit(batch.id)
+                        except Exception as e:
+                            logger.error(
+                                f"Error resuming upload batch {batch.id}: {str(e)}"
+                            )
+                            await self.upload_journal.fail(batch.id, str(e))
+                            resume_span.status = "error"
+                            resume_span.status_message = str(e)
+            resume_span.attributes["created"] = created
+        return created
 
+    async def abandoned_uploads(self) -> Dict[str, int]:
+        """Number of transactions per account in batches given up on."""
+        if not self.upload_journal:
+            return {}
+        abandoned: Dict[str, int] = {}
+        for batch in await self.upload_journal.abandoned():
+            abandoned[batch.account_id] = abandoned.get(batch.account_id, 0) + len(
+                batch.transactions
+            )
+        return abandoned
+
+    async def get_sync_schedule(
+        self, account_links: List[AccountLink], now: Optional[datetime] = None
+    ) -> Dict[str, Tuple[float, datetime]]:
+        """Planned interval in hours and next sync time per account."""
+        now = now or datetime.now()
+        activity = await self._load_activity()
+        statuses = {
+            link.gocardless_id: await self.sync_status_repository.get_status(
+                link.gocardless_id
+            )
+            for link in account_links
+        }
+        intervals = self.planner.intervals(
+            [link.gocardless_id for link in account_links],
+            activity,
+            {
+                account_id: status.rate_limit.limit
+                for account_id, status in statuses.items()
+                # Unknown limits are None, or -1 in statuses saved before
+                if status.rate_limit and (status.rate_limit.limit or 0) > 0
+            },
+        )
+        schedule = {}
         for link in account_links:
-            await self._sync_account_transactions(link, access_token, now)
+            status = statuses[link.gocardless_id]
+            interval = intervals[link.gocardless_id]
+            schedule[link.gocardless_id] = (
+                interval,
+                self.planner.next_sync(status, interval, now),
+            )
+        return schedule
+
+    async def set_interval_override(
+        self, account_id: str, interval_hours: Optional[float]
+    ) -> AccountActivity:
+        """Pin the sync interval of an account, or hand it back to the planner."""
+        if not self.activity_repository:
+            raise ValueError("Sync intervals are not configurable")
+        activity = (await self._load_activity()).get(account_id, AccountActivity())
+        activity = AccountActivity(
+            transactions_per_day=activity.transactions_per_day,
+            updated_at=activity.updated_at,
+            interval_override_hours=interval_hours,
+        )
+        await self.activity_repository.save_activity(account_id, activity)
+        return activity
+
+    async def _load_activity(self) -> Dict[str, AccountActivity]:
+        if not self.activity_repository:
+            return {}
+        return await self.activity_repository.load_activity()
+
+    async def _sync_links(
+        self,
+        account_links: List[AccountLink],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Dict[str, AccountStatus]:
+        if not account_links:
+            return {}
+
+        with span("gocardless.token"):
+            access_token = self.token_service.get_token()
+        now = datetime.now()
+
+        # Accounts run side by side so that a slow bank only holds its own slot
+        semaphore = asyncio.Semaphore(self.max_concurrent_accounts)
+
+        async def sync_account(link: AccountLink) -> AccountStatus:
+            # The shared limiter keeps one tenant from taking every slot
+            slot = (
+                self.limiter.slot(self.tenant_id)
+                if self.limiter
+                else contextlib.nullcontext()
+            )
+            async with semaphore, slot:
+                return await self._sync_account_transactions(
+                    link, access_token, now, since, until
+                )
+
+        statuses = await asyncio.gather(*[sync_account(link) for link in account_links])
+        await self._record_runs(now)
+        return {
+            link.gocardless_id: status for link, status in zip(account_links, statuses)
+        }
+
+    async def _record_runs(self, now: datetime) -> None:
+        """Append the finished account runs of this trace to the run history."""
+        if not self.run_history_repository:
+            return
+
+        try:
+            await self.run_history_repository.append_runs(
+                runs_from_spans(finished_spans())
+            )
+            # Compact at most once a day; it rewrites the history
+            today = now.date().isoformat()
+            if self._compacted_on != today:
+                cutoff = now - timedelta(days=self.history_retention_days)
+                await self.run_history_repository.compact(cutoff.date().isoformat())
+                self._compacted_on = today
+        except Exception as e:
+            logger.warning(f"Error recording sync run history: {str(e)}")
 
     async def _sync_account_transactions(
-        self, link: AccountLink, access_token: str, now: datetime
-    ) -> None:
-        """Sync transactions for a single account."""
+        self,
+        link: AccountLink,
+        access_token: str,
+        now: datetime,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> AccountStatus:
+        """Sync transactions for a single account within the sync deadline."""
         logger.info(f"Syncing transactions for account {link.gocardless_id}")
 
         # Update sync status to indicate sync in progress
         status = AccountStatus(is_syncing=True, last_sync_status="pending")
         await self.sync_status_repository.save_status(link.gocardless_id, status)
 
-        try:
-            # Calculate date range
-            from_date = (now - timedelta(days=self.days_to_sync)).date().isoformat()
+        with span(
+            "sync.account",
+            gocardless_id=link.gocardless_id,
+            lunchmoney_id=link.lunchmoney_id,
+        ) as account_span:
+            try:
+                async with asyncio.timeout(self.account_sync_timeout):
+                    status = await self._sync_account(
+                        link, access_token, now, since, until
+                    )
 
-            # Fetch transactions from GoCardless
+            except TimeoutError:
+                account_span.attributes["error_class"] = "TimeoutError"
+                logger.error(
+                    f"Sync timed out for account {link.gocardless_id} "
+                    f"after {self.account_sync_timeout}s"
+                )
+                account_span.status = "error"
+                account_span.status_message = "timeout"
+                status = AccountStatus(
+                    last_sync=now.isoformat(),
+                    last_sync_status="timeout",
+                    is_syncing=False,
+                )
+
+            except asyncio.CancelledError:
+                # Don't leave the account marked as syncing when shut down mid-run
+                status = AccountStatus(
+                    last_sync=now.isoformat(),
+                    last_sync_status="error",
+                    is_syncing=False,
+                )
+                await asyncio.shield(
+                    self.sync_status_repository.save_status(link.gocardless_id, status)
+                )
+                raise
+
+            except Exception as e:
+                logger.error(f"Sync failed for account {link.gocardless_id}: {str(e)}")
+                account_span.attributes["error_class"] = _root_error_class(e)
+                account_span.status = "error"
+                account_span.status_message = str(e)
+                status = AccountStatus(
+                    last_sync=now.isoformat(),
+                    last_sync_status="error",
+                    is_syncing=False,
+                )
+
+            account_span.attributes["sync_status"] = status.last_sync_status
+
+        await self.sync_status_repository.save_status(link.gocardless_id, status)
+        return status
+
+    async def _sync_account(
+        self,
+        link: AccountLink,
+        access_token: str,
+        now: datetime,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> AccountStatus:
+        # A batch interrupted by a crash goes out before anything new is fetched
+        await self.resume_pending_uploads(link.gocardless_id)
+
+        # Calculate date range
+        from_date = (
+            since or (now - timedelta(days=self.days_to_sync)).date().isoformat()
+        )
+
+        # Fetch transactions from GoCardless
+        with span("gocardless.get_transactions", date_from=from_date):
             (
                 transactions_data,
                 rate_limits,
             ) = await self.gocardless_service.get_transactions(
-                link.gocardless_id, access_token, from_date
+                link.gocardless_id, access_token, from_date, until
+            )
+            remaining = (rate_limits or {}).get("remaining")
+            set_attributes(
+                booked=len(transactions_data.booked),
+                pending=len(transactions_data.pending),
+                rate_limit_remaining=-1 if remaining is None else remaining,
+            )
+
+        # Only regular windows ending now say something about current activity
+        if until is None:
+            await self._record_activity(
+                link, transactions_data.booked, rate_limits, from_date, now
             )
 
-            # Transform and sync transactions
-            all_transactions = []
-            for tx_type in ["booked"]:  # Currently only processing booked transactions
-                transformed_transactions = [
-                    await self._transform_transaction(tx, link.lunchmoney_id)
-                    for tx in transactions_data.get(tx_type, [])
-                ]
-                all_transactions.extend(transformed_transactions)
+        # Transform and sync transactions
+        normalizer = await self._get_normalizer(link, access_token)
+        with span("sync.transform") as transform_span:
+            # Currently only processing booked transactions
+            all_transactions = [
+                await self._transform_transaction(tx, link.lunchmoney_id, normalizer)
+                for tx in transactions_data.booked
+            ]
+            transform_span.attributes["transactions"] = len(all_transactions)
 
-            # Send to Lunch Money
-            result = await self._sync_to_lunchmoney(all_transactions)
+        await self._store_transactions(link, all_transactions)
 
-            # Update sync status with success
-            status = AccountStatus(
-                last_sync=now.isoformat(),
-                last_sync_status="success",
-                last_sync_transactions=len(result),
-                is_syncing=False,
-                rate_limit=RateLimit(**rate_limits) if rate_limits else None,
+        # Send to Lunch Money; two runs could otherwise both find a journaled
+        # batch missing from Lunch Money and post it twice
+        upload_lock = (
+            self.upload_journal.lock(link.gocardless_id)
+            if self.upload_journal
+            else contextlib.nullcontext()
+        )
+        async with upload_lock:
+            result = await self._sync_to_lunchmoney(
+                all_transactions, link.gocardless_id
             )
 
-        except Exception as e:
-            logger.error(f"Sync failed for account {link.gocardless_id}: {str(e)}")
-            status = AccountStatus(
-                last_sync=now.isoformat(), last_sync_status="error", is_syncing=False
+        return AccountStatus(
+            last_sync=now.isoformat(),
+            last_sync_status="success",
+            last_sync_transactions=len(result),
+            is_syncing=False,
+            rate_limit=RateLimit(**rate_limits) if rate_limits else None,
+        )
+
+    async def _sync_to_lunchmoney(
+        self, transactions: list[Transaction], account_id: str
+    ) -> list[dict]:
+        """Sync transactions to Lunch Money, handling duplicates.
+
+        With a journal, every batch is recorded before it is uploaded and
+        committed once Lunch Money accepts it.
+        """
+        new_transactions = await self._dedup(transactions)
+        if not new_transactions:
+            logger.info("No new transactions to sync")
+            return []
+
+        if not self.upload_journal:
+            return await self.lunchmoney_service.create_transactions(new_transactions)
+
+        # The dedup read can lag behind recent uploads, the journal does not.
+        # Transactions of abandoned batches are not retried either.
+        skipped = await self.upload_journal.committed_external_ids(account_id)
+        skipped.update(
+            tx.external_id
+            for batch in await self.upload_journal.abandoned(account_id)
+            for tx in batch.transactions
+        )
+        new_transactions = [
+            tx for tx in new_transactions if tx.external_id not in skipped
+        ]
+
+        batches = []
+        for start in range(0, len(new_transactions), self.upload_batch_size):
+            chunk = new_transactions[start : start + self.upload_batch_size]
+            batch = UploadBatch(
+                id=_batch_id(account_id, chunk),
+                account_id=account_id,
+                asset_id=chunk[0].asset_id,
+                created_at=datetime.now().isoformat(),
+                transactions=chunk,
             )
+            await self.upload_journal.plan(batch)
+            batches.append(batch)
 
-        await self.sync_status_repository.save_status(link.gocardless_id, status)
+        async def upload(batch: UploadBatch) -> list[dict]:
+            try:
+                result = await self.lunchmoney_service.create_transactions(
+                    batch.transactions
+                )
+            except Exception as e:
+                await self.upload_journal.fail(batch.id, str(e))
+                raise
+            await self.upload_journal.commit(batch.id)
+            return result
 
-    async def _sync_to_lunchmoney(self, transactions: list[Transaction]) -> list[dict]:
-        """Sync transactions to Lunch Money, handling duplicates."""
+        # Batches go out side by side; the adaptive limiter of the Lunch Money
+        # adapter decides how many are in flight. Every batch gets to finish
+        # and commit before the first error is raised.
+        results = await asyncio.gather(
+            *(upload(batch) for batch in batches), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return [response for result in results for response in result]
+
+    async def _dedup(self, transactions: list[Transaction]) -> list[Transaction]:
+        """Transactions that are not in Lunch Money yet."""
         if not transactions:
             return []
 
@@ -98,45 +497,119 @@ class SyncService:
         end_date = max(dates)
 
         # Fetch existing transactions
-        existing_transactions = await self.lunchmoney_service.get_transactions(
-            transactions[0].asset_id, start_date, end_date
-        )
-        existing_ids = {tx["external_id"] for tx in existing_transactions}
+        with span(
+            "lunchmoney.get_transactions", start_date=start_date, end_date=end_date
+        ) as dedup_span:
+            existing_transactions = await self.lunchmoney_service.get_transactions(
+                transactions[0].asset_id, start_date, end_date
+            )
+            existing_ids = {tx.external_id for tx in existing_transactions}
 
-        # Filter out existing transactions
-        new_transactions = [
-            tx for tx in transactions if tx.external_id not in existing_ids
-        ]
+            # Filter out existing transactions
+            new_transactions = [
+                tx for tx in transactions if tx.external_id not in existing_ids
+            ]
+            dedup_span.attributes.update(
+                existing=len(existing_transactions), new=len(new_transactions)
+            )
+        return new_transactions
 
-        if not new_transactions:
-            logger.info("No new transactions to sync")
-            return []
+    async def _store_transactions(
+        self, link: AccountLink, transactions: List[Transaction]
+    ) -> None:
+        """Keep the local copy that search and rollups are served from up to
+        date; the store moves rollups with the inserted and changed rows."""
+        if not self.transaction_store:
+            return
+
+        try:
+            with span("store.upsert_transactions") as store_span:
+                changes = await self.transaction_store.upsert_transactions(
+                    link.gocardless_id, transactions
+                )
+                store_span.attributes["changed"] = len(changes)
+        except Exception as e:
+            logger.warning(
+                f"Error storing transactions for {link.gocardless_id}: {str(e)}"
+            )
+
+    async def _record_activity(
+        self,
+        link: AccountLink,
+        booked: List[BankTransaction],
+        rate_limits: Optional[Dict],
+        from_date: str,
+        now: datetime,
+    ) -> None:
+        if not self.activity_repository:
+            return
+        if not booked and rate_limits and rate_limits.get("remaining") == 0:
+            # A rate-limited response is empty, which is not the same as quiet
+            return
+
+        try:
+            activity = (await self._load_activity()).get(link.gocardless_id)
+            activity = self.planner.observe(
+                activity, [tx.booking_date for tx in booked], from_date, now
+            )
+            await self.activity_repository.save_activity(link.gocardless_id, activity)
+        except Exception as e:
+            logger.warning(
+                f"Error recording activity for account {link.gocardless_id}: {str(e)}"
+            )
+
+    async def _get_normalizer(
+        self, link: AccountLink, access_token: str
+    ) -> TransactionNormalizer:
+        """Get the compiled normalizer for the institution of an account."""
+        if not self.normalization_rule_repository:
+            return self.default_normalizer
+
+        try:
+            account_details, _ = await self.gocardless_service.get_account_details(
+                link.gocardless_id, access_token
+            )
+            institution_id = account_details.get("institution_id") or "default"
+            set_attributes(institution_id=institution_id)
+        except Exception as e:
+            logger.warning(
+                f"Could not resolve institution for {link.gocardless_id}: {str(e)}"
+            )
+            institution_id = "default"
 
-        return await self.lunchmoney_service.create_transactions(new_transactions)
+        if institution_id not in self._normalizers:
+            rules = await self.normalization_rule_repository.load_rules(
+                None if institution_id == "default" else institution_id
+            )
+            self._normalizers[institution_id] = TransactionNormalizer(
+                DEFAULT_RULES + rules
+            )
+        return self._normalizers[institution_id]
 
     async def _transform_transaction(
-        self, tx_data: dict, lunchmoney_id: int
+        self,
+        tx_data: BankTransaction,
+        lunchmoney_id: int,
+        normalizer: Optional[TransactionNormalizer] = None,
     ) -> Transaction:
         """Transform GoCardless transaction to domain model."""
-        raw_notes = tx_data.get("remittanceInformationUnstructured", "")
-        notes = (
-            raw_notes
-            if "remittanceinformation:" not in raw_notes
-            else raw_notes.split("remittanceinformation:")[1].strip()
-        )
+        normalizer = normalizer or self.default_normalizer
 
         payee = (
-            tx_data.get("merchantName")
-            or tx_data.get("creditorName")
-            or tx_data.get("debtorName", "Unknown")
+            tx_data.merchant_name
+            or tx_data.creditor_name
+            or tx_data.debtor_name
+            or "Unknown"
         )
 
         return Transaction(
-            date=datetime.fromisoformat(tx_data["bookingDate"]).date().isoformat(),
-            amount=f"{float(tx_data['transactionAmount']['amount']):.2f}",
-            currency=(tx_data["transactionAmount"]["currency"]).lower(),
-            payee=payee.strip(),
-            notes=notes.strip(),
+            date=datetime.fromisoformat(tx_data.booking_date).date().isoformat(),
+            amount=f"{float(tx_data.transaction_amount.amount):.2f}",
+            currency=tx_data.transaction_amount.currency.lower(),
+            payee=normalizer.normalize_payee(payee),
+            notes=normalizer.normalize_notes(
+                tx_data.remittance_information_unstructured
+            ),
             asset_id=lunchmoney_id,
-            external_id=tx_data["internalTransactionId"],
+            external_id=tx_data.internal_transaction_id,
         )
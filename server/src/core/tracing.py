@@ -0,0 +1,88 @@
+"""Lightweight span tracing for sync runs.
+
+Spans nest through a context variable, so they follow asyncio tasks. All
+spans of a trace are handed to the configured exporters once its root span
+ends.
+"""
+
+import logging
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from .domain import Span
+from .ports import SpanExporter
+
+logger = logging.getLogger(__name__)
+
+_exporters: List[SpanExporter] = []
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_trace_spans: ContextVar[Optional[List[Span]]] = ContextVar("trace_spans", default=None)
+
+
+def set_exporters(exporters: List[SpanExporter]) -> None:
+    _exporters[:] = exporters
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span, if there is one."""
+    span_ = _current_span.get()
+    if span_ is not None:
+        span_.attributes.update(attributes)
+
+
+def increment_attribute(name: str, amount: int = 1) -> None:
+    """Add to a counter attribute of the current span, if there is one."""
+    span_ = _current_span.get()
+    if span_ is not None:
+        span_.attributes[name] = span_.attributes.get(name, 0) + amount
+
+
+def finished_spans() -> List[Span]:
+    """Spans of the current trace that have ended so far."""
+    return list(_trace_spans.get() or [])
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    parent = _current_span.get()
+    is_root = parent is None
+    span_ = Span(
+        name=name,
+        trace_id=secrets.token_hex(16) if is_root else parent.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_span_id=None if is_root else parent.span_id,
+        start_time_unix_nano=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    spans_token = _trace_spans.set([]) if is_root else None
+    span_token = _current_span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.status = "error"
+        span_.status_message = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span_.end_time_unix_nano = time.time_ns()
+        spans = _trace_spans.get()
+        if spans is not None:
+            spans.append(span_)
+        _current_span.reset(span_token)
+        if spans_token is not None:
+            _trace_spans.reset(spans_token)
+            _export(spans)
+
+
+def _export(spans: List[Span]) -> None:
+    for exporter in _exporters:
+        try:
+            exporter.export(spans)
+        except Exception as e:
+            logger.warning(f"Span export failed: {str(e)}")
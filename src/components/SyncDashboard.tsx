@@ -222,6 +222,11 @@ export function SyncDashboard() {
                                             {account.lastSyncTransactions} transactions
                                         </div>
                                     )}
+                                    {account.abandonedUploads > 0 && (
+                                        <div className="text-sm text-red-600">
+                                            {account.abandonedUploads} transactions rejected by Lunch Money
+                                        </div>
+                                    )}
                                 </td>
                                 <td className="px-6 py-4 whitespace-nowrap">
                                     <div className="flex items-center">
@@ -261,11 +266,14 @@ export function SyncDashboard() {
                                                 ? 'bg-green-100 text-green-800'
                                                 : account.lastSyncStatus === 'error'
                                                     ? 'bg-red-100 text-red-800'
-                                                    : 'bg-gray-100 text-gray-800'
+                                                    : account.lastSyncStatus === 'timeout'
+                                                        ? 'bg-amber-100 text-amber-800'
+                                                        : 'bg-gray-100 text-gray-800'
                                         }`}>
                                         {account.lastSyncStatus === 'success' &&
                                             <CheckCircle className="h-3 w-3 mr-1"/>}
-                                        {account.lastSyncStatus === 'error' &&
+                                        {(account.lastSyncStatus === 'error' ||
+                                                account.lastSyncStatus === 'timeout') &&
                                             <AlertCircle className="h-3 w-3 mr-1"/>}
                                         {account.lastSyncStatus || 'Never synced'}
                                     </span>
@@ -1,4 +1,11 @@
 import {API_CONFIG} from '../config/api';
+import type {BalanceHistoryResponse, BalanceResolution} from '../types/balances';
+import type {DashboardResponse} from '../types/dashboard';
+import type {
+    SpendingRollupsResponse,
+    TransactionSearchParams,
+    TransactionSearchResponse
+} from '../types/transactions';
 import type {
     Institution,
     InstitutionsResponse,
@@ -7,6 +14,88 @@ import type {
     RequisitionsResponse
 } from '../types/gocardless';
 
+export async function fetchDashboard(): Promise<DashboardResponse> {
+    try {
+        const response = await fetch(`${API_CONFIG.baseUrl}/dashboard`);
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => null);
+            throw new Error(
+                errorData?.message || `API error: ${response.status} ${response.statusText}`
+            );
+        }
+        return response.json();
+    } catch (error) {
+        console.error('Error fetching dashboard:', error);
+        throw error;
+    }
+}
+
+export async function fetchBalanceHistory(
+    accountId: string,
+    resolution: BalanceResolution = 'day',
+    since?: string
+): Promise<BalanceHistoryResponse> {
+    try {
+        const params = new URLSearchParams({resolution, ...(since ? {since} : {})});
+        const response = await fetch(
+            `${API_CONFIG.baseUrl}/balances/${accountId}/history?${params}`
+        );
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => null);
+            throw new Error(
+                errorData?.message || `API error: ${response.status} ${response.statusText}`
+            );
+        }
+        return response.json();
+    } catch (error) {
+        console.error('Error fetching balance history:', error);
+        throw error;
+    }
+}
+
+export async function searchTransactions(
+    params: TransactionSearchParams
+): Promise<TransactionSearchResponse> {
+    try {
+        const query = new URLSearchParams();
+        for (const [key, value] of Object.entries(params)) {
+            for (const item of Array.isArray(value) ? value : [value]) {
+                if (item !== undefined && item !== '') {
+                    query.append(key, String(item));
+                }
+            }
+        }
+        const response = await fetch(`${API_CONFIG.baseUrl}/transactions/search?${query}`);
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => null);
+            throw new Error(
+                errorData?.message || `API error: ${response.status} ${response.statusText}`
+            );
+        }
+        return response.json();
+    } catch (error) {
+        console.error('Error searching transactions:', error);
+        throw error;
+    }
+}
+
+export async function fetchSpendingRollups(from?: string, to?: string): Promise<SpendingRollupsResponse> {
+    try {
+        const params = new URLSearchParams({...(from ? {from} : {}), ...(to ? {to} : {})});
+        const response = await fetch(`${API_CONFIG.baseUrl}/transactions/rollups?${params}`);
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => null);
+            throw new Error(
+                errorData?.message || `API error: ${response.status} ${response.statusText}`
+            );
+        }
+        return response.json();
+    } catch (error) {
+        console.error('Error fetching spending rollups:', error);
+        throw error;
+    }
+}
+
 export async function fetchRequisitions(): Promise<RequisitionsResponse> {
     try {
         const response = await fetch(`${API_CONFIG.baseUrl}/requisitions/`);
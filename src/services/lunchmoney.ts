@@ -56,4 +56,32 @@ export async function unlinkLunchmoneyAccount(lunchmoneyId: number, gocardlessId
         console.error('Error unlinking account:', error);
         throw error;
     }
-}
\ No newline at end of file
+}
+
+export interface AccountLinkChange {
+    lunchmoneyId: number;
+    gocardlessId: string;
+}
+
+export async function updateLunchmoneyLinks(
+    link: AccountLinkChange[],
+    unlink: AccountLinkChange[] = []
+): Promise<void> {
+    try {
+        const response = await fetch(`${API_CONFIG.baseUrl}/lunchmoney/links`, {
+            method: 'POST',
+            headers: API_CONFIG.headers,
+            body: JSON.stringify({link, unlink}),
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => null);
+            throw new Error(
+                errorData?.message || `API error: ${response.status} ${response.statusText}`
+            );
+        }
+    } catch (error) {
+        console.error('Error updating account links:', error);
+        throw error;
+    }
+}
@@ -0,0 +1,17 @@
+export type BalanceResolution = 'raw' | 'hour' | 'day' | 'week' | 'month';
+
+export interface BalancePoint {
+    timestamp: string;
+    amount: string;
+    min: string;
+    max: string;
+    samples: number;
+}
+
+export interface BalanceHistoryResponse {
+    accountId: string;
+    currency: string;
+    balanceType: string;
+    resolution: BalanceResolution;
+    points: BalancePoint[];
+}
@@ -0,0 +1,11 @@
+import type {Requisition, RequisitionDetails} from './gocardless';
+import type {LunchmoneyAsset} from './lunchmoney';
+import type {SyncStatus} from './sync';
+
+export interface DashboardResponse {
+    accounts: SyncStatus[];
+    assets: LunchmoneyAsset[];
+    requisitions: Requisition[];
+    requisitionDetails: Record<string, RequisitionDetails>;
+    stale: boolean;
+}
@@ -11,8 +11,10 @@ export interface SyncStatus {
     lunchmoneyName: string;
     lastSync: string | null;
     nextSync: string;
-    lastSyncStatus: 'success' | 'error' | 'pending' | null;
+    syncIntervalHours: number;
+    lastSyncStatus: 'success' | 'error' | 'timeout' | 'pending' | null;
     lastSyncTransactions: number;
     isSyncing: boolean;
     rateLimit: RateLimit;
+    abandonedUploads: number;
 }
\ No newline at end of file
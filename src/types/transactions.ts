@@ -0,0 +1,41 @@
+export interface StoredTransaction {
+    accountId: string;
+    externalId: string;
+    date: string;
+    amount: string;
+    currency: string;
+    payee: string;
+    notes: string;
+    assetId: number;
+}
+
+export interface TransactionSearchParams {
+    q?: string;
+    accountId?: string[];
+    from?: string;
+    to?: string;
+    minAmount?: string;
+    maxAmount?: string;
+    limit?: number;
+    offset?: number;
+}
+
+export interface TransactionSearchResponse {
+    total: number;
+    transactions: StoredTransaction[];
+    tookMs: number;
+}
+
+export interface SpendingRollup {
+    accountId: string;
+    key: string;
+    currency: string;
+    count: number;
+    spent: string;
+    received: string;
+}
+
+export interface SpendingRollupsResponse {
+    months: SpendingRollup[];
+    payees: SpendingRollup[];
+}
@@ -0,0 +1,12 @@
+import pytest
+
+
+def pytest_collectstart(collector):
+    # Every async test runs under anyio; sync tests ignore the marker
+    if isinstance(collector, pytest.Module):
+        collector.add_marker(pytest.mark.anyio)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,162 @@
+"""In-memory implementations of the ports for service tests."""
+
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+from server.src.core.domain import (
+    AccountActivity,
+    AccountLink,
+    AccountStatus,
+    BankTransaction,
+    BankTransactions,
+    LunchMoneyTransaction,
+    Transaction,
+)
+from server.src.core.ports import (
+    AccountActivityRepository,
+    AccountLinkRepository,
+    GoCardlessService,
+    LunchMoneyService,
+    SyncStatusRepository,
+    TokenService,
+)
+from server.src.core.services.sync_service import SyncService
+
+
+def bank_transaction(external_id: str, booking_date: str = "2024-11-26", **fields):
+    return msgspec.convert(
+        {
+            "bookingDate": booking_date,
+            "transactionAmount": {"amount": "-1.0", "currency": "EUR"},
+            "creditorName": "ACME",
+            "internalTransactionId": external_id,
+            **fields,
+        },
+        BankTransaction,
+    )
+
+
+class FakeTokenService(TokenService):
+    def get_token(self) -> str:
+        return "token"
+
+    def refresh_token(self) -> str:
+        return "token"
+
+    def create_token(self):
+        raise NotImplementedError
+
+
+class FakeGoCardlessService(GoCardlessService):
+    def __init__(self, transactions: Optional[Dict[str, List[BankTransaction]]] = None):
+        self.transactions = transactions or {}
+        self.calls: List[str] = []
+
+    async def get_account_details(self, account_id: str, access_token: str):
+        return {"id": account_id, "iban": f"IBAN-{account_id}"}, {}
+
+    async def get_transactions(
+        self,
+        account_id: str,
+        access_token: str,
+        from_date: str,
+        to_date: Optional[str] = None,
+    ):
+        self.calls.append(account_id)
+        return BankTransactions(booked=self.transactions.get(account_id, [])), {
+            "limit": 4,
+            "remaining": 3,
+            "reset": None,
+        }
+
+
+class FakeLunchMoneyService(LunchMoneyService):
+    def __init__(self):
+        self.created: List[Transaction] = []
+
+    async def get_assets(self) -> List[Dict[str, Any]]:
+        return [{"id": 1, "name": "Checking"}]
+
+    async def get_transactions(self, asset_id: int, start_date: str, end_date: str):
+        return [
+            LunchMoneyTransaction(id=i, date=tx.date, external_id=tx.external_id)
+            for i, tx in enumerate(self.created)
+            if tx.asset_id == asset_id and start_date <= tx.date <= end_date
+        ]
+
+    async def create_transactions(self, transactions: List[Transaction]):
+        self.created.extend(transactions)
+        return [{"ids": list(range(len(transactions)))}]
+
+
+class InMemoryAccountLinkRepository(AccountLinkRepository):
+    def __init__(self, links: Optional[List[AccountLink]] = None):
+        self.links = list(links or [])
+
+    async def load_links(self, account_id: Optional[str] = None):
+        return [
+            link
+            for link in self.links
+            if account_id is None or link.gocardless_id == account_id
+        ]
+
+    def save_link(self, link: AccountLink) -> None:
+        self.links.append(link)
+
+    def remove_link(self, lunchmoney_id: int, gocardless_id: str) -> None:
+        self.links = [
+            link
+            for link in self.links
+            if (link.lunchmoney_id, link.gocardless_id)
+            != (lunchmoney_id, gocardless_id)
+        ]
+
+
+class InMemorySyncStatusRepository(SyncStatusRepository):
+    def __init__(self):
+        self.statuses: Dict[str, AccountStatus] = {}
+
+    async def get_status(self, account_id: str) -> AccountStatus:
+        return self.statuses.get(account_id, AccountStatus())
+
+    async def save_status(self, account_id: str, status: AccountStatus) -> None:
+        self.statuses[account_id] = status
+
+    async def reset_sync_status(self) -> None:
+        for status in self.statuses.values():
+            status.is_syncing = False
+
+
+class InMemoryAccountActivityRepository(AccountActivityRepository):
+    def __init__(self):
+        self.activity: Dict[str, AccountActivity] = {}
+
+    async def load_activity(self) -> Dict[str, AccountActivity]:
+        return dict(self.activity)
+
+    async def save_activity(self, account_id: str, activity: AccountActivity) -> None:
+        self.activity[account_id] = activity
+
+
+def make_sync_service(
+    transactions: Optional[Dict[str, List[BankTransaction]]] = None, **kwargs
+) -> SyncService:
+    transactions = transactions or {}
+    return SyncService(
+        token_service=FakeTokenService(),
+        gocardless_service=FakeGoCardlessService(transactions),
+        lunchmoney_service=FakeLunchMoneyService(),
+        account_link_repository=InMemoryAccountLinkRepository(
+            [
+                AccountLink(
+                    lunchmoney_id=index + 1,
+                    gocardless_id=account_id,
+                    created_at="2024-01-01T00:00:00",
+                )
+                for index, account_id in enumerate(transactions)
+            ]
+        ),
+        sync_status_repository=InMemorySyncStatusRepository(),
+        **kwargs,
+    )
@@ -0,0 +1,79 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.adapters.outbound.file_storage import IndexedAccountLinkRepository
+from server.src.core.domain import AccountLink
+
+
+def link(lunchmoney_id: int, gocardless_id: str) -> AccountLink:
+    return AccountLink(
+        lunchmoney_id=lunchmoney_id,
+        gocardless_id=gocardless_id,
+        created_at="2024-01-01T00:00:00",
+    )
+
+
+async def test_links_are_one_to_one_on_both_sides(tmp_path):
+    repository = IndexedAccountLinkRepository(tmp_path / "account-links.json")
+    repository.apply_changes([link(1, "acc-1"), link(2, "acc-2")], [])
+    # Relinking asset 2 drops its old link, and the old link of acc-1
+    repository.save_link(link(2, "acc-1"))
+
+    assert await repository.load_links() == [link(2, "acc-1")]
+    assert await repository.load_links("acc-2") == []
+
+    repository.remove_link(1, "acc-1")  # not linked to each other
+    assert await repository.load_links("acc-1") == [link(2, "acc-1")]
+
+
+async def test_batch_is_one_write_and_outside_edits_are_picked_up(tmp_path):
+    file_path = tmp_path / "account-links.json"
+    repository = IndexedAccountLinkRepository(file_path)
+    repository.apply_changes(
+        [link(i, f"acc-{i}") for i in range(1, 11)], [(99, "acc-99")]
+    )
+    assert len(json.loads(file_path.read_text())["links"]) == 10
+
+    file_path.write_text(
+        json.dumps(
+            {
+                "links": [
+                    {
+                        "lunchmoneyId": 5,
+                        "gocardlessId": "acc-5",
+                        "createdAt": "2024-01-01T00:00:00",
+                    }
+                ]
+            }
+        )
+    )
+    assert await repository.load_links() == [link(5, "acc-5")]
+
+
+def test_bulk_link_endpoint(tmp_path):
+    repository = IndexedAccountLinkRepository(tmp_path / "account-links.json")
+    repository.save_link(link(1, "acc-1"))
+    app.dependency_overrides[dependencies.get_account_link_repository] = lambda: (
+        repository
+    )
+    try:
+        response = TestClient(app).post(
+            "/api/lunchmoney/links",
+            json={
+                "link": [
+                    {"lunchmoneyId": 2, "gocardlessId": "acc-2"},
+                    {"lunchmoneyId": 3, "gocardlessId": "acc-3"},
+                ],
+                "unlink": [{"lunchmoneyId": 1, "gocardlessId": "acc-1"}],
+            },
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert (response.json()["linked"], response.json()["unlinked"]) == (2, 1)
+    data = json.loads(repository.file_path.read_text())
+    assert [entry["gocardlessId"] for entry in data["links"]] == ["acc-2", "acc-3"]
@@ -0,0 +1,142 @@
+import json
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.outbound import file_storage
+from server.src.adapters.outbound.archive import (
+    ArchivedGoCardlessAdapter,
+    FileTransactionArchive,
+    OfflineTokenService,
+)
+from server.src.adapters.outbound.file_storage import FileTenantRepository
+from server.src.core.domain import (
+    AccountActivity,
+    AccountLink,
+    AccountStatus,
+    RateLimit,
+)
+from tests.fakes import FakeLunchMoneyService, make_sync_service
+
+
+def response(*transactions):
+    booked = [
+        {
+            "bookingDate": booking_date,
+            "transactionAmount": {"amount": amount, "currency": "EUR"},
+            "creditorName": "ACME",
+            "internalTransactionId": external_id,
+        }
+        for external_id, booking_date, amount in transactions
+    ]
+    # Pretty-printed on purpose: line breaks must not break the JSONL segments
+    return json.dumps({"transactions": {"booked": booked, "pending": []}}, indent=2)
+
+
+async def test_raw_responses_round_trip_by_date_range(tmp_path):
+    archive = FileTransactionArchive(tmp_path)
+    first = response(("tx-1", "2024-10-02", "-1.0")).encode()
+    second = response(("tx-2", "2024-11-20", "-2.0")).encode()
+
+    await archive.append_transactions("acc-1", "2024-10-01", "2024-10-31", first)
+    await archive.append_transactions("acc-1", "2024-11-01", "2024-11-30", second)
+
+    assert await archive.load_transactions("acc-1") == [
+        first.replace(b"\n", b" "),
+        second.replace(b"\n", b" "),
+    ]
+    assert len(await archive.load_transactions("acc-1", "2024-11-05")) == 1
+    assert len(await archive.load_transactions("acc-1", None, "2024-10-15")) == 1
+    assert await archive.load_transactions("unknown") == []
+
+
+async def test_replay_uploads_from_archive_without_gocardless(tmp_path):
+    archive = FileTransactionArchive(tmp_path)
+    await archive.append_transactions(
+        "acc-1",
+        "2024-11-01",
+        None,
+        response(
+            ("tx-1", "2024-11-02", "-1.0"), ("tx-2", "2024-11-03", "-2.0")
+        ).encode(),
+    )
+    # A later fetch corrects tx-2
+    await archive.append_transactions(
+        "acc-1", "2024-11-01", None, response(("tx-2", "2024-11-03", "-2.5")).encode()
+    )
+    sync_service = make_sync_service({"acc-1": []})
+    sync_service.token_service = OfflineTokenService()
+    sync_service.gocardless_service = ArchivedGoCardlessAdapter(archive)
+
+    await sync_service.sync_transactions(since="2024-11-01")
+
+    created = sync_service.lunchmoney_service.created
+    assert sorted((tx.external_id, tx.amount) for tx in created) == [
+        ("tx-1", "-1.00"),
+        ("tx-2", "-2.50"),
+    ]
+
+
+async def test_replay_leaves_the_live_schedule_alone(tmp_path, monkeypatch):
+    (tmp_path / "tenants.json").write_text(
+        json.dumps(
+            {
+                "tenants": [
+                    {
+                        "id": "a",
+                        "gocardlessSecretId": "a-id",
+                        "gocardlessSecretKey": "a-key",
+                        "lunchmoneyAccessToken": "a-lm-token",
+                    }
+                ]
+            }
+        )
+    )
+    monkeypatch.setattr(file_storage, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(
+        dependencies,
+        "get_tenant_repository",
+        lambda: FileTenantRepository(tmp_path / "tenants.json"),
+    )
+    providers = [
+        provider
+        for provider in vars(dependencies).values()
+        if hasattr(provider, "instances")
+    ]
+    try:
+        dependencies.get_account_link_repository("a").save_link(
+            AccountLink(
+                lunchmoney_id=1,
+                gocardless_id="acc-1",
+                created_at="2024-01-01T00:00:00",
+            )
+        )
+        live_status = AccountStatus(
+            last_sync="2024-11-20T08:00:00",
+            last_sync_status="success",
+            rate_limit=RateLimit(limit=4, remaining=2, reset=3600),
+        )
+        live_activity = AccountActivity(
+            transactions_per_day=3.0, updated_at="2024-11-20T08:00:00"
+        )
+        statuses = dependencies.get_sync_status_repository("a")
+        activity = dependencies.get_account_activity_repository("a")
+        await statuses.save_status("acc-1", live_status)
+        await activity.save_activity("acc-1", live_activity)
+        await dependencies.get_transaction_archive("a").append_transactions(
+            "acc-1",
+            "2024-11-01",
+            None,
+            response(("tx-1", "2024-11-02", "-1.0")).encode(),
+        )
+
+        replay = dependencies.get_replay_sync_service("a")
+        replay.lunchmoney_service = FakeLunchMoneyService()
+        await replay.sync_transactions(since="2024-11-01")
+
+        assert [tx.external_id for tx in replay.lunchmoney_service.created] == ["tx-1"]
+        assert await statuses.get_status("acc-1") == live_status
+        assert (await activity.load_activity())["acc-1"] == live_activity
+    finally:
+        for store in dependencies.get_transaction_store.instances.values():
+            store.close()
+        for provider in providers:
+            provider.instances.pop("a", None)
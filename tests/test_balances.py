@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+
+import httpx
+import msgspec
+import pytest
+
+from server.src.adapters.outbound.balances import FileBalanceRepository
+from server.src.adapters.outbound.gocardless import GoCardlessApiAdapter
+from server.src.adapters.outbound.http import PooledHttpClient
+from server.src.core.domain import BalanceSeries, BalanceSnapshot
+from server.src.core.services.balances import downsample
+
+DAY = 86400
+# A Monday
+START = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def snapshot(timestamp: int, amount: int) -> BalanceSnapshot:
+    return BalanceSnapshot(
+        timestamp=timestamp,
+        amount=amount,
+        currency="EUR",
+        balance_type="interimAvailable",
+    )
+
+
+async def test_series_survive_a_restart_and_a_torn_append(tmp_path):
+    repository = FileBalanceRepository(tmp_path)
+    for day in range(10):
+        await repository.append_snapshot("acc-1", snapshot(START + day * DAY, day))
+    # The process died halfway through appending a timestamp
+    with open(tmp_path / "acc-1.ts", "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    reopened = FileBalanceRepository(tmp_path)
+    series = await reopened.load_series("acc-1", START + 2 * DAY, START + 5 * DAY)
+    assert series.amounts == [2, 3, 4]
+    assert await reopened.load_series("acc-2") is None
+
+    await reopened.append_snapshot("acc-1", snapshot(START + 10 * DAY, 10))
+    series = await FileBalanceRepository(tmp_path).load_series("acc-1")
+    assert series.amounts == list(range(11))
+    assert series.timestamps[-1] == START + 10 * DAY
+
+
+async def test_snapshots_of_another_balance_type_are_rejected(tmp_path):
+    repository = FileBalanceRepository(tmp_path)
+    await repository.append_snapshot("acc-1", snapshot(START, 100))
+
+    booked = BalanceSnapshot(
+        timestamp=START + DAY, amount=90, currency="EUR", balance_type="closingBooked"
+    )
+    with pytest.raises(ValueError):
+        await repository.append_snapshot("acc-1", booked)
+
+    series = await FileBalanceRepository(tmp_path).load_series("acc-1")
+    assert series.amounts == [100]
+    assert series.balance_type == "interimAvailable"
+
+
+def test_downsample_keeps_the_last_balance_per_bucket():
+    series = BalanceSeries(
+        currency="EUR",
+        balance_type="interimAvailable",
+        timestamps=[START + hour * 3600 for hour in range(0, 24 * 14, 6)],
+        amounts=list(range(0, 24 * 14, 6)),
+    )
+
+    days = downsample(series, "day")
+    assert len(days) == 14
+    assert days[0] == {
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "amount": "0.18",
+        "min": "0.00",
+        "max": "0.18",
+        "samples": 4,
+    }
+
+    weeks = downsample(series, "week")
+    assert [point["timestamp"][:10] for point in weeks] == ["2024-01-01", "2024-01-08"]
+    assert [point["samples"] for point in weeks] == [28, 28]
+    assert len(downsample(series, "month")) == 1
+
+
+async def test_regular_syncs_snapshot_the_balance(tmp_path):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path.endswith("/balances/"):
+            body = {
+                "balances": [
+                    {
+                        "balanceAmount": {"amount": "100.00", "currency": "EUR"},
+                        "balanceType": "closingBooked",
+                    },
+                    {
+                        "balanceAmount": {"amount": "657.49", "currency": "EUR"},
+                        "balanceType": "interimAvailable",
+                    },
+                ]
+            }
+        else:
+            body = {"transactions": {"booked": [], "pending": []}}
+        return httpx.Response(200, content=msgspec.json.encode(body))
+
+    repository = FileBalanceRepository(tmp_path)
+    adapter = GoCardlessApiAdapter(
+        http=PooledHttpClient(transport=httpx.MockTransport(handler)),
+        balances=repository,
+    )
+    await adapter.get_transactions("acc-1", "token", "2024-01-01")
+    # Replays of past windows leave the balances alone
+    await adapter.get_transactions("acc-1", "token", "2024-01-01", "2024-01-31")
+
+    series = await repository.load_series("acc-1")
+    assert series.amounts == [65749]
+    assert series.balance_type == "interimAvailable"
+    assert sum(path.endswith("/balances/") for path in requested) == 1
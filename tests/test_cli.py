@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from server.src.adapters.inbound import cli
+from server.src.adapters.inbound.web import dependencies
+from tests.fakes import bank_transaction, make_sync_service
+
+
+@pytest.fixture
+def sync_service(monkeypatch):
+    sync_service = make_sync_service({"acc-1": [bank_transaction("tx-1")]})
+    sync_service.requested_tenants = []
+
+    def get_sync_service(tenant_id):
+        sync_service.requested_tenants.append(tenant_id)
+        return sync_service
+
+    monkeypatch.setattr(dependencies, "get_sync_service", get_sync_service)
+    return sync_service
+
+
+def test_sync_prints_summary_and_exits_zero(sync_service, capsys):
+    exit_code = cli.main(["sync", "--account", "acc-1", "--since", "2024-11-01"])
+
+    assert exit_code == 0
+    assert json.loads(capsys.readouterr().out) == {
+        "ok": True,
+        "accounts": [{"gocardlessId": "acc-1", "status": "success", "transactions": 1}],
+    }
+    assert sync_service.requested_tenants == ["default"]
+
+
+def test_sync_targets_the_given_tenant(sync_service, capsys):
+    cli.main(["sync", "--tenant", "smith", "--account", "acc-1"])
+
+    assert sync_service.requested_tenants == ["smith"]
+
+
+def test_sync_without_matching_accounts_fails(sync_service, capsys):
+    exit_code = cli.main(["sync", "--account", "unknown"])
+
+    assert exit_code == 1
+    assert json.loads(capsys.readouterr().out)["ok"] is False
+
+
+def test_invalid_date_is_rejected():
+    with pytest.raises(SystemExit) as exc_info:
+        cli.build_parser().parse_args(["sync", "--since", "2024-13-01"])
+
+    assert exc_info.value.code == 2
@@ -0,0 +1,105 @@
+import asyncio
+import re
+
+import httpx
+from fastapi import FastAPI
+
+from server.src.adapters.inbound.web.coalescing import (
+    COALESCED_PATHS,
+    CoalescingMiddleware,
+    RequestCoalescer,
+)
+
+
+def make_app(coalescer: RequestCoalescer):
+    app = FastAPI()
+    app.add_middleware(CoalescingMiddleware, coalescer=coalescer)
+    calls = []
+
+    @app.get("/api/assets")
+    async def assets(q: str = ""):
+        calls.append(q)
+        await asyncio.sleep(0.05)
+        return {"call": len(calls), "q": q}
+
+    return app, calls
+
+
+def client(app):
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+async def test_concurrent_identical_requests_share_one_computation():
+    coalescer = RequestCoalescer(paths=re.compile(r"^/api/"))
+    app, calls = make_app(coalescer)
+    async with client(app) as http:
+        responses = await asyncio.gather(*[http.get("/api/assets") for _ in range(5)])
+
+    assert calls == [""]
+    assert {r.json()["call"] for r in responses} == {1}
+    assert all(r.status_code == 200 for r in responses)
+    assert coalescer.stats == {"computed": 1, "coalesced": 4, "cached": 0}
+
+
+async def test_different_queries_are_not_coalesced():
+    app, calls = make_app(RequestCoalescer(paths=re.compile(r"^/api/")))
+    async with client(app) as http:
+        await asyncio.gather(http.get("/api/assets?q=a"), http.get("/api/assets?q=b"))
+
+    assert sorted(calls) == ["a", "b"]
+
+
+async def test_finished_requests_are_recomputed_without_ttl():
+    app, calls = make_app(RequestCoalescer(paths=re.compile(r"^/api/")))
+    async with client(app) as http:
+        await http.get("/api/assets")
+        second = await http.get("/api/assets")
+
+    assert second.json()["call"] == 2
+
+
+async def test_ttl_serves_recent_responses():
+    coalescer = RequestCoalescer(paths=re.compile(r"^/api/"), ttl=60)
+    app, calls = make_app(coalescer)
+    async with client(app) as http:
+        await http.get("/api/assets")
+        second = await http.get("/api/assets")
+
+    assert second.json()["call"] == 1
+    assert coalescer.stats["cached"] == 1
+
+
+async def test_unmatched_paths_pass_through():
+    app, calls = make_app(RequestCoalescer(paths=re.compile(r"^/api/other")))
+    async with client(app) as http:
+        await asyncio.gather(http.get("/api/assets"), http.get("/api/assets"))
+
+    assert len(calls) == 2
+
+
+def test_default_paths_cover_the_read_heavy_routes():
+    for path in (
+        "/api/sync/status",
+        "/api/lunchmoney/assets",
+        "/api/requisitions/",
+        "/api/tenants/acme/sync/status",
+    ):
+        assert COALESCED_PATHS.match(path)
+    for path in ("/api/sync/history", "/api/transactions/export", "/api/debug/loop"):
+        assert not COALESCED_PATHS.match(path)
+
+
+async def test_requests_to_different_hosts_are_not_coalesced():
+    coalescer = RequestCoalescer(paths=re.compile(r"^/api/"), ttl=60)
+    app, calls = make_app(coalescer)
+    async with client(app) as http:
+        await asyncio.gather(
+            http.get("/api/assets", headers={"Host": "proxy.example"}),
+            http.get("/api/assets", headers={"Host": "localhost:8000"}),
+        )
+        await http.get("https://proxy.example/api/assets")
+
+    assert len(calls) == 3
+    assert coalescer.stats["cached"] == 0
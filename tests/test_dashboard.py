@@ -0,0 +1,97 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.core.domain import Requisition
+from server.src.core.ports import RequisitionService
+from tests.fakes import FakeGoCardlessService, FakeTokenService, make_sync_service
+
+
+class CountingGoCardlessService(FakeGoCardlessService):
+    def __init__(self):
+        super().__init__()
+        self.details_calls = Counter()
+
+    async def get_account_details(self, account_id: str, access_token: str):
+        self.details_calls[account_id] += 1
+        return await super().get_account_details(account_id, access_token)
+
+
+class FakeRequisitionService(RequisitionService):
+    async def get_requisitions(self):
+        return [
+            Requisition(
+                id="req-1",
+                created="2024-01-01T00:00:00",
+                status="LN",
+                institution_id="BANK",
+                agreement="agr",
+                reference="ref",
+                accounts=["acc-1", "acc-2"],
+                user_language="EN",
+                link="https://example.test",
+            )
+        ]
+
+    async def get_requisition_details(self, requisition_id: str):
+        raise NotImplementedError
+
+    async def create_requisition(self, params):
+        raise NotImplementedError
+
+    async def delete_requisition(self, requisition_id: str):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def client():
+    sync_service = make_sync_service({"acc-1": []})
+    gocardless_service = CountingGoCardlessService()
+    app.dependency_overrides = {
+        dependencies.get_sync_service: lambda: sync_service,
+        dependencies.get_token_service: FakeTokenService,
+        dependencies.get_gocardless_service: lambda: gocardless_service,
+        dependencies.get_lunchmoney_service: lambda: sync_service.lunchmoney_service,
+        dependencies.get_requisition_service: FakeRequisitionService,
+    }
+    yield TestClient(app), gocardless_service
+    app.dependency_overrides = {}
+
+
+def test_dashboard_fetches_each_account_once(client):
+    test_client, gocardless_service = client
+
+    response = test_client.get("/api/dashboard")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["gocardlessId"] for a in data["accounts"]] == ["acc-1"]
+    assert data["assets"] == [{"id": 1, "name": "Checking", "linked_account": "acc-1"}]
+    assert [a["iban"] for a in data["requisitionDetails"]["req-1"]["accounts"]] == [
+        "IBAN-acc-1",
+        "IBAN-acc-2",
+    ]
+    assert gocardless_service.details_calls == {"acc-1": 1, "acc-2": 1}
+
+
+def test_dashboard_and_sync_status_agree_on_the_next_sync(client, monkeypatch):
+    test_client, _ = client
+    now = datetime.now().astimezone()
+    tick_job = SimpleNamespace(
+        next_run_time=now + timedelta(minutes=7),
+        trigger=SimpleNamespace(interval=timedelta(minutes=15)),
+    )
+    scheduler = SimpleNamespace(running=True, get_job=lambda job_id: tick_job)
+    monkeypatch.setattr(app.state, "scheduler", scheduler, raising=False)
+
+    dashboard = test_client.get("/api/dashboard").json()
+    status = test_client.get("/api/sync/status").json()
+
+    next_sync = tick_job.next_run_time.replace(tzinfo=None).isoformat()
+    assert dashboard["accounts"][0]["nextSync"] == next_sync
+    assert status["accounts"][0]["nextSync"] == next_sync
@@ -0,0 +1,128 @@
+import asyncio
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.adapters.inbound.web.export import parquet_available
+from server.src.adapters.outbound.transaction_store import SqliteTransactionStore
+from server.src.core.domain import Transaction, TransactionQuery
+
+
+def transaction(i: int, date: str) -> Transaction:
+    return Transaction(
+        date=date,
+        amount=f"-{i}.00",
+        currency="eur",
+        payee=f"Payee, {i}",
+        notes="",
+        asset_id=1,
+        external_id=f"tx-{i}",
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteTransactionStore(tmp_path / "transactions.sqlite3")
+    # Many rows share a date, which the keyset pagination has to page through
+    asyncio.run(
+        store.upsert_transactions(
+            "acc-1",
+            [transaction(i, f"2024-01-{i % 3 + 1:02d}") for i in range(2500)],
+        )
+    )
+    app.dependency_overrides[dependencies.get_transaction_store] = lambda: store
+    yield store
+    app.dependency_overrides.clear()
+    store.close()
+
+
+def test_batches_cover_every_row_once(store):
+    async def collect():
+        return [
+            batch
+            async for batch in store.iter_transactions(
+                TransactionQuery(date_from="2024-01-02"), batch_size=500
+            )
+        ]
+
+    batches = asyncio.run(collect())
+    rows = [tx for batch in batches for tx in batch]
+    assert len(batches) == 4
+    assert len({tx.external_id for tx in rows}) == len(rows) == 1666
+    assert [tx.date for tx in rows] == sorted(tx.date for tx in rows)
+
+
+def test_csv_export_streams_all_rows(store):
+    with TestClient(app).stream(
+        "GET", "/api/transactions/export", params={"accountId": "acc-1"}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "transactions.csv" in response.headers["content-disposition"]
+        body = b"".join(response.iter_bytes()).decode()
+
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert len(rows) == 2500
+    assert list(rows[0]) == [
+        "account_id",
+        "date",
+        "amount",
+        "currency",
+        "payee",
+        "notes",
+        "asset_id",
+        "external_id",
+    ]
+    assert rows[0]["date"] == "2024-01-01"
+    assert {row["payee"] for row in rows} >= {"Payee, 0"}
+
+
+def test_csv_export_quotes_formulas(store):
+    asyncio.run(
+        store.upsert_transactions(
+            "acc-2",
+            [
+                Transaction(
+                    date="2024-02-01",
+                    amount="-12.50",
+                    currency="eur",
+                    payee='=HYPERLINK("http://evil.example")',
+                    notes="@SUM(A1:A9)",
+                    asset_id=1,
+                    external_id="+1-555",
+                )
+            ],
+        )
+    )
+    response = TestClient(app).get(
+        "/api/transactions/export", params={"accountId": "acc-2"}
+    )
+
+    [row] = csv.DictReader(io.StringIO(response.text))
+    assert row["payee"] == '\'=HYPERLINK("http://evil.example")'
+    assert row["notes"] == "'@SUM(A1:A9)"
+    assert row["external_id"] == "'+1-555"
+    assert row["amount"] == "-12.50"
+
+
+@pytest.mark.skipif(parquet_available(), reason="pyarrow is installed")
+def test_parquet_export_needs_pyarrow(store):
+    response = TestClient(app).get(
+        "/api/transactions/export", params={"format": "parquet"}
+    )
+    assert response.status_code == 501
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow is not installed")
+def test_parquet_export_round_trips(store):
+    import pyarrow.parquet as pq
+
+    response = TestClient(app).get(
+        "/api/transactions/export", params={"format": "parquet"}
+    )
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 2500
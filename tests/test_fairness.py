@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from server.src.core.services.fairness import FairLimiter
+
+
+async def test_slots_alternate_between_waiting_tenants():
+    limiter = FairLimiter(1)
+    order = []
+    release = asyncio.Event()
+
+    async def work(tenant_id: str, wait: bool = False):
+        async with limiter.slot(tenant_id):
+            order.append(tenant_id)
+            if wait:
+                await release.wait()
+
+    holder = asyncio.create_task(work("big", wait=True))
+    await asyncio.sleep(0)
+    # "big" queues all its accounts before "small" arrives
+    waiters = [asyncio.create_task(work("big")) for _ in range(3)]
+    waiters.append(asyncio.create_task(work("small")))
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    assert order == ["big", "big", "small", "big", "big"]
+    assert limiter.in_use == 0
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    limiter = FairLimiter(1)
+
+    async with limiter.slot("a"):
+        waiter = asyncio.create_task(limiter.slot("b").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    assert limiter.in_use == 0
+    async with limiter.slot("c"):
+        assert limiter.in_use == 1
@@ -0,0 +1,84 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.adapters.outbound.http import PooledHttpClient
+from server.src.adapters.outbound.logos import FileLogoCache
+from server.src.core.domain import Institution
+from server.src.core.ports import InstitutionService
+
+LOGO_URL = "https://cdn.example.test/logos/bank.png"
+
+
+@pytest.fixture
+def logo_cache(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        return httpx.Response(
+            200, content=b"PNG-DATA", headers={"content-type": "image/png"}
+        )
+
+    cache = FileLogoCache(
+        tmp_path, http=PooledHttpClient(transport=httpx.MockTransport(handler))
+    )
+    cache.requests = requests
+    return cache
+
+
+class FakeInstitutionService(InstitutionService):
+    async def get_institutions(self, country: str):
+        return [
+            Institution(
+                id="BANK",
+                name="Bank",
+                bic="BANKXX",
+                transaction_total_days=90,
+                countries=[country],
+                logo=LOGO_URL,
+            )
+        ]
+
+
+@pytest.fixture
+def client(logo_cache):
+    app.dependency_overrides = {
+        dependencies.get_institution_service: FakeInstitutionService,
+        dependencies.get_logo_cache: lambda: logo_cache,
+    }
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def test_logo_is_fetched_once_and_served_by_content_hash(client, logo_cache):
+    [institution] = client.get("/api/institutions/?country=NL").json()
+    assert "/api/institutions/logos/sources/" in institution["logo"]
+
+    response = client.get(institution["logo"])
+    assert response.status_code == 200
+    assert response.content == b"PNG-DATA"
+    assert "immutable" in response.headers["cache-control"]
+
+    # The next listing points straight at the content-hash URL
+    [institution] = client.get("/api/institutions/?country=NL").json()
+    assert institution["logo"] == str(response.url)
+    assert client.get(institution["logo"]).content == b"PNG-DATA"
+    assert logo_cache.requests == [LOGO_URL]
+
+
+def test_only_registered_sources_can_be_fetched(client):
+    assert client.get("/api/institutions/logos/sources/unknown").status_code == 404
+    assert client.get("/api/institutions/logos/..%2Fsecret.png").status_code == 404
+
+
+async def test_registered_sources_survive_a_restart(logo_cache, tmp_path):
+    key = logo_cache.register(LOGO_URL)
+
+    restarted = FileLogoCache(tmp_path, http=logo_cache.http)
+    name = await restarted.fetch(key)
+
+    assert restarted.load(name) == (b"PNG-DATA", "image/png")
+    assert await restarted.fetch("unknown") is None
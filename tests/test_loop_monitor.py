@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from server.src.adapters.inbound.web.loop_monitor import LoopMonitor
+
+
+def block_the_loop():
+    time.sleep(0.3)
+
+
+async def test_blocking_call_is_reported_with_its_stack():
+    monitor = LoopMonitor(interval=0.01, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        block_the_loop()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    report = monitor.snapshot()
+    assert report["blocked"] == 1
+    assert report["lagMs"]["max"] >= 200
+    [offender] = report["offenders"]
+    assert "block_the_loop" in offender["location"]
+    assert offender["count"] == 1
+
+
+async def test_cooperative_code_is_not_reported():
+    monitor = LoopMonitor(interval=0.01, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.gather(*[asyncio.sleep(0.01) for _ in range(100)])
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    report = monitor.snapshot()
+    assert report["beats"] > 0
+    assert report["blocked"] == 0
+    assert report["offenders"] == []
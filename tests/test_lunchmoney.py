@@ -0,0 +1,92 @@
+import httpx
+import msgspec
+import pytest
+
+from server.src.adapters.outbound.http import PooledHttpClient
+from server.src.adapters.outbound.lunchmoney import LunchMoneyApiAdapter
+from server.src.core.domain.models import Transaction
+
+
+async def test_get_transactions_fetches_all_pages(monkeypatch):
+    monkeypatch.setenv("LUNCHMONEY_ACCESS_TOKEN", "token")
+    monkeypatch.setenv("LUNCHMONEY_PAGE_SIZE", "2")
+    monkeypatch.setenv("LUNCHMONEY_PAGE_CONCURRENCY", "2")
+    stored = [
+        {"id": i, "date": "2024-01-01", "external_id": f"ext-{i}", "payee": "x"}
+        for i in range(7)
+    ]
+    offsets = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        offsets.append(offset)
+        page = stored[offset : offset + limit]
+        return httpx.Response(
+            200,
+            content=msgspec.json.encode(
+                {"transactions": page, "has_more": offset + limit < len(stored)}
+            ),
+        )
+
+    adapter = LunchMoneyApiAdapter(
+        http=PooledHttpClient(transport=httpx.MockTransport(handler))
+    )
+    transactions = await adapter.get_transactions(1, "2024-01-01", "2024-01-31")
+
+    assert [t.id for t in transactions] == list(range(7))
+    assert transactions[0].external_id == "ext-0"
+    assert sorted(offsets) == [0, 2, 4, 6, 8]
+
+
+async def test_create_transactions_backs_off_and_retries_throttled_batches(
+    monkeypatch,
+):
+    monkeypatch.setenv("LUNCHMONEY_ACCESS_TOKEN", "token")
+    monkeypatch.setenv("LUNCHMONEY_CONCURRENCY", "4")
+    responses = iter([429, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(responses)
+        return httpx.Response(status, headers={"Retry-After": "0"}, json={"ids": [1]})
+
+    adapter = LunchMoneyApiAdapter(
+        http=PooledHttpClient(transport=httpx.MockTransport(handler))
+    )
+    transaction = Transaction(
+        date="2024-01-01",
+        amount="1.00",
+        currency="eur",
+        payee="x",
+        notes="",
+        asset_id=1,
+        external_id="ext-1",
+    )
+    result = await adapter.create_transactions([transaction])
+
+    assert result == [{"ids": [1]}]
+    assert adapter.limiter.limit == pytest.approx(2 + 1 / 2)
+    assert adapter.limiter.decreases == 1
+
+
+async def test_server_errors_and_transport_errors_cut_the_limit(monkeypatch):
+    monkeypatch.setenv("LUNCHMONEY_ACCESS_TOKEN", "token")
+    monkeypatch.setenv("LUNCHMONEY_CONCURRENCY", "8")
+    outcomes = iter(["503", "connect"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if next(outcomes) == "connect":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(503)
+
+    adapter = LunchMoneyApiAdapter(
+        http=PooledHttpClient(transport=httpx.MockTransport(handler))
+    )
+    with pytest.raises(Exception):
+        await adapter.get_assets()
+    assert adapter.limiter.limit == 4
+
+    with pytest.raises(Exception):
+        await adapter.get_assets()
+    assert adapter.limiter.limit == 2
+    assert adapter.limiter.decreases == 2
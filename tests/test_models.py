@@ -0,0 +1,60 @@
+import msgspec
+
+from server.src.adapters.outbound.gocardless import (
+    _institutions_decoder,
+    _transactions_decoder,
+)
+from server.src.adapters.outbound.lunchmoney import (
+    _CreateTransactionsRequest,
+    _encoder,
+)
+from server.src.core.domain import Transaction
+from server.src.core.services.sync_service import SyncService
+
+
+async def test_gocardless_transactions_decode_into_lunchmoney_payload():
+    body = b"""{"transactions": {"booked": [{
+        "transactionId": "2024-11-26-00.17.02.252833",
+        "bookingDate": "2024-11-26",
+        "valueDate": "2024-11-26",
+        "transactionAmount": {"amount": "-700.0", "currency": "EUR"},
+        "creditorName": "ISA",
+        "debtorName": "Johannes",
+        "remittanceInformationUnstructured": "Lebensgeld fuer Isa",
+        "purposeCode": "RINP",
+        "internalTransactionId": "9799dd15f2a208fe09d1c8045c9805e5"
+    }], "pending": []}}"""
+    sync_service = SyncService(None, None, None, None, None)
+
+    booked = _transactions_decoder.decode(body).transactions.booked
+    actual = await sync_service._transform_transaction(booked[0], 12345)
+
+    assert msgspec.json.decode(
+        _encoder.encode(_CreateTransactionsRequest(transactions=[actual]))
+    ) == {
+        "transactions": [
+            {
+                "amount": "-700.00",
+                "asset_id": 12345,
+                "currency": "eur",
+                "date": "2024-11-26",
+                "external_id": "9799dd15f2a208fe09d1c8045c9805e5",
+                "notes": "Lebensgeld fuer Isa",
+                "payee": "ISA",
+                "status": "uncleared",
+            }
+        ],
+        "check_for_recurring": True,
+        "debit_as_negative": True,
+    }
+    assert isinstance(actual, Transaction)
+
+
+def test_institutions_accept_numeric_strings():
+    body = b"""[{"id": "ING_INGDDEFF", "name": "ING", "bic": "INGDDEFFXXX",
+        "transaction_total_days": "730", "countries": ["DE"],
+        "logo": "https://cdn.example/ing.png", "max_access_valid_for_days": "180"}]"""
+
+    (institution,) = _institutions_decoder.decode(body)
+
+    assert institution.transaction_total_days == 730
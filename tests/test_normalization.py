@@ -0,0 +1,102 @@
+import json
+
+import msgspec
+import pytest
+
+from server.src.adapters.outbound.file_storage import FileNormalizationRuleRepository
+from server.src.core.domain import BankTransaction, NormalizationRule
+from server.src.core.services.normalization import (
+    DEFAULT_RULES,
+    TransactionNormalizer,
+)
+from server.src.core.services.sync_service import SyncService
+
+
+@pytest.fixture
+def sync_service():
+    return SyncService(
+        token_service=None,
+        gocardless_service=None,
+        lunchmoney_service=None,
+        account_link_repository=None,
+        sync_status_repository=None,
+    )
+
+
+async def test_default_rules_keep_remittance_information(sync_service):
+    tx = {
+        "bookingDate": "2024-11-22",
+        "creditorName": "AUDIBLE GMBH",
+        "internalTransactionId": "8d15ff4f8dc878f5fea3c878f44575ea",
+        "remittanceInformationUnstructured": "mandatereference:0xjNei1bcEUn?iEBC24JpkhuZ8,creditorid:DE31ZZZ00000563,remittanceinformation:D01-6254502-7698 "
+        "Audible Gmbh "
+        "541RZ71AMKXHF",
+        "transactionAmount": {"amount": "-0.99", "currency": "EUR"},
+    }
+
+    actual = await sync_service._transform_transaction(
+        msgspec.convert(tx, BankTransaction), 12345
+    )
+
+    assert actual.notes == "D01-6254502-7698 Audible Gmbh 541RZ71AMKXHF"
+    assert actual.payee == "AUDIBLE GMBH"
+
+
+async def test_institution_rules_are_applied(sync_service):
+    normalizer = TransactionNormalizer(
+        DEFAULT_RULES
+        + [
+            NormalizationRule(field="payee", pattern=r"^(PAYPAL \*|SEPA )"),
+            NormalizationRule(field="notes", pattern=r"\bcard \d{4}x+\d{4}\b"),
+        ]
+    )
+    tx = {
+        "bookingDate": "2024-11-26",
+        "creditorName": "PayPal *SPOTIFY ",
+        "internalTransactionId": "9799dd15f2a208fe09d1c8045c9805e5",
+        "remittanceInformationUnstructured": "Subscription  CARD 1234xxxx5678 Nov",
+        "transactionAmount": {"amount": "-9.99", "currency": "EUR"},
+    }
+
+    actual = await sync_service._transform_transaction(
+        msgspec.convert(tx, BankTransaction), 12345, normalizer
+    )
+
+    assert actual.payee == "SPOTIFY"
+    assert actual.notes == "Subscription Nov"
+
+
+def test_normalization_is_memoized():
+    normalizer = TransactionNormalizer(DEFAULT_RULES, cache_size=2)
+
+    for _ in range(3):
+        normalizer.normalize_notes("remittanceinformation:Rent")
+
+    assert normalizer.normalize_notes.cache_info().hits == 2
+
+
+async def test_file_rules_merge_default_and_institution(tmp_path):
+    (tmp_path / "default.json").write_text(
+        json.dumps({"rules": [{"field": "payee", "pattern": "^SEPA "}]})
+    )
+    (tmp_path / "ING_INGDDEFF.json").write_text(
+        json.dumps(
+            {
+                "rules": [
+                    {
+                        "field": "notes",
+                        "pattern": "Mandate",
+                        "replacement": "",
+                        "ignoreCase": False,
+                    }
+                ]
+            }
+        )
+    )
+    repository = FileNormalizationRuleRepository(tmp_path)
+
+    assert await repository.load_rules("ING_INGDDEFF") == [
+        NormalizationRule(field="payee", pattern="^SEPA "),
+        NormalizationRule(field="notes", pattern="Mandate", ignore_case=False),
+    ]
+    assert len(await repository.load_rules("OTHER")) == 1
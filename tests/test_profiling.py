@@ -0,0 +1,85 @@
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.adapters.inbound.web.profiling import Profiler
+from tests.fakes import bank_transaction, make_sync_service
+
+ADMIN = {"Authorization": "Bearer secret"}
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEBUG_ADMIN_TOKEN", "secret")
+    profiler = Profiler(tmp_path / "profiles")
+    sync_service = make_sync_service({"acc-1": [bank_transaction("tx-1")]})
+    app.dependency_overrides[dependencies.get_profiler] = lambda: profiler
+    app.dependency_overrides[dependencies.get_sync_service] = lambda: sync_service
+    monkeypatch.setattr(
+        "server.src.adapters.inbound.web.app.get_profiler", lambda: profiler
+    )
+    yield profiler
+    app.dependency_overrides.clear()
+
+
+def test_debug_routes_require_the_admin_token(profiler, monkeypatch):
+    client = TestClient(app)
+    assert client.get("/api/debug/profiles").status_code == 401
+    assert (
+        client.get("/api/debug/profiles", headers={"Authorization": "Bearer x"})
+    ).status_code == 401
+
+    monkeypatch.delenv("DEBUG_ADMIN_TOKEN")
+    assert client.get("/api/debug/profiles", headers=ADMIN).status_code == 404
+
+
+def test_sync_run_is_profiled_to_a_pstats_file(profiler):
+    client = TestClient(app)
+    response = client.post("/api/debug/profiles/sync", json={}, headers=ADMIN)
+    assert response.status_code == 202
+    profile_id = response.json()["id"]
+
+    [info] = client.get("/api/debug/profiles", headers=ADMIN).json()["profiles"]
+    assert (info["id"], info["kind"], info["status"]) == (profile_id, "sync", "done")
+
+    stats = pstats.Stats(str(profiler.stats_path(profile_id)))
+    assert any(name == "sync_transactions" for _, _, name in stats.stats)
+
+    download = client.get(f"/api/debug/profiles/{profile_id}", headers=ADMIN)
+    assert download.status_code == 200
+    text = client.get(
+        f"/api/debug/profiles/{profile_id}", params={"format": "text"}, headers=ADMIN
+    )
+    assert "sync_transactions" in text.text
+    collapsed = client.get(
+        f"/api/debug/profiles/{profile_id}",
+        params={"format": "collapsed"},
+        headers=ADMIN,
+    )
+    stacks = [line.rsplit(" ", 1) for line in collapsed.text.splitlines()]
+    assert any("sync_transactions" in stack for stack, _ in stacks)
+    assert all(int(microseconds) > 0 for _, microseconds in stacks)
+
+
+def test_next_requests_to_a_route_are_profiled(profiler):
+    client = TestClient(app)
+    response = client.post(
+        "/api/debug/profiles/requests",
+        json={"path": "/healthz", "count": 2},
+        headers=ADMIN,
+    )
+    profile_id = response.json()["id"]
+    # Only one profile captures at a time
+    busy = client.post("/api/debug/profiles/sync", json={}, headers=ADMIN)
+    assert busy.status_code == 409
+
+    for _ in range(3):
+        assert client.get("/healthz").status_code == 200
+
+    info = profiler.get_profile(profile_id)
+    assert (info.status, info.requests) == ("done", 2)
+    assert profiler.active is None
+    assert client.get("/api/debug/profiles/unknown", headers=ADMIN).status_code == 404
@@ -0,0 +1,195 @@
+import asyncio
+
+import httpx
+import pytest
+
+from server.src.adapters.outbound.resilience import (
+    ResilientInstitutionService,
+    is_upstream_failure,
+)
+from server.src.core.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    track_stale,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def http_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.test")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("failed", request=request, response=response)
+
+
+class FlakyInstitutions:
+    def __init__(self):
+        self.error = None
+        self.calls = 0
+
+    async def get_institutions(self, country):
+        self.calls += 1
+        if self.error:
+            try:
+                raise self.error
+            except Exception as e:
+                # Adapters wrap httpx errors the same way
+                raise Exception(f"Failed to get institutions: {e}")
+        return [country]
+
+
+def test_breaker_opens_and_recovers_through_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_only_upstream_errors_count_as_failures():
+    assert is_upstream_failure(http_error(503))
+    assert is_upstream_failure(http_error(429))
+    assert is_upstream_failure(httpx.ConnectTimeout("slow"))
+    assert not is_upstream_failure(http_error(404))
+    assert not is_upstream_failure(ValueError("bad input"))
+
+
+async def test_open_circuit_serves_last_good_data_as_stale():
+    inner = FlakyInstitutions()
+    breaker = CircuitBreaker("gocardless.institutions", failure_threshold=1)
+    service = ResilientInstitutionService(inner, {"gocardless.institutions": breaker})
+
+    assert await service.get_institutions("NL") == ["NL"]
+
+    inner.error = http_error(502)
+    tracker = track_stale()
+    assert await service.get_institutions("NL") == ["NL"]
+    assert tracker.stale
+    assert breaker.state == "open"
+
+    # Open circuit short-circuits without calling the upstream
+    assert await service.get_institutions("NL") == ["NL"]
+    assert inner.calls == 2
+
+    with pytest.raises(CircuitOpenError):
+        await service.get_institutions("DE")
+
+
+async def test_client_errors_do_not_trip_the_breaker():
+    inner = FlakyInstitutions()
+    inner.error = http_error(400)
+    breaker = CircuitBreaker("gocardless.institutions", failure_threshold=1)
+    service = ResilientInstitutionService(inner, {"gocardless.institutions": breaker})
+
+    with pytest.raises(Exception, match="Failed to get institutions"):
+        await service.get_institutions("NL")
+    assert breaker.state == "closed"
+
+
+async def test_limiter_grows_additively_while_healthy():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=2, max_limit=4, clock=clock)
+
+    for _ in range(2):
+        async with limiter.slot():
+            clock.now += 0.1
+    assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+
+    for _ in range(100):
+        async with limiter.slot():
+            pass
+    assert limiter.limit == 4
+
+
+async def test_limiter_cuts_once_per_congestion_event():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=8, clock=clock)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def congested_call():
+        async with limiter.slot() as sample:
+            started.set()
+            await release.wait()
+            sample.congested = True
+
+    # Calls in flight together all see the same congestion
+    tasks = [asyncio.create_task(congested_call()) for _ in range(4)]
+    await started.wait()
+    clock.now += 0.1
+    release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+    # A slow call afterwards is new congestion
+    async with limiter.slot():
+        clock.now += 10
+    assert limiter.limit == 2
+
+
+async def test_limiter_queues_calls_beyond_the_limit():
+    limiter = AdaptiveLimiter(initial=2)
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[call() for _ in range(6)])
+
+    assert peak <= 3
+    assert limiter.in_flight == 0
+
+
+async def test_cancelled_probe_lets_the_next_call_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "gocardless.institutions", failure_threshold=1, reset_timeout=10, clock=clock
+    )
+    inner = FlakyInstitutions()
+    service = ResilientInstitutionService(inner, {"gocardless.institutions": breaker})
+    breaker.record_failure()
+    clock.now = 10
+
+    async def hang(country):
+        await asyncio.sleep(10)
+
+    inner.get_institutions = hang
+    probe = asyncio.create_task(service.get_institutions("NL"))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    del inner.get_institutions
+    assert await service.get_institutions("NL") == ["NL"]
+    assert breaker.state == "closed"
@@ -0,0 +1,119 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.adapters.outbound.transaction_store import (
+    SqliteSpendingRollupRepository,
+    SqliteTransactionStore,
+)
+from server.src.core.domain import Transaction
+
+
+def transaction(external_id: str, payee: str, amount: str, date: str):
+    return Transaction(
+        date=date,
+        amount=amount,
+        currency="eur",
+        payee=payee,
+        notes="",
+        asset_id=1,
+        external_id=external_id,
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "transactions.sqlite3"
+
+
+async def sync(store, transactions):
+    await store.upsert_transactions("acc-1", transactions)
+
+
+async def test_rollups_follow_inserts_and_changes(db_path):
+    store = SqliteTransactionStore(db_path)
+    rollups = SqliteSpendingRollupRepository(store)
+    await sync(
+        store,
+        [
+            transaction("1", "Jumbo", "-10.00", "2024-01-30"),
+            transaction("2", "Jumbo", "-5.50", "2024-02-01"),
+            transaction("3", "Salary", "2000.00", "2024-02-25"),
+        ],
+    )
+    # The bank corrects the first transaction: new payee, amount and month
+    await sync(store, [transaction("1", "Albert", "-12.00", "2024-02-02")])
+
+    months = await rollups.load_rollups("month")
+    assert [(m.key, m.count, m.spent, m.received) for m in months] == [
+        ("2024-02", 3, "17.50", "2000.00")
+    ]
+    payees = await rollups.load_rollups("payee", limit=2)
+    assert [(p.key, p.count, p.spent) for p in payees] == [
+        ("Albert", 1, "12.00"),
+        ("Jumbo", 1, "5.50"),
+    ]
+    store.close()
+
+
+async def test_rollups_are_built_for_an_existing_store(db_path):
+    store = SqliteTransactionStore(db_path)
+    await store.upsert_transactions(
+        "acc-1",
+        [
+            transaction("1", "Jumbo", "-10.00", "2024-01-30"),
+            transaction("2", "Jumbo", "-5.50", "2024-02-01"),
+        ],
+    )
+    # As synced before rollups existed
+    with store.connection:
+        store.connection.execute("DELETE FROM spending_rollups")
+    store.close()
+
+    store = SqliteTransactionStore(db_path)
+    rollups = SqliteSpendingRollupRepository(store)
+    await sync(store, [transaction("3", "Jumbo", "-1.00", "2024-02-03")])
+
+    [payee] = await rollups.load_rollups("payee")
+    assert (payee.count, payee.spent) == (3, "16.50")
+    months = await rollups.load_rollups("month", ["acc-1"], "2024-02", "2024-02")
+    assert [(m.key, m.count) for m in months] == [("2024-02", 2)]
+    store.close()
+
+
+async def test_rows_are_not_stored_without_their_rollups(db_path, monkeypatch):
+    store = SqliteTransactionStore(db_path)
+    rollups = SqliteSpendingRollupRepository(store)
+
+    def fail(connection, deltas):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "_apply_deltas", fail)
+    with pytest.raises(RuntimeError):
+        await sync(store, [transaction("1", "Jumbo", "-10.00", "2024-01-30")])
+    monkeypatch.undo()
+
+    # The next sync still sees the row as new and counts it once
+    await sync(store, [transaction("1", "Jumbo", "-10.00", "2024-01-30")])
+    [payee] = await rollups.load_rollups("payee")
+    assert (payee.count, payee.spent) == (1, "10.00")
+    store.close()
+
+
+def test_rollups_endpoint(db_path):
+    store = SqliteTransactionStore(db_path)
+    rollups = SqliteSpendingRollupRepository(store)
+    app.dependency_overrides[dependencies.get_spending_rollup_repository] = lambda: (
+        rollups
+    )
+    try:
+        response = TestClient(app).get(
+            "/api/transactions/rollups", params={"from": "2024-01", "payees": 5}
+        )
+    finally:
+        app.dependency_overrides.clear()
+        store.close()
+
+    assert response.status_code == 200
+    assert response.json() == {"months": [], "payees": []}
@@ -0,0 +1,94 @@
+from server.src.adapters.outbound.file_storage import FileSyncRunRepository
+from server.src.core.domain import SyncRun
+from server.src.core.services.run_history import runs_from_spans
+from server.src.core.tracing import finished_spans, increment_attribute, span
+from tests.fakes import bank_transaction, make_sync_service
+
+
+def test_runs_are_built_from_the_account_subtree():
+    with span("sync.run"):
+        with span("sync.account", gocardless_id="acc-1") as account_span:
+            with span("gocardless.get_transactions", booked=5):
+                increment_attribute("http_calls")
+            with span("sync.transform", transactions=5):
+                pass
+            with span("lunchmoney.get_transactions", existing=3, new=2):
+                increment_attribute("http_calls", 2)
+            with span("lunchmoney.create_transactions", size=2):
+                increment_attribute("http_calls")
+            account_span.attributes["sync_status"] = "success"
+        runs = runs_from_spans(finished_spans())
+
+    [run] = runs
+    assert run.account_id == "acc-1"
+    assert run.status == "success"
+    assert (run.fetched, run.deduplicated, run.inserted) == (5, 3, 2)
+    assert run.http_calls == 4
+    assert set(run.phases) == {"fetch", "transform", "dedup", "upload"}
+
+
+def test_counts_add_up_across_repeated_phases():
+    with span("sync.run"):
+        with span("sync.account", gocardless_id="acc-1"):
+            for booked, new in ((5, 1), (4, 4)):
+                with span("gocardless.get_transactions", booked=booked):
+                    pass
+                with span("sync.transform", transactions=booked):
+                    pass
+                with span("lunchmoney.get_transactions", new=new):
+                    pass
+        [run] = runs_from_spans(finished_spans())
+
+    assert (run.fetched, run.deduplicated) == (9, 4)
+
+
+async def test_sync_appends_one_run_per_account(tmp_path):
+    repository = FileSyncRunRepository(
+        tmp_path / "runs.jsonl", tmp_path / "rollups.json"
+    )
+    sync_service = make_sync_service(
+        {"acc-1": [bank_transaction("tx-1")], "acc-2": []},
+        run_history_repository=repository,
+    )
+
+    await sync_service.sync_transactions()
+
+    runs = await repository.load_runs()
+    assert sorted(run.account_id for run in runs) == ["acc-1", "acc-2"]
+    assert {run.run_id for run in runs} == {runs[0].run_id}
+
+
+def run(account_id: str, started_at: str, status: str = "success") -> SyncRun:
+    return SyncRun(
+        run_id="r",
+        account_id=account_id,
+        started_at=started_at,
+        duration_ms=100.0,
+        status=status,
+        fetched=10,
+        inserted=2,
+        http_calls=3,
+    )
+
+
+async def test_compaction_folds_old_runs_into_daily_rollups(tmp_path):
+    repository = FileSyncRunRepository(
+        tmp_path / "runs.jsonl", tmp_path / "rollups.json"
+    )
+    await repository.append_runs(
+        [
+            run("acc-1", "2024-11-01T08:00:00"),
+            run("acc-1", "2024-11-01T16:00:00", status="error"),
+            run("acc-1", "2024-12-01T08:00:00"),
+        ]
+    )
+
+    await repository.compact("2024-11-15")
+
+    assert [r.started_at for r in await repository.load_runs()] == [
+        "2024-12-01T08:00:00"
+    ]
+    [rollup] = await repository.load_rollups()
+    assert (rollup.day, rollup.runs, rollup.errors) == ("2024-11-01", 2, 1)
+    assert (rollup.fetched, rollup.http_calls) == (20, 6)
+    assert rollup.total_duration_ms == 200.0
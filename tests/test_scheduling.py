@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from server.src.adapters.inbound.web.scheduling import (
+    SYNC_JOB_ID,
+    SyncTick,
+    create_scheduler,
+    ensure_sync_job,
+    sync_tick,
+)
+
+
+async def scheduled_sync():
+    pass
+
+
+async def test_sync_job_keeps_its_next_run_across_restarts(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYNC_TICK_MINUTES", "15")
+    db_path = tmp_path / "scheduler.sqlite3"
+
+    scheduler = create_scheduler(db_path)
+    scheduler.start()
+    ensure_sync_job(scheduler, scheduled_sync)
+    first = scheduler.get_job(SYNC_JOB_ID).next_run_time
+    scheduler.shutdown(wait=False)
+
+    restarted = create_scheduler(db_path)
+    restarted.start()
+    try:
+        ensure_sync_job(restarted, scheduled_sync)
+        job = restarted.get_job(SYNC_JOB_ID)
+        assert job.next_run_time == first
+        assert job.coalesce
+        assert job.misfire_grace_time == 15 * 60
+    finally:
+        restarted.shutdown(wait=False)
+
+
+async def test_changed_tick_reschedules_the_job(tmp_path, monkeypatch):
+    db_path = tmp_path / "scheduler.sqlite3"
+    monkeypatch.setenv("SYNC_TICK_MINUTES", "15")
+    scheduler = create_scheduler(db_path)
+    scheduler.start()
+    ensure_sync_job(scheduler, scheduled_sync)
+    scheduler.shutdown(wait=False)
+
+    monkeypatch.setenv("SYNC_TICK_MINUTES", "60")
+    restarted = create_scheduler(db_path)
+    restarted.start()
+    try:
+        ensure_sync_job(restarted, scheduled_sync)
+        tick = sync_tick(restarted)
+        assert tick.interval == timedelta(minutes=60)
+        assert tick.next_run > datetime.now() + timedelta(minutes=55)
+    finally:
+        restarted.shutdown(wait=False)
+
+
+def test_due_accounts_are_synced_by_the_next_tick():
+    tick = SyncTick(datetime(2024, 1, 1, 12, 0), timedelta(minutes=15))
+
+    assert tick.first_at_or_after(datetime(2024, 1, 1, 9, 0)) == tick.next_run
+    assert tick.first_at_or_after(datetime(2024, 1, 1, 12, 20)) == datetime(
+        2024, 1, 1, 12, 30
+    )
+    assert tick.first_at_or_after(datetime(2024, 1, 1, 12, 30)) == datetime(
+        2024, 1, 1, 12, 30
+    )
+
+
+def test_without_a_running_scheduler_there_is_no_tick():
+    assert sync_tick(None) is None
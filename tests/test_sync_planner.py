@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+
+import httpx
+
+from server.src.adapters.outbound.gocardless import GoCardlessApiAdapter
+from server.src.adapters.outbound.http import PooledHttpClient
+from server.src.core.domain import AccountActivity, AccountStatus, RateLimit
+from server.src.core.services.sync_planner import SyncPlanner
+from tests.fakes import (
+    InMemoryAccountActivityRepository,
+    bank_transaction,
+    make_sync_service,
+)
+
+
+def test_budget_goes_to_busy_accounts_within_bounds():
+    planner = SyncPlanner(budget_per_account=4, min_per_day=1, max_per_day=8)
+    activity = {
+        "busy": AccountActivity(transactions_per_day=10),
+        "medium": AccountActivity(transactions_per_day=2),
+        "dormant": AccountActivity(transactions_per_day=0),
+    }
+
+    intervals = planner.intervals(["busy", "medium", "dormant"], activity)
+
+    # 12 syncs a day: dormant keeps its minimum, busy hits the cap and the
+    # remainder flows to medium
+    assert intervals == {"busy": 3.0, "medium": 8.0, "dormant": 24.0}
+
+
+def test_override_is_kept_and_counts_against_the_budget():
+    planner = SyncPlanner(budget_per_account=2, min_per_day=1, max_per_day=8)
+    activity = {
+        "pinned": AccountActivity(interval_override_hours=4),
+        "busy": AccountActivity(transactions_per_day=5),
+    }
+
+    intervals = planner.intervals(["pinned", "busy"], activity)
+
+    assert intervals == {"pinned": 4.0, "busy": 24.0}
+
+
+def test_rate_is_smoothed_across_syncs():
+    planner = SyncPlanner(smoothing=0.5)
+    now = datetime(2024, 12, 1)
+    dates = ["2024-11-25"] * 10
+
+    first = planner.observe(None, dates, "2024-11-21", now)
+    second = planner.observe(first, [], "2024-11-21", now)
+
+    assert first.transactions_per_day == 1.0
+    assert second.transactions_per_day == 0.5
+
+
+def test_exhausted_rate_limit_postpones_next_sync():
+    planner = SyncPlanner()
+    now = datetime(2024, 12, 1, 12)
+    reset = now + timedelta(hours=10)
+    status = AccountStatus(
+        last_sync=(now - timedelta(hours=6)).isoformat(),
+        rate_limit=RateLimit(limit=4, remaining=0, reset=reset.isoformat()),
+    )
+
+    assert planner.next_sync(status, 3, now) == reset
+    assert planner.next_sync(AccountStatus(), 3, now) == now
+
+
+async def test_only_due_accounts_are_synced_and_activity_is_learned():
+    activity_repository = InMemoryAccountActivityRepository()
+    today = datetime.now().date().isoformat()
+    sync_service = make_sync_service(
+        {
+            "fresh": [bank_transaction("tx-1", today)],
+            "recent": [bank_transaction("tx-2", today)],
+        },
+        activity_repository=activity_repository,
+    )
+    now = datetime.now()
+    await sync_service.sync_status_repository.save_status(
+        "recent", AccountStatus(last_sync=now.isoformat())
+    )
+
+    statuses = await sync_service.sync_due_transactions(now)
+
+    assert list(statuses) == ["fresh"]
+    assert activity_repository.activity["fresh"].transactions_per_day > 0
+
+
+def test_syncs_are_clamped_to_the_reported_rate_limit():
+    planner = SyncPlanner(budget_per_account=6, min_per_day=1, max_per_day=8)
+    activity = {
+        "busy": AccountActivity(transactions_per_day=10),
+        "pinned": AccountActivity(interval_override_hours=1),
+        "quiet": AccountActivity(transactions_per_day=1),
+    }
+
+    intervals = planner.intervals(
+        ["busy", "pinned", "quiet"], activity, {"busy": 4, "pinned": 2}
+    )
+
+    # busy and pinned get no more calls than GoCardless allows them; the rest
+    # of the budget goes to quiet, up to the planner's own cap
+    assert intervals == {"busy": 6.0, "pinned": 12.0, "quiet": 3.0}
+
+
+async def test_schedule_respects_the_last_reported_rate_limit():
+    sync_service = make_sync_service(
+        {"acc-1": []},
+        activity_repository=InMemoryAccountActivityRepository(),
+        planner=SyncPlanner(budget_per_account=12, max_per_day=12),
+    )
+    await sync_service.activity_repository.save_activity(
+        "acc-1", AccountActivity(transactions_per_day=50)
+    )
+    await sync_service.sync_status_repository.save_status(
+        "acc-1",
+        AccountStatus(rate_limit=RateLimit(limit=4, remaining=3, reset=None)),
+    )
+
+    [link] = await sync_service.account_link_repository.load_links()
+    schedule = await sync_service.get_sync_schedule([link])
+
+    assert schedule["acc-1"][0] == 6.0
+
+
+async def test_quiet_account_without_rate_limit_headers_still_decays():
+    def handler(request):
+        return httpx.Response(200, json={"transactions": {"booked": [], "pending": []}})
+
+    activity_repository = InMemoryAccountActivityRepository()
+    sync_service = make_sync_service(
+        {"acc-1": []}, activity_repository=activity_repository
+    )
+    sync_service.gocardless_service = GoCardlessApiAdapter(
+        http=PooledHttpClient(transport=httpx.MockTransport(handler))
+    )
+    sync_service.normalization_rule_repository = None
+    await activity_repository.save_activity(
+        "acc-1",
+        AccountActivity(transactions_per_day=4.0, updated_at="2024-12-01T00:00:00"),
+    )
+
+    statuses = await sync_service.sync_transactions()
+
+    assert statuses["acc-1"].rate_limit.remaining is None
+    assert activity_repository.activity["acc-1"].transactions_per_day < 4.0
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from tests.fakes import FakeGoCardlessService, bank_transaction, make_sync_service
+
+
+class HangingGoCardlessService(FakeGoCardlessService):
+    async def get_transactions(self, account_id, *args, **kwargs):
+        if account_id == "slow":
+            await asyncio.sleep(3600)
+        return await super().get_transactions(account_id, *args, **kwargs)
+
+
+async def test_slow_account_times_out_without_delaying_others():
+    transactions = {
+        "slow": [bank_transaction("tx-1")],
+        "fast": [bank_transaction("tx-2")],
+    }
+    sync_service = make_sync_service(transactions, account_sync_timeout=0.05)
+    sync_service.gocardless_service = HangingGoCardlessService(transactions)
+
+    await asyncio.wait_for(sync_service.sync_transactions(), timeout=1)
+
+    statuses = sync_service.sync_status_repository.statuses
+    assert statuses["slow"].last_sync_status == "timeout"
+    assert not statuses["slow"].is_syncing
+    assert statuses["fast"].last_sync_status == "success"
+    assert [tx.external_id for tx in sync_service.lunchmoney_service.created] == [
+        "tx-2"
+    ]
+
+
+async def test_cancelled_sync_is_not_left_syncing():
+    transactions = {"slow": [bank_transaction("tx-1")]}
+    sync_service = make_sync_service(transactions)
+    sync_service.gocardless_service = HangingGoCardlessService(transactions)
+
+    task = asyncio.create_task(sync_service.sync_transactions())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    status = sync_service.sync_status_repository.statuses["slow"]
+    assert not status.is_syncing
+    assert status.last_sync_status == "error"
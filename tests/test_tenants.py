@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.outbound.file_storage import FileTenantRepository
+from server.src.adapters.outbound.lunchmoney import LunchMoneyApiAdapter
+
+
+def tenant_config(tenant_id: str, **overrides) -> dict:
+    return {
+        "id": tenant_id,
+        "gocardlessSecretId": f"{tenant_id}-id",
+        "gocardlessSecretKey": f"{tenant_id}-key",
+        "lunchmoneyAccessToken": f"{tenant_id}-lm-token",
+        **overrides,
+    }
+
+
+def test_missing_file_means_single_default_tenant(tmp_path):
+    repository = FileTenantRepository(tmp_path / "tenants.json")
+
+    assert [tenant.id for tenant in repository.load_tenants()] == ["default"]
+    assert repository.get_tenant("other") is None
+
+
+def test_tenants_are_read_with_their_credentials(tmp_path):
+    file_path = tmp_path / "tenants.json"
+    file_path.write_text(json.dumps({"tenants": [tenant_config("smith")]}))
+
+    tenant = FileTenantRepository(file_path).get_tenant("smith")
+
+    assert tenant.lunchmoney_access_token == "smith-lm-token"
+    assert tenant.gocardless_secret_id == "smith-id"
+
+
+def test_only_the_default_tenant_may_omit_credentials(tmp_path):
+    file_path = tmp_path / "tenants.json"
+    file_path.write_text(
+        json.dumps(
+            {
+                "tenants": [
+                    {"id": "default"},
+                    tenant_config("smith", gocardlessSecretKey=None),
+                ]
+            }
+        )
+    )
+
+    with pytest.raises(ValueError, match="smith.*gocardlessSecretKey"):
+        FileTenantRepository(file_path).load_tenants()
+
+    file_path.write_text(json.dumps({"tenants": [{"id": "default"}]}))
+    assert FileTenantRepository(file_path).get_tenant("default") is not None
+
+
+def test_other_tenants_never_use_the_environment_credentials(monkeypatch):
+    monkeypatch.setenv("LUNCHMONEY_ACCESS_TOKEN", "default-household")
+
+    assert LunchMoneyApiAdapter().api_key == "default-household"
+    with pytest.raises(ValueError):
+        LunchMoneyApiAdapter(env_fallback=False).api_key
+
+
+def test_tenant_ids_must_be_safe_directory_names(tmp_path):
+    file_path = tmp_path / "tenants.json"
+    file_path.write_text(json.dumps({"tenants": [{"id": "../escape"}]}))
+
+    with pytest.raises(ValueError):
+        FileTenantRepository(file_path).load_tenants()
+
+
+def test_providers_are_cached_per_tenant(tmp_path, monkeypatch):
+    file_path = tmp_path / "tenants.json"
+    file_path.write_text(
+        json.dumps({"tenants": [tenant_config("a"), tenant_config("b")]})
+    )
+    monkeypatch.setattr(
+        dependencies, "get_tenant_repository", lambda: FileTenantRepository(file_path)
+    )
+    instances = dependencies.get_lunchmoney_service.instances
+    try:
+        service_a = dependencies.get_lunchmoney_service("a")
+
+        assert dependencies.get_lunchmoney_service(tenant_id="a") is service_a
+        assert dependencies.get_lunchmoney_service("b") is not service_a
+        with pytest.raises(dependencies.UnknownTenantError):
+            dependencies.get_lunchmoney_service("c")
+    finally:
+        instances.pop("a", None)
+        instances.pop("b", None)
+
+
+def test_circuit_breakers_are_per_tenant(tmp_path, monkeypatch):
+    file_path = tmp_path / "tenants.json"
+    file_path.write_text(
+        json.dumps({"tenants": [tenant_config("a"), tenant_config("b")]})
+    )
+    monkeypatch.setattr(
+        dependencies, "get_tenant_repository", lambda: FileTenantRepository(file_path)
+    )
+    instances = dependencies.get_circuit_breakers.instances
+    try:
+        breakers_a = dependencies.get_circuit_breakers("a")
+        for _ in range(10):
+            breakers_a["lunchmoney"].record_failure()
+
+        assert breakers_a["lunchmoney"].state == "open"
+        assert dependencies.get_circuit_breakers("b")["lunchmoney"].state == "closed"
+    finally:
+        instances.pop("a", None)
+        instances.pop("b", None)
@@ -0,0 +1,71 @@
+import msgspec
+import pytest
+
+from server.src.adapters.outbound.tracing import (
+    JsonlSpanExporter,
+    OtlpHttpSpanExporter,
+)
+from server.src.core import tracing
+from tests.fakes import bank_transaction, make_sync_service
+
+
+@pytest.fixture
+def traces_file(tmp_path):
+    file_path = tmp_path / "traces.jsonl"
+    tracing.set_exporters([JsonlSpanExporter(file_path)])
+    yield file_path
+    tracing.set_exporters([])
+
+
+async def test_sync_run_is_exported_as_one_trace(traces_file):
+    sync_service = make_sync_service(
+        {"acc-1": [bank_transaction("tx-1"), bank_transaction("tx-2")]}
+    )
+
+    await sync_service.sync_transactions()
+
+    spans = [
+        msgspec.json.decode(line) for line in traces_file.read_bytes().splitlines()
+    ]
+    by_name = {span["name"]: span for span in spans}
+    assert {span["traceId"] for span in spans} == {by_name["sync.run"]["traceId"]}
+    assert by_name["sync.run"]["parentSpanId"] is None
+    assert by_name["sync.account"]["attributes"]["sync_status"] == "success"
+    assert by_name["gocardless.get_transactions"]["attributes"]["booked"] == 2
+    assert (
+        by_name["gocardless.get_transactions"]["attributes"]["rate_limit_remaining"]
+        == 3
+    )
+    assert by_name["lunchmoney.get_transactions"]["attributes"]["new"] == 2
+    assert (
+        by_name["sync.transform"]["parentSpanId"] == by_name["sync.account"]["spanId"]
+    )
+
+
+def test_failed_span_is_marked_as_error(traces_file):
+    with pytest.raises(ValueError):
+        with tracing.span("outer"):
+            with tracing.span("inner"):
+                raise ValueError("boom")
+
+    spans = [
+        msgspec.json.decode(line) for line in traces_file.read_bytes().splitlines()
+    ]
+    assert [(span["name"], span["status"]) for span in spans] == [
+        ("inner", "error"),
+        ("outer", "error"),
+    ]
+    assert spans[0]["statusMessage"] == "ValueError: boom"
+
+
+def test_otlp_payload_shape():
+    with tracing.span("root", transactions=3) as root:
+        pass
+
+    payload = OtlpHttpSpanExporter("http://collector")._to_otlp([root])
+
+    (otlp_span,) = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert otlp_span["traceId"] == root.trace_id
+    assert otlp_span["attributes"] == [
+        {"key": "transactions", "value": {"intValue": "3"}}
+    ]
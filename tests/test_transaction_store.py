@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.src.adapters.inbound.web import dependencies
+from server.src.adapters.inbound.web.app import app
+from server.src.adapters.outbound.transaction_store import SqliteTransactionStore
+from server.src.core.domain import Transaction, TransactionQuery
+from tests.fakes import bank_transaction, make_sync_service
+
+
+def transaction(external_id: str, payee: str, amount: str, date: str, notes=""):
+    return Transaction(
+        date=date,
+        amount=amount,
+        currency="eur",
+        payee=payee,
+        notes=notes,
+        asset_id=1,
+        external_id=external_id,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteTransactionStore(tmp_path / "transactions.sqlite3")
+    yield store
+    store.close()
+
+
+async def test_search_combines_text_date_and_amount(store):
+    await store.upsert_transactions(
+        "acc-1",
+        [
+            transaction("1", "Albert Heijn", "-12.50", "2024-01-05"),
+            transaction("2", "Albert Heijn", "-80.00", "2024-02-05"),
+            transaction("3", "Café Zuid", "-4.20", "2024-02-06", notes="koffie"),
+            transaction("4", "Salary", "2500.00", "2024-02-25"),
+        ],
+    )
+
+    result = await store.search(TransactionQuery(text="albert"))
+    assert [tx.external_id for tx in result.transactions] == ["2", "1"]
+
+    result = await store.search(
+        TransactionQuery(text="alb", date_from="2024-02-01", max_amount="-50")
+    )
+    assert (result.total, result.transactions[0].amount) == (1, "-80.00")
+
+    # Diacritics and notes are searchable too
+    assert (await store.search(TransactionQuery(text="cafe"))).total == 1
+    assert (await store.search(TransactionQuery(text="koffie"))).total == 1
+    assert (await store.search(TransactionQuery(text='"'))).total == 4
+
+
+async def test_upsert_only_counts_new_and_changed_rows(store):
+    rows = [transaction(str(i), "Shop", "-1.00", "2024-01-01") for i in range(3)]
+    assert len(await store.upsert_transactions("acc-1", rows)) == 3
+    assert await store.upsert_transactions("acc-1", rows) == []
+
+    rows[0] = transaction("0", "Renamed shop", "-1.00", "2024-01-01")
+    [change] = await store.upsert_transactions("acc-1", rows)
+    assert (change.old.payee, change.new.payee) == ("Shop", "Renamed shop")
+    assert (await store.search(TransactionQuery(text="renamed"))).total == 1
+    assert (await store.search(TransactionQuery(text="shop"))).total == 3
+
+
+async def test_sync_fills_the_store(store):
+    service = make_sync_service(
+        {"acc-1": [bank_transaction("tx-1"), bank_transaction("tx-2")]},
+        transaction_store=store,
+    )
+    await service.sync_transactions()
+
+    result = await store.search(TransactionQuery(text="acme", account_ids=["acc-1"]))
+    assert sorted(tx.external_id for tx in result.transactions) == ["tx-1", "tx-2"]
+
+
+async def test_search_over_many_rows_stays_fast(store):
+    payees = ["Albert Heijn", "Jumbo", "NS Reizigers", "Bol.com", "Shell"]
+    await store.upsert_transactions(
+        "acc-1",
+        [
+            transaction(
+                str(i),
+                payees[i % len(payees)],
+                f"-{i % 500}.{i % 100:02d}",
+                f"2020-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                notes=f"ref {i}",
+            )
+            for i in range(100_000)
+        ],
+    )
+
+    start = time.perf_counter()
+    result = await store.search(
+        TransactionQuery(text="jumbo", date_from="2020-06-01", min_amount="-10")
+    )
+    assert result.total > 0
+    assert time.perf_counter() - start < 0.5
+
+
+def test_search_endpoint(store):
+    asyncio.run(
+        store.upsert_transactions(
+            "acc-1", [transaction("1", "Albert Heijn", "-12.50", "2024-01-05")]
+        )
+    )
+    app.dependency_overrides[dependencies.get_transaction_store] = lambda: store
+    try:
+        response = TestClient(app).get(
+            "/api/transactions/search", params={"q": "heijn", "accountId": "acc-1"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    [row] = response.json()["transactions"]
+    assert (row["accountId"], row["externalId"], row["amount"]) == (
+        "acc-1",
+        "1",
+        "-12.50",
+    )
+
+
+@pytest.mark.parametrize("amount", ["abc", "NaN", "sNaN", "Infinity", "-inf"])
+def test_search_endpoint_rejects_invalid_amounts(store, amount):
+    app.dependency_overrides[dependencies.get_transaction_store] = lambda: store
+    try:
+        response = TestClient(app).get(
+            "/api/transactions/search", params={"minAmount": amount}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 422
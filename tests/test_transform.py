@@ -1,14 +1,5 @@
-import pytest
-
 from server import transform_transaction
 
-pytestmark = [pytest.mark.anyio]
-
-
-@pytest.fixture
-def anyio_backend():
-    return "asyncio"
-
 
 async def test_dkb():
     tx = {
@@ -0,0 +1,212 @@
+import asyncio
+
+from server.src.adapters.outbound.journal import FileUploadJournal
+from server.src.core.domain import Transaction, UploadBatch
+from tests.fakes import bank_transaction, make_sync_service
+
+
+def transaction(external_id: str) -> Transaction:
+    return Transaction(
+        date="2024-11-26",
+        amount="-1.00",
+        currency="eur",
+        payee="ACME",
+        notes="",
+        asset_id=1,
+        external_id=external_id,
+    )
+
+
+def batch(batch_id: str, *external_ids: str) -> UploadBatch:
+    return UploadBatch(
+        id=batch_id,
+        account_id="acc-1",
+        asset_id=1,
+        created_at="2024-11-26T00:00:00",
+        transactions=[transaction(external_id) for external_id in external_ids],
+    )
+
+
+async def test_file_journal_tracks_pending_and_committed_batches(tmp_path):
+    journal = FileUploadJournal(tmp_path / "upload-journal.jsonl")
+    await journal.plan(batch("b1", "tx-1", "tx-2"))
+    await journal.plan(batch("b2", "tx-3"))
+    await journal.commit("b1")
+
+    # A torn line from a crash mid-append is skipped
+    with open(journal.file_path, "ab") as f:
+        f.write(b'{"type":"plan","batch":{"id"')
+
+    reopened = FileUploadJournal(journal.file_path)
+    assert [b.id for b in await reopened.pending()] == ["b2"]
+    assert await reopened.pending("acc-2") == []
+    assert await reopened.committed_external_ids("acc-1") == {"tx-1", "tx-2"}
+
+
+async def test_compaction_keeps_pending_and_recent_batches(tmp_path):
+    journal = FileUploadJournal(
+        tmp_path / "upload-journal.jsonl", retention_days=0, compact_after=3
+    )
+    await journal.plan(batch("b1", "tx-1"))
+    await journal.plan(batch("b2", "tx-2"))
+    await journal.commit("b1")
+
+    assert [b.id for b in await journal.pending()] == ["b2"]
+    assert await journal.committed_external_ids("acc-1") == set()
+    assert len(journal.file_path.read_bytes().splitlines()) == 1
+
+
+async def test_interrupted_batch_is_resumed_without_gocardless(tmp_path):
+    journal = FileUploadJournal(tmp_path / "upload-journal.jsonl")
+    service = make_sync_service(
+        {"acc-1": [bank_transaction("tx-1"), bank_transaction("tx-2")]},
+        upload_journal=journal,
+    )
+
+    # The process died after Lunch Money accepted tx-1 but before the commit
+    await journal.plan(batch("b1", "tx-1", "tx-2"))
+    service.lunchmoney_service.created.append(transaction("tx-1"))
+
+    assert await service.resume_pending_uploads() == 1
+    assert service.gocardless_service.calls == []
+    assert [tx.external_id for tx in service.lunchmoney_service.created] == [
+        "tx-1",
+        "tx-2",
+    ]
+    assert await journal.pending() == []
+
+
+async def test_committed_transactions_are_not_posted_again(tmp_path):
+    journal = FileUploadJournal(tmp_path / "upload-journal.jsonl")
+    service = make_sync_service(
+        {"acc-1": [bank_transaction(f"tx-{i}") for i in range(5)]},
+        upload_journal=journal,
+        upload_batch_size=2,
+    )
+
+    await service.sync_transactions()
+    assert len(service.lunchmoney_service.created) == 5
+    assert await journal.pending() == []
+
+    # Lunch Money has not caught up yet, so the dedup read comes back empty
+    service.lunchmoney_service.created.clear()
+    await service.sync_transactions()
+    assert service.lunchmoney_service.created == []
+
+
+async def test_concurrent_resumes_post_a_batch_once(tmp_path):
+    journal = FileUploadJournal(tmp_path / "upload-journal.jsonl")
+    service = make_sync_service({"acc-1": []}, upload_journal=journal)
+    lunchmoney = service.lunchmoney_service
+    create_transactions = lunchmoney.create_transactions
+
+    async def slow_create_transactions(transactions):
+        # Lets the other resume dedup while this upload is under way
+        await asyncio.sleep(0.01)
+        return await create_transactions(transactions)
+
+    lunchmoney.create_transactions = slow_create_transactions
+    await journal.plan(batch("b1", "tx-1", "tx-2"))
+
+    results = await asyncio.gather(
+        service.resume_pending_uploads(), service.resume_pending_uploads("acc-1")
+    )
+
+    assert sorted(results) == [0, 1]
+    assert [tx.external_id for tx in lunchmoney.created] == ["tx-1", "tx-2"]
+    assert await journal.pending() == []
+
+
+async def test_services_sharing_a_journal_post_a_batch_once(tmp_path):
+    # Separate journals on one file stand in for the CLI and the server
+    journal_path = tmp_path / "upload-journal.jsonl"
+    live = make_sync_service(
+        {"acc-1": []}, upload_journal=FileUploadJournal(journal_path)
+    )
+    cli = make_sync_service(
+        {"acc-1": []}, upload_journal=FileUploadJournal(journal_path)
+    )
+    lunchmoney = live.lunchmoney_service
+    cli.lunchmoney_service = lunchmoney
+    create_transactions = lunchmoney.create_transactions
+
+    async def slow_create_transactions(transactions):
+        await asyncio.sleep(0.1)
+        return await create_transactions(transactions)
+
+    lunchmoney.create_transactions = slow_create_transactions
+    await live.upload_journal.plan(batch("b1", "tx-1", "tx-2"))
+
+    await asyncio.gather(live.resume_pending_uploads(), cli.resume_pending_uploads())
+
+    assert [tx.external_id for tx in lunchmoney.created] == ["tx-1", "tx-2"]
+    assert await live.upload_journal.pending() == []
+
+
+async def test_journal_batches_are_uploaded_concurrently(tmp_path):
+    journal = FileUploadJournal(tmp_path / "upload-journal.jsonl")
+    service = make_sync_service(
+        {"acc-1": [bank_transaction(f"tx-{i}") for i in range(5)]},
+        upload_journal=journal,
+        upload_batch_size=2,
+    )
+    lunchmoney = service.lunchmoney_service
+    create_transactions = lunchmoney.create_transactions
+    in_flight = peak = 0
+
+    async def slow_create_transactions(transactions):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await create_transactions(transactions)
+
+    lunchmoney.create_transactions = slow_create_transactions
+    await service.sync_transactions()
+
+    assert peak == 3
+    assert len(lunchmoney.created) == 5
+    assert await journal.pending() == []
+
+
+async def test_rejected_batch_is_abandoned_after_max_attempts(tmp_path):
+    journal = FileUploadJournal(tmp_path / "upload-journal.jsonl", max_attempts=3)
+    service = make_sync_service(
+        {"acc-1": [bank_transaction("tx-1"), bank_transaction("tx-2")]},
+        upload_journal=journal,
+    )
+    attempts = []
+
+    async def reject(transactions):
+        attempts.append([tx.external_id for tx in transactions])
+        raise Exception("422 Unprocessable Entity")
+
+    service.lunchmoney_service.create_transactions = reject
+
+    # One failed sync, then resumes on the following ticks
+    await service.sync_transactions()
+    for _ in range(4):
+        await service.resume_pending_uploads()
+    await service.sync_transactions()
+
+    assert len(attempts) == 3
+    assert await journal.pending() == []
+    assert [len(b.transactions) for b in await journal.abandoned("acc-1")] == [2]
+    assert await service.abandoned_uploads() == {"acc-1": 2}
+
+
+async def test_compaction_drops_batches_abandoned_long_ago(tmp_path):
+    journal = FileUploadJournal(
+        tmp_path / "upload-journal.jsonl", max_attempts=1, compact_after=1
+    )
+    await journal.plan(batch("b1", "tx-1"))
+    await journal.fail("b1", "422 Unprocessable Entity")
+    assert [b.id for b in await journal.abandoned()] == ["b1"]
+
+    journal.retention_days = 0
+    await journal.plan(batch("b2", "tx-2"))
+    await journal.commit("b2")
+
+    assert await journal.abandoned() == []
+    assert await journal.pending() == []
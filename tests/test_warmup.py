@@ -0,0 +1,24 @@
+from server.src.adapters.inbound.web.warmup import WarmupState, warm_up
+
+
+async def test_warm_up_records_task_outcomes():
+    async def ok():
+        pass
+
+    async def boom():
+        raise RuntimeError("upstream down")
+
+    state = await warm_up(WarmupState(), tasks={"ok": ok, "boom": boom})
+
+    assert state.is_ready
+    assert state.tasks["ok"]["status"] == "ok"
+    assert state.tasks["boom"] == {
+        "status": "error",
+        "error": "upstream down",
+        "durationMs": state.tasks["boom"]["durationMs"],
+    }
+
+
+def test_pending_state_is_not_ready():
+    assert not WarmupState().is_ready
+    assert WarmupState(status="disabled").is_ready